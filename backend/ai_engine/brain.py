@@ -1,10 +1,10 @@
 import logging
 import os
 import asyncio
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Sequence
 
 # Logging setup
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # --------------------------------------------------
@@ -23,86 +23,175 @@ try:
     except ImportError:
         def analyze_personality(x): return "friendly"
         
-    from backend.ai_engine.llm_client import generate_llm
+    from backend.ai_engine.llm_client import generate_llm, LLMUnavailable
 except ImportError as e:
     logger.warning(f"⚠️ Modules missing, using fallbacks. Error: {e}")
     predict_mood = lambda x: ("Neutral", 0.0)
     detect_emotion = lambda x: "calm"
     analyze_personality = lambda x: "friendly"
-    async def generate_llm(p): return "AI model is currently unavailable."
+
+    class LLMUnavailable(Exception):
+        def __init__(self, reason, reply):
+            super().__init__(reason)
+            self.reason, self.reply = reason, reply
+
+    async def generate_llm(p, tenant="anonymous", channel=None):
+        raise LLMUnavailable("not_installed", "AI model is currently unavailable.")
+
+from backend.ai_engine.prompt_builder import build_messages, COMPANION_NAME
+from backend.ai_engine.fast_path import fast_responder, last_bot_reply
+from backend.ai_engine.deadline import DeadlineExceeded, run_within, PERSIST_RESERVE_SECONDS
+from backend.metrics import stage_timer
+from backend.tracing import span
+
+# Analysis stage ko kabhi bhi poora budget nahi milta; LLM ke liye waqt bachana hai
+ANALYSIS_MAX_SECONDS = 3.0
+
+
+@dataclass(frozen=True, slots=True)
+class BrainResult:
+    """
+    One turn's reply plus the analysis tags computed for *this* input.
+    Har request ka apna object; singleton brain par koi per-request state nahi rehti.
+    """
+    ai_response: str
+    mood: str = "Neutral"
+    mood_score: Optional[float] = None
+    emotion: str = "calm"
+    personality: Optional[str] = None  # None = post_processor reply ke baad tag karta hai
+    fast_path: bool = False
+    # True = reply LLM ka nahi (busy/deadline/error fallback); routes ise history mein save nahi karte
+    degraded: bool = False
+
 
 class AIBrain:
     def __init__(self):
-        self.name = "Rizwan AI Companion"
+        self.name = COMPANION_NAME
 
-    async def process_user_input(self, text: str, context: str = "") -> Dict[str, Any]:
+    @staticmethod
+    def _analyze(text: str):
         """
-        Asynchronously analyzes input and returns a Dictionary with response and tags.
+        Mood/emotion models (blocking); returns (mood, score, emotion).
+        Sirf wohi analysis jo prompt mein jata hai; personality deferred path par (post_processor).
         """
-        if not text or len(text.strip()) == 0:
-            return {
-                "ai_response": "I'm listening, but I didn't get any text.",
-                "mood": "Neutral", "emotion": "calm", "personality": "friendly"
-            }
-
+        current_score = None
         try:
-            # --- 1. AI Analysis Phase (Sync Models) ---
-            try:
+            with span("analyzer.mood"):
                 mood_res = predict_mood(text)
-                current_mood = mood_res[0] if isinstance(mood_res, (tuple, list)) else mood_res
-            except: current_mood = "Neutral"
+            if isinstance(mood_res, (tuple, list)):
+                current_mood = mood_res[0]
+                current_score = float(mood_res[1]) if len(mood_res) > 1 else None
+            else:
+                current_mood = mood_res
+        except: current_mood = "Neutral"
 
-            try:
+        try:
+            with span("analyzer.emotion"):
                 current_emotion = detect_emotion(text)
-            except: current_emotion = "thoughtful"
+        except: current_emotion = "thoughtful"
+
+        return current_mood, current_score, current_emotion
+
+    @staticmethod
+    def tag_personality(text: str) -> str:
+        """Personality tag for storage/analytics (blocking; prompt isay use nahi karta)."""
+        try:
+            with span("analyzer.personality"):
+                return analyze_personality(text)
+        except Exception:
+            return "empathetic"
 
+    async def process_user_input(self, text: str, context: str = "", memories: str = "",
+                                 summary: str = "",
+                                 history: Optional[Sequence[Dict[str, str]]] = None,
+                                 channel: str = "web",
+                                 tenant: str = "anonymous") -> BrainResult:
+        """
+        Asynchronously analyzes input and returns a BrainResult with response and tags.
+        `tenant` (user/phone) is the LLM scheduler's fair-share key.
+        """
+        if not text or len(text.strip()) == 0:
+            return BrainResult("I'm listening, but I didn't get any text.", mood_score=0.0, personality="friendly")
+
+        try:
+            # --- 1. AI Analysis Phase (sync models, thread par, deadline ke andar) ---
             try:
-                current_personality = analyze_personality(text)
-            except: current_personality = "empathetic"
-
-            # --- 2. Advanced Prompt Engineering ---
-            system_instruction = (
-                f"Your name is {self.name}. You are the loyal AI Companion of Muhammad Rizwan. "
-                f"Detected User State: Mood={current_mood}, Emotion={current_emotion}. "
-                "Instructions: Be empathetic, concise, and friendly. "
-                "Maintain memory of the previous context provided."
-            )
+                with stage_timer("analysis"):
+                    analysis = asyncio.to_thread(self._analyze, text)
+                    current_mood, current_score, current_emotion = await run_within(
+                        asyncio.wait_for(analysis, ANALYSIS_MAX_SECONDS), reserve=PERSIST_RESERVE_SECONDS
+                    )
+            except (DeadlineExceeded, asyncio.TimeoutError):
+                logger.warning("⏱️ Analysis skipped: time budget exceeded.")
+                current_mood, current_score, current_emotion = "Neutral", None, "thoughtful"
+            # Personality tag reply ke baad post_processor lagata hai (None = deferred)
+            current_personality = None
 
-            final_prompt = (
-                f"SYSTEM: {system_instruction}\n"
-                f"HISTORY:\n{context}\n"
-                f"USER: {text}\n"
-                f"AI RESPONSE:"
-            )
+            # --- 2. Fast Path: trivial messages ka jawab template se (no LLM round-trip) ---
+            with stage_timer("fast_path"):
+                fast_reply = fast_responder.try_reply(text, current_mood, channel, last_bot_reply(history))
+            if fast_reply:
+                logger.info(f"⚡ Fast-path reply ({channel}): Mood={current_mood}")
+                return BrainResult(
+                    ai_response=fast_reply,
+                    mood=current_mood,
+                    mood_score=current_score,
+                    emotion=current_emotion,
+                    personality=current_personality,
+                    fast_path=True
+                )
+
+            # --- 3. Prompt Assembly (system/user/assistant messages) ---
+            # Static system prompt ek dafa bana hai; history structured turns se aati hai
+            with stage_timer("prompt_build"):
+                messages = build_messages(
+                    text,
+                    history=history,
+                    mood=current_mood,
+                    emotion=current_emotion,
+                    summary=summary,
+                    memories=memories,
+                    context=context,
+                )
 
-            # --- 3. Generate Response (Async Call) ---
+            # --- 4. Generate Response (Async Call) ---
             logger.info(f"🧠 Brain analyzing: Mood={current_mood}, Emotion={current_emotion}")
             
             # This must be awaited because generate_llm is async
-            ai_response = await generate_llm(final_prompt)
+            # "llm" stage = queue wait + saare model attempts (per-model timings llm_client mein)
+            degraded = False
+            with stage_timer("llm"):
+                try:
+                    ai_response = await generate_llm(messages, tenant=tenant, channel=channel)
+                except LLMUnavailable as e:
+                    logger.warning(f"⚠️ LLM unavailable ({e.reason}); sending a degraded reply.")
+                    ai_response, degraded = e.reply, True
 
             if not ai_response:
-                ai_response = "I'm processing a lot right now. Could you repeat that?"
+                ai_response, degraded = "I'm processing a lot right now. Could you repeat that?", True
 
-            return {
-                "ai_response": ai_response,
-                "mood": current_mood,
-                "emotion": current_emotion,
-                "personality": current_personality
-            }
+            return BrainResult(
+                ai_response=ai_response,
+                mood=current_mood,
+                mood_score=current_score,
+                emotion=current_emotion,
+                personality=current_personality,
+                degraded=degraded
+            )
 
         except Exception as e:
             logger.error(f"❌ Critical Brain Error: {str(e)}")
-            return {
-                "ai_response": "I'm having trouble thinking clearly. Let's try again.",
-                "mood": "Neutral", "emotion": "error", "personality": "friendly"
-            }
+            return BrainResult("I'm having trouble thinking clearly. Let's try again.",
+                               emotion="error", personality="friendly", degraded=True)
 
 # --- Singleton Instance ---
 brain = AIBrain()
 
-async def generate_ai(text: str, context: str = "") -> Dict[str, Any]:
+async def generate_ai(text: str, context: str = "", memories: str = "", summary: str = "",
+                      history: Optional[Sequence[Dict[str, str]]] = None,
+                      channel: str = "web", tenant: str = "anonymous") -> BrainResult:
     """
     Asynchronous helper function for routes.
     """
-    return await brain.process_user_input(text, context)
\ No newline at end of file
+    with span("generate_ai", channel=channel):
+        return await brain.process_user_input(text, context, memories, summary, history, channel, tenant)
\ No newline at end of file
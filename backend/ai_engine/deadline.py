@@ -0,0 +1,72 @@
+import asyncio
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+try:
+    from backend.config import PERSIST_RESERVE_SECONDS
+except ImportError:
+    PERSIST_RESERVE_SECONDS = 1.5
+
+# --------------------------------------------------
+# ⏱️ Per-Request Deadline (route -> brain -> LLM -> DB)
+# --------------------------------------------------
+# Route ek absolute deadline set karta hai; har stage sirf bacha hua waqt use karta hai.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+DEADLINE_REPLY = "⏳ That took me longer than expected. Could you send it again?"
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before a stage could finish."""
+
+
+def remaining(reserve: float = 0.0) -> Optional[float]:
+    """Seconds left (minus `reserve`), or None when no deadline is set."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic() - reserve
+
+
+def llm_budget() -> Optional[float]:
+    # Persistence ke liye thora waqt bacha kar rakhna
+    return remaining(reserve=PERSIST_RESERVE_SECONDS)
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def request_deadline(seconds: float) -> Callable[[], AsyncIterator[None]]:
+    """FastAPI dependency factory: sets the channel's deadline for the whole request."""
+    async def _dependency() -> AsyncIterator[None]:
+        with deadline_scope(seconds):
+            yield
+    return _dependency
+
+
+async def run_within(aw: Awaitable[Any], reserve: float = 0.0, floor: float = 0.0) -> Any:
+    """
+    Awaits `aw` within the remaining budget (minus `reserve`, but at least `floor`).
+    Raises DeadlineExceeded on timeout.
+    """
+    budget = remaining(reserve)
+    if budget is None:
+        return await aw
+    budget = max(budget, floor)
+    if budget <= 0:
+        if inspect.iscoroutine(aw):
+            aw.close()
+        raise DeadlineExceeded("No time budget left")
+    try:
+        return await asyncio.wait_for(aw, timeout=budget)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Stage exceeded its {budget:.2f}s budget")
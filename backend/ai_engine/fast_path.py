@@ -0,0 +1,182 @@
+import logging
+import random
+import re
+import threading
+from collections import Counter
+from typing import Dict, Optional, Sequence
+
+try:
+    from backend.config import FAST_PATH_CHANNELS
+except ImportError:
+    FAST_PATH_CHANNELS = {"web", "whatsapp"}
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------
+# 🔍 Precompiled Trivial-Intent Matcher (English + Roman Urdu)
+# --------------------------------------------------
+# Poora message inhi patterns par khatam hona chahiye; "thanks, now explain X" LLM ko jata hai.
+_ADDRESS = r"(?: (?:there|bro|dost|yaar|yar|jani|jaan|buddy|rizwan|sir|ai))?"
+
+_INTENT_PATTERNS = {
+    "greeting": (
+        r"(?:hi|hello|hey|hola|salam|salaam|slam|aoa|assalam(?:u|o)? ?(?:o )?alaikum|asalam(?:u|o)? ?alaikum"
+        r"|as?salam(?:u|o)? ?alaykum|good (?:morning|afternoon|evening)|subha bakhair)" + _ADDRESS
+    ),
+    "how_are_you": (
+        r"(?:how are (?:you|u)|how r u|hru|kya haal hai|kya hal hai|kaise ho|kese ho|kaisay ho|kesay ho"
+        r"|kia haal hai|ap kaise ho|aap kaise ho|aap kese ho)" + _ADDRESS
+    ),
+    "thanks": (
+        r"(?:thanks?(?: you)?(?: so much| a lot| very much)?|thx|thanx|ty|tysm|shukriya|shukria|shukriyah"
+        r"|bohat shukriya|meherbani|jazak ?allah(?: khair)?)" + _ADDRESS
+    ),
+    "ack": (
+        r"(?:ok|okay|okey|k|kk|fine|cool|nice|great|alright|sure|done|got it|noted|acha|achha|accha"
+        r"|theek(?: hai)?|thik(?: hai)?|theek ha|hmm|hm|han|haan|ji|jee|ji theek)"
+    ),
+    "farewell": (
+        r"(?:bye|bye bye|goodbye|good night|gn|see (?:you|ya)|take care|tc|allah hafiz|khuda hafiz"
+        r"|fi amanillah|shab bakhair)" + _ADDRESS
+    ),
+}
+
+TRIVIAL_MATCHER = re.compile(
+    "^(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in _INTENT_PATTERNS.items()) + ")$"
+)
+
+_NON_WORD = re.compile(r"[^\w\s]+", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+# "hiiii", "okkk", "hmmmm" jaise stretched words ko normalize karna
+_STRETCH = re.compile(r"(\w)\1{2,}")
+
+MAX_TRIVIAL_WORDS = 6
+
+# Pichla bot message sawal ya offer ho ("Should I explain the steps?") to "haan/ok/sure"
+# us ka jawab hai, acknowledgement nahi: LLM ko jata hai
+_AWAITS_ANSWER = re.compile(
+    r"\?[^\w]*$|\b(?:should i|shall i|do you want|would you like|want me to|let me know which"
+    r"|kya main|kya mein|batao|bataen|bataein)\b[^.!?\n]*$",
+    re.IGNORECASE,
+)
+
+
+def last_bot_reply(history: Optional[Sequence[Dict[str, str]]]) -> Optional[str]:
+    """Previous assistant message from memory turns ({"user": ..., "bot": ...})."""
+    return (history[-1].get("bot") or None) if history else None
+
+
+def awaits_answer(reply: Optional[str]) -> bool:
+    return bool(reply) and _AWAITS_ANSWER.search(reply.strip()[-300:]) is not None
+
+# --------------------------------------------------
+# 💬 Mood-Aware Response Templates
+# --------------------------------------------------
+RESPONSES: Dict[str, Dict[str, list]] = {
+    "greeting": {
+        "positive": ["Hey! 😊 You sound in a great mood. What's up?", "Salam! Love the energy today. What shall we talk about?"],
+        "neutral": ["Hello! 👋 How can I help you today?", "Salam! Kya haal hai? How can I help?"],
+        "negative": ["Hi. I'm here for you. Want to tell me what's on your mind?", "Salam. Sab theek? I'm listening whenever you're ready."],
+    },
+    "how_are_you": {
+        "positive": ["I'm doing great, thanks for asking! 😊 And you seem happy too. What's the good news?"],
+        "neutral": ["Main bilkul theek hoon, shukriya! Aap sunao, kya chal raha hai?", "I'm good, thanks! How about you?"],
+        "negative": ["I'm fine, thank you. But how are *you* really doing? I'm here to listen."],
+    },
+    "thanks": {
+        "positive": ["Anytime! 😊", "Koi baat nahi! Happy to help. 🌟"],
+        "neutral": ["You're welcome!", "Koi baat nahi! Anything else?"],
+        "negative": ["Always here for you. Take care of yourself. 🫂"],
+    },
+    "ack": {
+        "positive": ["👍 Great!", "Perfect! Let me know if you need anything else."],
+        "neutral": ["👍", "Alright! Let me know if there's anything else."],
+        "negative": ["Okay. I'm here if you want to talk more. 🫂"],
+    },
+    "farewell": {
+        "positive": ["Bye! Have an amazing day! 🌟", "Allah Hafiz! Take care. 😊"],
+        "neutral": ["Goodbye! Talk to you soon. 👋", "Allah Hafiz! Take care."],
+        "negative": ["Take care of yourself. I'm here whenever you need me. 🫂 Allah Hafiz."],
+    },
+}
+
+_MOOD_BUCKETS = {"Very Happy": "positive", "Happy": "positive", "Sad": "negative", "Upset": "negative"}
+
+
+class FastPathResponder:
+    """
+    Answers trivial messages (greetings, thanks, "ok") from templates without an LLM call.
+    Har channel ke liye on/off, aur hit rate report karta hai.
+    """
+
+    def __init__(self, channels=FAST_PATH_CHANNELS):
+        self.channels = set(channels)
+        self._lock = threading.Lock()
+        self.seen: Counter = Counter()
+        self.hits: Counter = Counter()
+        self.intents: Counter = Counter()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        text = _NON_WORD.sub(" ", (text or "").lower())
+        text = _STRETCH.sub(r"\1", text)
+        return _SPACES.sub(" ", text).strip()
+
+    def classify(self, text: str, last_reply: Optional[str] = None) -> Optional[str]:
+        """
+        Trivial intent name, or None. `last_reply` = previous bot message; us ke sawal ka
+        jawab ("haan", "ok") trivial nahi hota.
+        """
+        normalized = self.normalize(text)
+        if not normalized or normalized.count(" ") >= MAX_TRIVIAL_WORDS:
+            return None
+        match = TRIVIAL_MATCHER.match(normalized)
+        if not match:
+            return None
+        if match.lastgroup == "ack" and awaits_answer(last_reply):
+            return None
+        return match.lastgroup
+
+    def enabled(self, channel: str) -> bool:
+        return channel in self.channels
+
+    def set_channel(self, channel: str, enabled: bool) -> None:
+        if enabled:
+            self.channels.add(channel)
+        else:
+            self.channels.discard(channel)
+
+    def try_reply(self, text: str, mood: Optional[str], channel: str = "web",
+                  last_reply: Optional[str] = None) -> Optional[str]:
+        """
+        Returns a templated reply for trivial messages, or None to use the LLM.
+        """
+        if not self.enabled(channel):
+            return None
+        intent = self.classify(text, last_reply)
+        with self._lock:
+            self.seen[channel] += 1
+            if intent:
+                self.hits[channel] += 1
+                self.intents[intent] += 1
+        if not intent:
+            return None
+        bucket = _MOOD_BUCKETS.get(mood or "Neutral", "neutral")
+        return random.choice(RESPONSES[intent][bucket])
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_channel = {
+                ch: {
+                    "enabled": ch in self.channels,
+                    "messages": self.seen[ch],
+                    "fast_path_hits": self.hits[ch],
+                    "hit_rate": round(self.hits[ch] / self.seen[ch], 4) if self.seen[ch] else 0.0,
+                }
+                for ch in sorted(set(self.seen) | self.channels)
+            }
+            return {"channels": per_channel, "intents": dict(self.intents)}
+
+
+# --- Singleton Instance ---
+fast_responder = FastPathResponder()
@@ -1,38 +1,243 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import struct
 import urllib.parse
-import random
+import zlib
+from typing import Awaitable, Callable, Dict, Optional
 
-def generate_image_url(prompt: str):
+try:
+    from backend.config import (
+        IMAGE_CACHE_DIR, IMAGE_FETCHER, IMAGE_SIZE, IMAGE_MODEL, IMAGE_FETCH_TIMEOUT, IMAGE_MAX_BYTES
+    )
+except ImportError:
+    IMAGE_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "image_cache")
+    IMAGE_FETCHER, IMAGE_SIZE, IMAGE_MODEL = "pollinations", 1024, "flux"
+    IMAGE_FETCH_TIMEOUT, IMAGE_MAX_BYTES = 90.0, 10 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_seed(prompt: str) -> int:
+    """
+    Deterministic seed: same prompt -> same image -> same cache entry.
+    (Pehle random seed tha, is liye har request cold fetch hoti thi.)
+    """
+    return zlib.crc32(prompt.strip().lower().encode("utf-8")) % 1_000_000 + 1
+
+
+def generate_image_url(prompt: str, seed: Optional[int] = None, size: int = IMAGE_SIZE, model: str = IMAGE_MODEL):
     """
-    Converts a text prompt into a high-quality image URL.
-    Optimized for faster loading and better compatibility.
+    Converts a text prompt into the upstream (Pollinations) image URL.
     """
     if not prompt:
         return None
 
     # 1. Clean and Encode the prompt
-    # Stripping extra spaces and making it URL-safe
     clean_prompt = prompt.strip().replace(" ", "-")
     encoded_prompt = urllib.parse.quote(clean_prompt)
-    
-    # 2. Random Seed for uniqueness
-    seed = random.randint(1, 1000000)
-    
-    # 3. Enhanced URL Structure
-    # Pollinations works best with /prompt/ rather than /p/ in some cases
-    # We use a slightly smaller default size (768) for faster initial rendering
-    # nologo=true is great for a clean UI
-    image_url = (
+
+    # 2. Enhanced URL Structure (nologo=true for a clean UI, Flux for quality)
+    return (
         f"https://pollinations.ai/prompt/{encoded_prompt}"
-        f"?width=1024"
-        f"&height=1024"
-        f"&seed={seed}"
+        f"?width={size}"
+        f"&height={size}"
+        f"&seed={seed if seed is not None else prompt_seed(prompt)}"
         f"&nologo=true"
-        f"&model=flux"  # Adding Flux model for high quality
+        f"&model={model}"
     )
-    
-    return image_url
 
-# Example usage for your backend:
-# prompt = "A futuristic Cybertruck at Islamia University Bahawalpur"
-# url = generate_image_url(prompt)
-# print(url)
\ No newline at end of file
+
+# =========================
+# 🔌 Pluggable Upstream Fetchers
+# =========================
+# Fetcher: async (prompt, seed, size, model) -> raw image bytes
+Fetcher = Callable[[str, int, int, str], Awaitable[bytes]]
+
+
+async def pollinations_fetcher(prompt: str, seed: int, size: int, model: str) -> bytes:
+    import requests
+
+    def _get() -> bytes:
+        url = generate_image_url(prompt, seed, size, model)
+        with requests.get(url, timeout=IMAGE_FETCH_TIMEOUT, stream=True) as resp:
+            resp.raise_for_status()
+            data = bytearray()
+            for chunk in resp.iter_content(64 * 1024):
+                data.extend(chunk)
+                if len(data) > IMAGE_MAX_BYTES:
+                    raise ValueError("Upstream image exceeds IMAGE_MAX_BYTES")
+            return bytes(data)
+
+    # requests blocking hai; event loop ko free rakhne ke liye thread par
+    return await asyncio.to_thread(_get)
+
+
+async def stub_fetcher(prompt: str, seed: int, size: int, model: str) -> bytes:
+    """Local 8x8 solid-colour PNG (network-free, for tests and offline dev)."""
+    r, g, b = hashlib.sha256(f"{prompt}|{seed}".encode("utf-8")).digest()[:3]
+    width = height = 8
+    raw = b"".join(b"\x00" + bytes((r, g, b)) * width for _ in range(height))
+
+    def chunk(tag: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+FETCHERS: Dict[str, Fetcher] = {
+    "pollinations": pollinations_fetcher,
+    "stub": stub_fetcher,
+}
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """Magic-byte check; upstream kabhi kabhi HTML error page 200 ke saath bhejta hai."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    return None
+
+
+# =========================
+# 🖼️ Async Image Service (Content-Addressed Disk Cache)
+# =========================
+class ImageService:
+    """
+    Fetches, validates and stores generated images under sha256(prompt|seed|size|model).
+    Chat sirf key register karta hai; bytes pehli GET par (ya background mein) aate hain,
+    aur aik hi key ke concurrent requests aik hi upstream fetch share karte hain.
+    """
+
+    def __init__(self, cache_dir: str = IMAGE_CACHE_DIR, fetcher: Optional[Fetcher] = None,
+                 size: int = IMAGE_SIZE, model: str = IMAGE_MODEL):
+        self.cache_dir = cache_dir
+        self.fetcher = fetcher or FETCHERS.get(IMAGE_FETCHER, pollinations_fetcher)
+        self.size = size
+        self.model = model
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    # --- Keys & Paths ---
+    def cache_key(self, prompt: str, seed: int) -> str:
+        material = f"{prompt.strip()}|{seed}|{self.size}x{self.size}|{self.model}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        # Do-character shard taake aik folder mein lakhon files na hon
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _meta_path(self, key: str) -> str:
+        return self._path(key) + ".json"
+
+    def cached_path(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+    # --- Public API ---
+    async def register(self, prompt: str, seed: Optional[int] = None) -> str:
+        """
+        Records prompt/seed for a key (so a cold GET can fetch it later) and returns the key.
+        """
+        seed = prompt_seed(prompt) if seed is None else seed
+        key = self.cache_key(prompt, seed)
+        # Disk I/O thread par; event loop par makedirs/write baqi requests ko rokte hain
+        await asyncio.to_thread(self._write_meta, key, {
+            "prompt": prompt.strip(), "seed": seed, "size": self.size, "model": self.model,
+        })
+        return key
+
+    def prefetch(self, key: str) -> None:
+        """Starts the upstream fetch in the background (chat response ko block kiye baghair)."""
+        if not self.cached_path(key):
+            self._start(key)
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Returns the on-disk path for a key, fetching it if needed. None if the key is unknown.
+        """
+        path = self.cached_path(key)
+        if path:
+            self.hits += 1
+            return path
+        if not os.path.exists(self._meta_path(key)):
+            return None
+        self.misses += 1
+        return await asyncio.shield(self._start(key))
+
+    def content_type(self, path: str) -> str:
+        with open(path, "rb") as f:
+            return sniff_image_type(f.read(16)) or "application/octet-stream"
+
+    # --- Internals ---
+    def _write_meta(self, key: str, meta: dict) -> None:
+        meta_path = self._meta_path(key)
+        if not os.path.exists(meta_path):
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+    def _start(self, key: str) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(key), name=f"image-fetch-{key[:8]}")
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+        return task
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled():
+            return
+        # prefetch() task ko koi await nahi karta: exception yahan retrieve, log aur count hoti hai
+        error = task.exception()
+        if error is not None:
+            self.failures += 1
+            logger.error(f"❌ Image Fetch Error ({key[:8]}): {error}")
+
+    async def _fetch_and_store(self, key: str) -> str:
+        meta = await asyncio.to_thread(self._read_meta, key)
+        data = await asyncio.wait_for(
+            self.fetcher(meta["prompt"], meta["seed"], meta["size"], meta["model"]),
+            timeout=IMAGE_FETCH_TIMEOUT,
+        )
+        if len(data) > IMAGE_MAX_BYTES or not sniff_image_type(data):
+            raise ValueError("Upstream returned a non-image or oversized payload")
+
+        await asyncio.to_thread(self._write_atomic, self._path(key), data)
+        logger.info(f"🎨 Cached image {key[:8]} ({len(data) // 1024} KB)")
+        return self._path(key)
+
+    def _read_meta(self, key: str) -> dict:
+        with open(self._meta_path(key), encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        # Temp file + rename: adhoori file kabhi serve nahi hoti
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "failures": self.failures,
+                "in_flight": len(self._inflight)}
+
+
+# --- Singleton Instance ---
+image_service = ImageService()
@@ -0,0 +1,91 @@
+import re
+from typing import Optional
+
+# --------------------------------------------------
+# 🎨 Image Intent Classifier (English + Roman Urdu)
+# --------------------------------------------------
+# Sirf "generate" jaisa verb kaafi nahi ("generate a plan" text request hai);
+# image noun ya explicit drawing verb zaroori hai.
+_IMAGE_NOUNS = (
+    r"images?|photos?|pictures?|pics?|pix|art(?:work)?|paintings?|drawings?|sketch(?:es)?|illustrations?"
+    r"|wallpapers?|logos?|posters?|portraits?|avatars?|tasveer|tasweer|tasvir|tasveerein"
+)
+# English verbs sirf request position par ("can you make a picture"), warna
+# "I want to make art my career" bhi image ban jata
+_EN_MAKE_VERBS = r"generate|create|make|produce|render|design"
+# show/give/send ke foran baad naya image noun chahiye ("show me a picture of ..."); "show me
+# the photos you sent" / "show me how to make art" purani cheez ya text maangte hain
+_GIVE_VERBS = r"show|give|send"
+# Roman Urdu verb jumle ke aakhir mein aata hai ("billi ki tasveer bana do"); akela "do" nahi
+_UR_MAKE_VERBS = r"banao|bana do|bana den|bnao|bnnao|banado|dikhao|dikha do"
+_MAKE_VERBS = rf"{_EN_MAKE_VERBS}|{_GIVE_VERBS}|{_UR_MAKE_VERBS}"
+# Ye verbs khud hi image maangte hain ("draw a cat"), agar object concrete ho
+_DRAW_VERBS = r"draw|paint|sketch|illustrate"
+# "draw conclusions / attention / a line under" drawing nahi
+_DRAW_NON_OBJECTS = (
+    r"conclusions?|attention|inspiration|comparisons?|parallels?|(?:a|the)\s+line|lines|a\s+blank"
+    r"|blood|water|money|breath|up|out|back|on|upon|from|near|closer|lots|straws?"
+)
+
+# Request position: jumle ki shuruat (ya comma/full stop ke baad), optional "please/can you"
+_LEAD = r"(?:^|[.!?,;:]\s*)(?:(?:please|pls|plz|kindly|can you|could you|would you|will you|can u)\s+)*"
+
+_MAKE_THEN_NOUN = re.compile(
+    rf"{_LEAD}(?:{_EN_MAKE_VERBS}|{_UR_MAKE_VERBS})\b(?:\s+\w+){{0,4}}?\s+(?:an?\s+)?\b(?:{_IMAGE_NOUNS})\b"
+)
+_GIVE_NOUN = re.compile(
+    rf"{_LEAD}(?:{_GIVE_VERBS})(?:\s+(?:me|us))?\s+(?:(?:an?|some|one|another)\s+)?(?:{_IMAGE_NOUNS})\b"
+)
+_NOUN_THEN_MAKE = re.compile(
+    rf"\b(?:{_IMAGE_NOUNS})\b(?:\s+\w+){{0,6}}?\s+\b(?:{_UR_MAKE_VERBS})\b\s*$"
+)
+_DRAW = re.compile(rf"{_LEAD}(?:{_DRAW_VERBS})(?:\s+(?:me|us))?\s+(?!(?:{_DRAW_NON_OBJECTS})\b)\w")
+_NOUN_OF = re.compile(rf"^(?:an?\s+)?(?:{_IMAGE_NOUNS})\s+(?:of|for)\b")
+
+# Image ke *baare* mein sawal (personality image, "describe this photo") ya pehle se maujood
+# tasveer ("the photos you sent") generation nahi
+_NEGATIVE = re.compile(
+    r"\b(?:describe|explain|analy[sz]e|what(?:'s| is) (?:in )?(?:this|the|an?)|personality"
+    r"|character (?:analysis|traits?)|(?:you|u|i|we) (?:just )?(?:sent|shared|posted|took|uploaded)"
+    r"|image kesi|image kaisi|image kaisa|self.?image|public image|docker image|image processing)\b"
+)
+
+# Prompt se request wala hissa hata kar sirf subject rakhna. "logo"/"poster" jaise
+# nouns subject ka hissa hain; sirf generic "image/photo" hatate hain.
+_GENERIC_NOUNS = r"images?|photos?|pictures?|pics?|pix|tasveer|tasweer|tasvir|tasveerein"
+_REQUEST_PREFIX = re.compile(
+    rf"^(?:(?:please|pls|plz|can you|could you|would you|will you|kindly|mujhe|meri liye|mere liye)\s+)*"
+    rf"(?:(?:{_MAKE_VERBS}|{_DRAW_VERBS})\s+(?:me\s+)?)?"
+    rf"(?:(?:(?:an?|the)\s+)?(?:{_GENERIC_NOUNS})\s+(?:of|for|showing)?\s*)?",
+    re.IGNORECASE,
+)
+_REQUEST_SUFFIX = re.compile(
+    rf"\s*(?:ki|ka|ke)?\s*(?:{_GENERIC_NOUNS})?\s*(?:{_MAKE_VERBS})?\s*$", re.IGNORECASE
+)
+_SPACES = re.compile(r"\s+")
+
+
+def is_image_request(text: str) -> bool:
+    lowered = _SPACES.sub(" ", (text or "").lower()).strip()
+    if not lowered or _NEGATIVE.search(lowered):
+        return False
+    return bool(
+        _DRAW.search(lowered)
+        or _NOUN_OF.search(lowered)
+        or _MAKE_THEN_NOUN.search(lowered)
+        or _GIVE_NOUN.search(lowered)
+        or _NOUN_THEN_MAKE.search(lowered)
+    )
+
+
+def extract_image_prompt(text: str) -> Optional[str]:
+    """
+    Returns the subject to render ("a cat on a roof") if the message asks for an image, else None.
+    """
+    if not is_image_request(text):
+        return None
+    cleaned = _SPACES.sub(" ", text.strip().rstrip(".!?")).strip()
+    subject = _REQUEST_PREFIX.sub("", cleaned, count=1)
+    subject = _REQUEST_SUFFIX.sub("", subject, count=1).strip(" ,:-")
+    # Subject na bache to poora message hi prompt hai
+    return subject if len(subject) >= 3 else cleaned
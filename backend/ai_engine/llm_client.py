@@ -1,20 +1,37 @@
 import logging
 import os
 import asyncio
-from typing import Optional
-from dotenv import load_dotenv
-from groq import AsyncGroq
+import heapq
+import itertools
+import time
+from collections import Counter
+from typing import Optional, List, Dict, Union
 
 # --------------------------------------------------
 # 1. Configuration & Logging
 # --------------------------------------------------
-load_dotenv()
+# .env aur logging config sirf backend.config / app.py mein load hote hain
 logger = logging.getLogger(__name__)
 
-if not logger.hasHandlers():
-    logging.basicConfig(level=logging.INFO)
+try:
+    from backend.config import (
+        GROQ_API_KEY, GROQ_BASE_URL,
+        LLM_MAX_CONCURRENCY, LLM_RPM, LLM_TPM, LLM_MAX_QUEUE_WAIT, LLM_MAX_QUEUED_PER_TENANT,
+        LLM_EXPECTED_COMPLETION_TOKENS
+    )
+except ImportError:
+    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+    LLM_MAX_CONCURRENCY, LLM_RPM, LLM_TPM = 4, 30, 6000
+    LLM_MAX_QUEUE_WAIT, LLM_MAX_QUEUED_PER_TENANT, LLM_EXPECTED_COMPLETION_TOKENS = 20.0, 3, 300
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+from backend.ai_engine.deadline import DEADLINE_REPLY, llm_budget
+from backend.ai_engine.usage import usage_recorder
+from backend.metrics import llm_call_duration, llm_queue_wait, llm_rejected
+from backend.tracing import span, record_span
+
+# Is se kam budget mein naya model attempt shuru karna bekaar hai
+MIN_ATTEMPT_SECONDS = 0.5
 
 # --------------------------------------------------
 # 2. Initialize Async Groq Client
@@ -28,13 +45,22 @@ def init_client():
         if not GROQ_API_KEY:
             logger.error("❌ CRITICAL: GROQ_API_KEY is missing in your .env file!")
             return None
+        if GROQ_BASE_URL:
+            logger.warning(f"⚠️ Groq client pointed at {GROQ_BASE_URL} (GROQ_BASE_URL override)")
+        # groq SDK (pydantic models + httpx) ~0.3s import leta hai: pehle client par hi load
+        from groq import AsyncGroq
         # Standard initialization for 2026 stable environments
-        return AsyncGroq(api_key=GROQ_API_KEY)
+        return AsyncGroq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL)
     except Exception as e:
         logger.error(f"❌ Failed to initialize Groq Client: {e}")
         return None
 
-client = init_client()
+def get_client():
+    """Returns the shared Groq client, creating it on first use (or at warm-up)."""
+    global client
+    if client is None:
+        client = init_client()
+    return client
 
 # --------------------------------------------------
 # 3. Model Priority
@@ -44,55 +70,303 @@ MODEL_PRIORITY = [
     "llama-3.1-8b-instant",    
     "mixtral-8x7b-32768"       
 ]
+DEFAULT_MAX_TOKENS = 1024
+
+# --------------------------------------------------
+# 4. Fair-Share Dispatch Scheduler
+# --------------------------------------------------
+class SchedulerBusy(Exception):
+    """Raised when a request cannot get an LLM slot within its queueing budget."""
+
+
+class LLMUnavailable(Exception):
+    """
+    generate_llm could not produce a real reply. `reply` user ko dikhane wala text hai,
+    `reason` (busy, deadline, auth, error, ...) callers/metrics ke liye. Ye text kabhi
+    assistant turn ki tarah history, memory ya summary mein save nahi hota.
+    """
+
+    def __init__(self, reason: str, reply: str):
+        super().__init__(f"{reason}: {reply}")
+        self.reason = reason
+        self.reply = reply
+
+
+BUSY_REPLY = "⏳ I'm talking to a lot of people right now. Please try again in a moment."
+
+
+class TokenBucket:
+    """Provider limit ka local view (requests/min ya tokens/min)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self._stamp = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if available now)."""
+        self._refill()
+        # Capacity se bari request ko bhi bhookha na rakhein: full bucket par chalne dein
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        # Negative amount = refund (estimate actual usage se zyada tha)
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class _Ticket:
+    __slots__ = ("tenant", "cost", "finish", "future", "enqueued_at", "granted_at")
+
+    def __init__(self, tenant: str, cost: int, finish: float, future: asyncio.Future):
+        self.tenant = tenant
+        self.cost = cost
+        self.finish = finish
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.granted_at = 0.0
+
+
+class LLMScheduler:
+    """
+    Weighted fair queueing of outbound LLM calls per user/phone.
+    Global concurrency limit + RPM/TPM token buckets; har tenant ka virtual finish time
+    cost/weight se barhta hai, is liye aik chatty number baaqi users ki baari nahi kha sakta.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, rpm: int = LLM_RPM, tpm: int = LLM_TPM,
+                 max_queue_wait: float = LLM_MAX_QUEUE_WAIT, max_queued_per_tenant: int = LLM_MAX_QUEUED_PER_TENANT,
+                 weights: Optional[Dict[str, float]] = None):
+        self.max_concurrency = max_concurrency
+        self.max_queue_wait = max_queue_wait
+        self.max_queued_per_tenant = max_queued_per_tenant
+        self.weights = weights or {}
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._queued: Counter = Counter()
+        self._in_flight = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.dispatched = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._wait_total = 0.0
+
+    # --- Public API ---
+    async def acquire(self, tenant: str, cost: int, timeout: Optional[float] = None) -> _Ticket:
+        """
+        Waits for this tenant's fair turn; raises SchedulerBusy if the wait budget
+        (max_queue_wait, or the caller's tighter `timeout`) is exceeded.
+        """
+        wait_budget = self.max_queue_wait if timeout is None else max(0.0, min(timeout, self.max_queue_wait))
+        if self._queued[tenant] >= self.max_queued_per_tenant:
+            self.rejected += 1
+            llm_rejected.inc(reason="tenant_queue_full")
+            raise SchedulerBusy(f"Too many queued LLM requests for {tenant}")
+
+        weight = self.weights.get(tenant, 1.0)
+        start = max(self._virtual_time, self._last_finish.get(tenant, 0.0))
+        finish = start + cost / weight
+        self._last_finish[tenant] = finish
+
+        ticket = _Ticket(tenant, cost, finish, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._heap, (finish, next(self._seq), ticket))
+        self._queued[tenant] += 1
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.future), timeout=wait_budget)
+        except asyncio.TimeoutError:
+            if not ticket.future.done():
+                ticket.future.cancel()
+                self._forget(ticket)
+                self.timed_out += 1
+                llm_rejected.inc(reason="queue_timeout")
+                raise SchedulerBusy(f"LLM queue wait exceeded {wait_budget:.1f}s")
+        except asyncio.CancelledError:
+            # Caller chala gaya: slot mil chuka ho to wapas karein, warna queue se nikal dein
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.release(ticket)
+            else:
+                ticket.future.cancel()
+                self._forget(ticket)
+            raise
+        return ticket
+
+    def release(self, ticket: _Ticket, actual_tokens: Optional[int] = None) -> None:
+        """Frees the slot and corrects the TPM bucket with the provider's real usage."""
+        self._in_flight -= 1
+        if actual_tokens is not None:
+            self.tokens.take(actual_tokens - ticket.cost)
+        self._dispatch()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queued": sum(self._queued.values()),
+            "queue_depth": {t: n for t, n in self._queued.items() if n},
+            "rpm_available": round(self.requests.level, 1),
+            "tpm_available": round(self.tokens.level, 1),
+            "dispatched": self.dispatched,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_queue_wait_ms": round(1000 * self._wait_total / self.dispatched, 1) if self.dispatched else 0.0,
+        }
+
+    # --- Internals ---
+    def _forget(self, ticket: _Ticket) -> None:
+        # Heap se lazy removal: cancelled future wala entry _dispatch skip kar deta hai
+        self._queued[ticket.tenant] -= 1
+        if self._queued[ticket.tenant] <= 0:
+            del self._queued[ticket.tenant]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._heap and self._in_flight < self.max_concurrency:
+            _, _, ticket = self._heap[0]
+            if ticket.future.done():
+                heapq.heappop(self._heap)
+                continue
+
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(ticket.cost))
+            if wait > 0:
+                self._schedule_wakeup(wait)
+                return
+
+            heapq.heappop(self._heap)
+            self.requests.take(1)
+            self.tokens.take(ticket.cost)
+            self._virtual_time = max(self._virtual_time, ticket.finish)
+            self._queued[ticket.tenant] -= 1
+            if self._queued[ticket.tenant] <= 0:
+                del self._queued[ticket.tenant]
+            self._in_flight += 1
+            self.dispatched += 1
+            ticket.granted_at = time.monotonic()
+            self._wait_total += ticket.granted_at - ticket.enqueued_at
+            ticket.future.set_result(True)
+
+        # Idle ho to purane tenants ke finish tags ki zaroorat nahi
+        if not self._heap and not self._in_flight:
+            self._last_finish.clear()
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    # ~4 chars per token + expected completion (provider TPM dono ko ginta hai)
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + LLM_EXPECTED_COMPLETION_TOKENS
+
+
+# Background jobs (summaries) interactive users se aadha hissa lete hain
+llm_scheduler = LLMScheduler(weights={"background": 0.5})
 
 # --------------------------------------------------
-# 4. Core Generator Function (Async)
+# 5. Core Generator Function (Async)
 # --------------------------------------------------
-async def generate_llm(structured_prompt: str) -> str:
+async def generate_llm(structured_prompt: Union[str, List[Dict[str, str]]], tenant: str = "anonymous",
+                       channel: Optional[str] = None) -> str:
     """
     Asynchronously generates a response from Groq with automatic model fallback.
+    Accepts a ready chat `messages` list (prompt_builder) or a plain prompt string.
+    `tenant` (user/phone owner token) decides the fair-share queue the call waits in
+    and whose daily token budget is charged; `channel` is recorded for cost reports.
+    Raises LLMUnavailable (busy, deadline, errors) instead of returning an error string.
     """
-    global client
-    
-    # Lazy initialization if first attempt failed
+    # Lazy initialization (warm-up ne na banaya ho ya pehli koshish fail hui ho)
+    client = get_client()
     if client is None:
-        client = init_client()
-        if client is None:
-            return "❌ Error: AI Engine not initialized. Check API Key."
+        raise LLMUnavailable("not_initialized", "❌ Error: AI Engine not initialized. Check API Key.")
 
-    if not structured_prompt or not structured_prompt.strip():
-        return "⚠️ Error: The AI received an empty prompt."
+    if isinstance(structured_prompt, str):
+        if not structured_prompt.strip():
+            raise LLMUnavailable("empty_prompt", "⚠️ Error: The AI received an empty prompt.")
+        messages = [{"role": "user", "content": structured_prompt}]
+    else:
+        messages = structured_prompt
+        if not messages or not (messages[-1].get("content") or "").strip():
+            raise LLMUnavailable("empty_prompt", "⚠️ Error: The AI received an empty prompt.")
 
     last_error = "Unknown Connection Error"
+    cost = estimate_tokens(messages)
+    # Daily budget khatam ho to sasta model pehle aur max_tokens cap
+    models, max_tokens = usage_recorder.routing(tenant, MODEL_PRIORITY, DEFAULT_MAX_TOKENS)
+
+    for model_id in models:
+        # Request deadline: har attempt (queue wait + call) sirf bache hue waqt mein
+        budget = llm_budget()
+        if budget is not None and budget < MIN_ATTEMPT_SECONDS:
+            logger.warning(f"⏱️ Deadline reached before trying {model_id}")
+            raise LLMUnavailable("deadline", DEADLINE_REPLY)
+
+        try:
+            with span("llm.queue", model=model_id), llm_queue_wait.time(model=model_id):
+                ticket = await llm_scheduler.acquire(tenant, cost, timeout=budget)
+        except SchedulerBusy as e:
+            logger.warning(f"⏳ LLM scheduler busy for {tenant}: {e}")
+            raise LLMUnavailable("busy", BUSY_REPLY) from e
 
-    for model_id in MODEL_PRIORITY:
+        used_tokens = None
+        prompt_tokens = completion_tokens = 0
+        call_status = "error"
+        started = time.monotonic()
+        started_ns = time.time_ns()
         try:
             logger.info(f"🔄 Processing request with model: {model_id}")
 
-            response = await client.chat.completions.create(
-                model=model_id,
-                messages=[
-                    {
-                        "role": "user", 
-                        "content": structured_prompt
-                    }
-                ],
-                temperature=0.65,
-                max_tokens=1024,
-                top_p=0.9
+            budget = llm_budget()
+            response = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=model_id,
+                    messages=messages,
+                    temperature=0.65,
+                    max_tokens=max_tokens,
+                    top_p=0.9
+                ),
+                timeout=max(budget, 0.01) if budget is not None else None
             )
+            usage = getattr(response, "usage", None)
+            used_tokens = getattr(usage, "total_tokens", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            call_status = "ok"
 
             if response.choices and response.choices[0].message.content:
                 ai_text = response.choices[0].message.content.strip()
                 logger.info(f"✅ Successfully generated response using {model_id}")
                 return ai_text
 
+        except asyncio.TimeoutError:
+            call_status = "timeout"
+            # Hung connection: agla model sirf tab jab budget bacha ho (loop ke shuru mein check)
+            last_error = f"timeout on {model_id}"
+            logger.warning(f"⏱️ {model_id} did not answer within the request deadline.")
+            continue
+
         except Exception as e:
             error_str = str(e).lower()
             last_error = error_str
             
             # Rate Limit Handling
             if "429" in error_str or "rate_limit" in error_str:
+                call_status = "rate_limited"
                 logger.warning(f"⚠️ Rate limit hit for {model_id}. Switching...")
                 await asyncio.sleep(0.5) 
                 continue
@@ -100,9 +374,22 @@ async def generate_llm(structured_prompt: str) -> str:
             # Auth Error
             if "401" in error_str:
                 logger.error("❌ Authentication Failed: Invalid Groq API Key.")
-                return "❌ AI Authentication Error: Please check backend configuration."
+                raise LLMUnavailable("auth", "❌ AI Authentication Error: Please check backend configuration.")
 
             logger.error(f"❌ Error with {model_id}: {error_str}")
             continue
+        finally:
+            elapsed = time.monotonic() - started
+            llm_scheduler.release(ticket, used_tokens)
+            llm_call_duration.observe(elapsed, model=model_id, status=call_status)
+            record_span("llm.attempt", started_ns, ok=call_status == "ok", model=model_id, status=call_status,
+                        prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            usage_recorder.record(
+                tenant, channel, model_id, prompt_tokens, completion_tokens,
+                latency_ms=int(elapsed * 1000), status=call_status
+            )
 
-    return f"⚠️ I'm temporarily unavailable. (Reason: {last_error[:60]}...)"
\ No newline at end of file
+    budget = llm_budget()
+    if budget is not None and budget < MIN_ATTEMPT_SECONDS:
+        raise LLMUnavailable("deadline", DEADLINE_REPLY)
+    raise LLMUnavailable("error", f"⚠️ I'm temporarily unavailable. (Reason: {last_error[:60]}...)")
\ No newline at end of file
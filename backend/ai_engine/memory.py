@@ -1,15 +1,25 @@
+from collections import OrderedDict
 from typing import List, Dict, Optional
 
+try:
+    from backend.config import MEMORY_MAX_SESSIONS
+except ImportError:
+    MEMORY_MAX_SESSIONS = 5000
+
 class Memory:
     """
     Enhanced in-memory storage that supports session-based history.
     Ensures that different users don't see each other's conversation history.
+    Sessions LRU order mein hain: `max_sessions` se zyada hon to sab se purana session
+    nikal jata hai (DB se dobara recover ho sakta hai), taake worker ki RAM bounded rahe.
     """
 
-    def __init__(self, max_history: int = 10):
-        # Dictionary to store history per user or session
-        self.sessions: Dict[str, List[Dict[str, str]]] = {}
+    def __init__(self, max_history: int = 10, max_sessions: int = MEMORY_MAX_SESSIONS):
+        # Dictionary to store history per user or session (oldest-used first)
+        self.sessions: "OrderedDict[str, List[Dict[str, str]]]" = OrderedDict()
         self.max_history = max_history
+        self.max_sessions = max_sessions
+        self.evictions = 0
 
     def add(self, session_id: str, user_message: str, bot_response: str) -> None:
         """
@@ -20,6 +30,7 @@ class Memory:
 
         if session_id not in self.sessions:
             self.sessions[session_id] = []
+        self.sessions.move_to_end(session_id)
 
         self.sessions[session_id].append({
             "user": user_message,
@@ -30,6 +41,21 @@ class Memory:
         if len(self.sessions[session_id]) > self.max_history:
             self.sessions[session_id].pop(0)
 
+        # Limit sessions: least-recently-used user pehle
+        while self.max_sessions and len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+            self.evictions += 1
+
+    def get_turns(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        Returns the structured history records ({"user", "bot"}) for prompt building.
+        """
+        turns = self.sessions.get(session_id)
+        if turns is None:
+            return []
+        self.sessions.move_to_end(session_id)
+        return list(turns)
+
     def get_context(self, session_id: str) -> str:
         """
         Returns a formatted string of the conversation history for AI context.
@@ -54,5 +80,23 @@ class Memory:
         else:
             self.sessions.clear()
 
+    def stats(self) -> Dict[str, int]:
+        """
+        Session/turn counts and the UTF-8 size of stored text (object overhead not included).
+        """
+        turns = 0
+        text_bytes = 0
+        for history in self.sessions.values():
+            turns += len(history)
+            for chat in history:
+                text_bytes += len(chat["user"].encode("utf-8")) + len(chat["bot"].encode("utf-8"))
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "turns": turns,
+            "text_bytes": text_bytes,
+            "evictions": self.evictions,
+        }
+
 # Global instance
 memory_manager = Memory()
\ No newline at end of file
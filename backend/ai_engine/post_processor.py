@@ -0,0 +1,209 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+
+try:
+    from backend.config import (
+        POSTPROCESS_WORKERS, POSTPROCESS_QUEUE_SIZE, POSTPROCESS_MAX_RETRIES,
+        POSTPROCESS_RETRY_BASE_SECONDS, POSTPROCESS_DRAIN_SECONDS
+    )
+except ImportError:
+    POSTPROCESS_WORKERS, POSTPROCESS_QUEUE_SIZE, POSTPROCESS_MAX_RETRIES = 2, 1000, 3
+    POSTPROCESS_RETRY_BASE_SECONDS, POSTPROCESS_DRAIN_SECONDS = 0.5, 10.0
+
+from backend.ai_engine.brain import AIBrain
+from backend.ai_engine.vector_memory import index_turn
+from backend.database.db import AsyncSessionLocal
+from backend.database.fts import owner_token
+from backend.database.models import ChatHistory
+from backend.metrics import stage_timer
+from backend.tracing import continue_trace, current_request_id, current_trace_context, request_id_var, span
+
+logger = logging.getLogger(__name__)
+
+
+class TurnJob:
+    """
+    One finished chat turn waiting for its deferred work. Har step ke baad state yahan
+    likhi jati hai, is liye retry sirf bacha hua kaam dobara karta hai (row dobara insert nahi hoti).
+    """
+    __slots__ = ("user_id", "phone_number", "channel", "user_input", "ai_response", "mood", "mood_score",
+                 "emotion", "personality", "created_at", "request_id", "trace_id", "parent_span_id",
+                 "chat_id", "published", "attempts")
+
+    def __init__(self, user_input: str, ai_response: str, user_id: Optional[int] = None,
+                 phone_number: Optional[str] = None, channel: str = "web", mood: Optional[str] = None,
+                 mood_score: Optional[float] = None, emotion: Optional[str] = None,
+                 personality: Optional[str] = None):
+        self.user_id = user_id
+        self.phone_number = phone_number
+        self.channel = channel
+        self.user_input = user_input
+        self.ai_response = ai_response
+        self.mood = mood
+        self.mood_score = mood_score
+        self.emotion = emotion
+        self.personality = personality
+        # Row ka timestamp request ka waqt hai, processing ka nahi
+        self.created_at = datetime.now(timezone.utc)
+        self.request_id = current_request_id()
+        # Sampled request ho to deferred stages usi trace mein dikhte hain
+        self.trace_id, self.parent_span_id = current_trace_context()
+        self.chat_id: Optional[int] = None
+        self.published = False
+        self.attempts = 0
+
+
+class PostProcessor:
+    """
+    Respond-first pipeline ka deferred hissa: personality tagging, ChatHistory insert,
+    live mood rollup aur vector indexing, reply bhejne ke baad background workers par.
+    Queue bounded hai; full ho to submit() False deta hai aur request khud persist karti hai
+    (backpressure: background peeche reh jaye to requests dheemi hoti hain, turns gum nahi hote).
+    """
+
+    def __init__(self, workers: int = POSTPROCESS_WORKERS, queue_size: int = POSTPROCESS_QUEUE_SIZE,
+                 max_retries: int = POSTPROCESS_MAX_RETRIES, retry_base: float = POSTPROCESS_RETRY_BASE_SECONDS):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self.submitted = 0
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.inline = 0
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks)
+
+    # --- Public API ---
+    def submit(self, job: TurnJob) -> bool:
+        """Queues a job without waiting. False = caller must run it inline (full or not started)."""
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return False
+        self.submitted += 1
+        return True
+
+    async def run_inline(self, job: TurnJob) -> None:
+        """Backpressure fallback: one attempt inside the request (no retry sleeps)."""
+        self.inline += 1
+        await self._process(job)
+        self.processed += 1
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    # --- Deferred Steps ---
+    async def _process(self, job: TurnJob) -> None:
+        job.attempts += 1
+        if job.personality is None:
+            with stage_timer("deferred_personality"):
+                job.personality = await asyncio.to_thread(AIBrain.tag_personality, job.user_input)
+
+        if job.chat_id is None:
+            with stage_timer("deferred_persist"):
+                async with AsyncSessionLocal() as db:
+                    row = ChatHistory(
+                        user_id=job.user_id,
+                        phone_number=job.phone_number,
+                        user_input=job.user_input,
+                        ai_response=job.ai_response,
+                        mood_tag=job.mood,
+                        mood_score=job.mood_score,
+                        emotion_tag=job.emotion,
+                        personality_tag=job.personality,
+                        timestamp=job.created_at,
+                    )
+                    db.add(row)
+                    await db.commit()
+                    job.chat_id = row.id
+
+        # Live dashboard rollup sirf commit ke baad (web users)
+        if not job.published and job.user_id is not None:
+            from backend.api_routes.live_routes import publish_mood_delta
+            publish_mood_delta(job.user_id, job.mood)
+            job.published = True
+
+        with stage_timer("deferred_index"):
+            await index_turn(owner_token(job.user_id, job.phone_number), job.chat_id,
+                             job.user_input, job.ai_response)
+
+    async def _handle(self, job: TurnJob) -> None:
+        token = request_id_var.set(job.request_id)
+        try:
+            async with continue_trace(job.trace_id, job.parent_span_id):
+                while True:
+                    try:
+                        with span("postprocess", channel=job.channel, attempt=job.attempts + 1):
+                            await self._process(job)
+                        self.processed += 1
+                        return
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        if job.attempts > self.max_retries:
+                            self.failed += 1
+                            logger.error(f"❌ Post-process gave up after {job.attempts} attempts "
+                                         f"({job.channel}): {e}")
+                            return
+                        self.retried += 1
+                        delay = self.retry_base * 2 ** (job.attempts - 1)
+                        logger.warning(f"🔁 Post-process retry {job.attempts}/{self.max_retries} "
+                                       f"in {delay:.1f}s: {e}")
+                        await asyncio.sleep(delay)
+        finally:
+            request_id_var.reset(token)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._handle(job)
+            finally:
+                self._queue.task_done()
+
+    # --- Lifecycle ---
+    def start(self) -> None:
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"post-processor-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self, drain_timeout: float = POSTPROCESS_DRAIN_SECONDS) -> None:
+        """Drains queued turns (up to drain_timeout) so a deploy does not drop history."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"⚠️ Post-processor stopped with {self._queue.qsize()} turn(s) unsaved.")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "inline_fallbacks": self.inline,
+        }
+
+
+# --- Singleton Instance ---
+post_processor = PostProcessor()
@@ -0,0 +1,63 @@
+from typing import Dict, List, Optional, Sequence
+
+# --------------------------------------------------
+# 🧩 Static System Prompt (built once at import)
+# --------------------------------------------------
+# Ye hissa har request par bilkul same rehta hai, is liye provider isay
+# stable prefix ke taur par reuse kar sakta hai. Per-request cheezein neeche alag messages mein.
+COMPANION_NAME = "Rizwan AI Companion"
+
+STATIC_SYSTEM_PROMPT = (
+    f"Your name is {COMPANION_NAME}. You are the loyal AI Companion of Muhammad Rizwan. "
+    "Instructions: Be empathetic, concise, and friendly. "
+    "Reply in the user's language (English, Urdu or Roman Urdu). "
+    "Use the conversation summary and earlier turns as memory of this user."
+)
+
+_SYSTEM_MESSAGE = {"role": "system", "content": STATIC_SYSTEM_PROMPT}
+
+Message = Dict[str, str]
+
+
+def build_messages(
+    text: str,
+    history: Optional[Sequence[Dict[str, str]]] = None,
+    mood: Optional[str] = None,
+    emotion: Optional[str] = None,
+    summary: str = "",
+    memories: str = "",
+    context: str = "",
+) -> List[Message]:
+    """
+    Emits a system/user/assistant message list:
+    static system prompt -> long-term memory -> history turns -> state note -> user text.
+    `history` items are the memory store's structured records: {"user": ..., "bot": ...}.
+    `context` is only for callers that still pass flat history text.
+    """
+    messages: List[Message] = [_SYSTEM_MESSAGE]
+
+    memory_parts = []
+    if summary:
+        memory_parts.append(f"Conversation summary (older turns):\n{summary}")
+    if memories:
+        memory_parts.append(f"Relevant past conversations:\n{memories}")
+    if context and not history:
+        memory_parts.append(f"Previous context:\n{context}")
+    if memory_parts:
+        messages.append({"role": "system", "content": "\n\n".join(memory_parts)})
+
+    for turn in history or ():
+        user_text, bot_text = turn.get("user"), turn.get("bot")
+        if user_text:
+            messages.append({"role": "user", "content": user_text})
+        if bot_text:
+            messages.append({"role": "assistant", "content": bot_text})
+
+    if mood or emotion:
+        messages.append({
+            "role": "system",
+            "content": f"Detected user state: Mood={mood or 'Neutral'}, Emotion={emotion or 'Calm'}."
+        })
+
+    messages.append({"role": "user", "content": text})
+    return messages
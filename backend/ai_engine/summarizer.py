@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import math
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    from backend.config import (
+        SUMMARY_ENABLED, SUMMARY_MODE, SUMMARY_INTERVAL_SECONDS, SUMMARY_KEEP_RECENT,
+        SUMMARY_MIN_SPAN, SUMMARY_MAX_SPAN, SUMMARY_MAX_CHARS
+    )
+except ImportError:
+    SUMMARY_ENABLED, SUMMARY_MODE, SUMMARY_INTERVAL_SECONDS = True, "extractive", 300
+    SUMMARY_KEEP_RECENT, SUMMARY_MIN_SPAN, SUMMARY_MAX_SPAN, SUMMARY_MAX_CHARS = 10, 10, 200, 1200
+
+from backend.database.db import AsyncSessionLocal
+from backend.database.models import ChatHistory, ConversationSummary
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?۔])\s+|\n+")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# English + Roman Urdu filler words jo summary mein wazan nahi rakhte
+STOPWORDS = set("""
+a an the and or but if so to of in on at for with from by is are was were be been am i you he she it we they
+me my your our their this that these those do does did have has had not no yes ok okay just very really can
+will would should could what how why when where who which there here about than then also too please thanks
+hai hain ho tha thi the ka ki ke ko se mein main mai tum aap hum yeh ye woh wo kya kia nahi nai bhi to aur
+ya acha theek hmm han haan jee ji
+""".split())
+
+Owner = Tuple[Optional[int], Optional[str]]
+
+
+# =========================
+# ✂️ Local Extractive Summarizer
+# =========================
+def _sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if len(s.strip()) > 3]
+
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def extractive_summary(previous: str, turns: Sequence[Tuple[str, str]], max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """
+    Frequency-scored sentence extraction over the previous summary + new turns.
+    User ki baatein (facts, plans, feelings) assistant ke jawab se zyada wazan rakhti hain.
+    """
+    candidates: List[Tuple[int, str, float]] = []   # (order, line, weight)
+    for line in (previous or "").splitlines():
+        if line.strip():
+            candidates.append((len(candidates), line.strip(), 1.2))
+    for user_text, ai_text in turns:
+        for sentence in _sentences(user_text):
+            candidates.append((len(candidates), f"- User: {sentence}", 1.0))
+        for sentence in _sentences(ai_text)[:1]:
+            candidates.append((len(candidates), f"- Assistant: {sentence}", 0.4))
+
+    # Same line baar baar (e.g. "ok", canned replies) sirf ek dafa
+    seen, unique = set(), []
+    for order, line, weight in candidates:
+        norm = line.casefold()
+        if norm not in seen:
+            seen.add(norm)
+            unique.append((order, line, weight))
+    candidates = unique
+
+    if not candidates:
+        return previous or ""
+
+    freq = Counter(w for _, line, _ in candidates for w in _content_words(line))
+    top = max(freq.values()) if freq else 1
+
+    scored = []
+    for order, line, weight in candidates:
+        words = _content_words(line)
+        if not words:
+            continue
+        score = weight * sum(freq[w] / top for w in words) / math.sqrt(len(words))
+        scored.append((score, order, line))
+
+    picked, used = [], 0
+    for score, order, line in sorted(scored, key=lambda x: (-x[0], x[1])):
+        if len(line) > 300:
+            line = line[:297].rstrip() + "…"
+        if used + len(line) + 1 > max_chars:
+            continue
+        picked.append((order, line))
+        used += len(line) + 1
+
+    # Chronological order wapas, taake summary parhne mein kahani jaisi lage
+    return "\n".join(line for _, line in sorted(picked))
+
+
+async def llm_summary(previous: str, turns: Sequence[Tuple[str, str]], max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """
+    Abstractive summary via the Groq client; falls back to extractive on any failure.
+    """
+    try:
+        from backend.ai_engine.llm_client import generate_llm, LLMUnavailable
+    except ImportError:
+        return extractive_summary(previous, turns, max_chars)
+
+    transcript = "\n".join(f"User: {u}\nAssistant: {a}" for u, a in turns)
+    prompt = (
+        "Update the running summary of a conversation between a user and their AI companion. "
+        "Keep durable facts about the user (names, plans, preferences, feelings, open problems). "
+        f"Plain text, at most {max_chars // 6} words.\n"
+        f"CURRENT SUMMARY:\n{previous or '(empty)'}\n"
+        f"NEW TURNS:\n{transcript}\n"
+        "UPDATED SUMMARY:"
+    )
+    # Fair-share scheduler mein background jobs ka wazan kam hai
+    try:
+        text = await generate_llm(prompt, tenant="background", channel="summary")
+    except LLMUnavailable as e:
+        # Busy/deadline/error ka text kabhi summary nahi banta (purani summary aur span bache rehte hain)
+        logger.warning(f"⚠️ LLM summary unavailable ({e.reason}); using extractive summary.")
+        return extractive_summary(previous, turns, max_chars)
+    if not text or not text.strip():
+        return extractive_summary(previous, turns, max_chars)
+    return text.strip()[:max_chars]
+
+
+# =========================
+# 🔁 Background Compaction Job
+# =========================
+def _owner_filter(model, owner: Owner):
+    user_id, phone_number = owner
+    if user_id is not None:
+        return model.user_id == user_id
+    return and_(model.user_id.is_(None), model.phone_number == phone_number)
+
+
+async def get_summary(db: AsyncSession, user_id: Optional[int] = None, phone_number: Optional[str] = None) -> str:
+    """Rolling summary for the prompt; empty string if none exists yet."""
+    try:
+        stmt = select(ConversationSummary.summary).where(_owner_filter(ConversationSummary, (user_id, phone_number)))
+        return (await db.execute(stmt)).scalar_one_or_none() or ""
+    except Exception as e:
+        logger.error(f"⚠️ Summary Load Error: {e}")
+        return ""
+
+
+class SummaryCompactor:
+    """
+    Periodically folds ChatHistory spans older than the short-term window into
+    ConversationSummary, so prompt size stays constant as conversations grow.
+    """
+
+    def __init__(self):
+        # Sirf un owners ko dekhte hain jin ki nayi rows is watermark ke baad aayi hain
+        self._seen_max_id = 0
+        # Fail hone wale owners agli run mein dobara (watermark un ke liye nahi rukta)
+        self._retry: Set[Owner] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.spans_compacted = 0
+
+    async def _changed_owners(self, db: AsyncSession) -> Tuple[List[Owner], int]:
+        """Owners with rows after the watermark, and the new watermark (caller advances it)."""
+        stmt = (
+            select(ChatHistory.user_id, ChatHistory.phone_number, func.max(ChatHistory.id))
+            .where(ChatHistory.id > self._seen_max_id)
+            .group_by(ChatHistory.user_id, ChatHistory.phone_number)
+        )
+        rows = (await db.execute(stmt)).all()
+        owners = []
+        seen_max_id = self._seen_max_id
+        for user_id, phone_number, max_id in rows:
+            seen_max_id = max(seen_max_id, max_id or 0)
+            if user_id is not None or phone_number:
+                owners.append((user_id, None if user_id is not None else phone_number))
+        return list(dict.fromkeys(owners)), seen_max_id
+
+    async def compact_owner(self, db: AsyncSession, owner: Owner) -> bool:
+        user_id, phone_number = owner
+        existing = (await db.execute(
+            select(ConversationSummary).where(_owner_filter(ConversationSummary, owner))
+        )).scalar_one_or_none()
+        last_id = existing.last_chat_id if existing else 0
+
+        stmt = (
+            select(ChatHistory.id, ChatHistory.user_input, ChatHistory.ai_response)
+            .where(and_(_owner_filter(ChatHistory, owner), ChatHistory.id > last_id))
+            .order_by(ChatHistory.id.asc())
+            .limit(SUMMARY_MAX_SPAN + SUMMARY_KEEP_RECENT)
+        )
+        rows = (await db.execute(stmt)).all()
+        # Newest turns short-term window mein raw hi jaate hain
+        span = rows[:-SUMMARY_KEEP_RECENT] if len(rows) > SUMMARY_KEEP_RECENT else []
+        if len(span) < SUMMARY_MIN_SPAN:
+            return False
+
+        turns = [(r.user_input, r.ai_response) for r in span]
+        previous = existing.summary if existing else ""
+        if SUMMARY_MODE == "llm":
+            summary = await llm_summary(previous, turns)
+        else:
+            summary = extractive_summary(previous, turns)
+
+        if existing is None:
+            existing = ConversationSummary(user_id=user_id, phone_number=phone_number, turns_summarized=0)
+            db.add(existing)
+        existing.summary = summary
+        existing.last_chat_id = span[-1].id
+        existing.turns_summarized = (existing.turns_summarized or 0) + len(span)
+        existing.updated_at = datetime.now(timezone.utc)
+        await db.commit()
+        self.spans_compacted += 1
+        return True
+
+    async def run_once(self) -> int:
+        compacted = 0
+        failed: Set[Owner] = set()
+        async with AsyncSessionLocal() as db:
+            changed, seen_max_id = await self._changed_owners(db)
+            for owner in dict.fromkeys(changed + list(self._retry)):
+                try:
+                    # Ek owner mein bohat purani history ho to kai spans lagte hain
+                    while await self.compact_owner(db, owner):
+                        compacted += 1
+                except Exception as e:
+                    await db.rollback()
+                    failed.add(owner)
+                    logger.error(f"⚠️ Summary Compaction Error for {owner}: {e}")
+        # Watermark sirf poori run ke baad; fail owners retry set mein rehte hain
+        self._seen_max_id = seen_max_id
+        self._retry = failed
+        self.runs += 1
+        if compacted:
+            logger.info(f"📝 Compacted {compacted} conversation span(s) into summaries.")
+        return compacted
+
+    async def _loop(self, interval: int) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Summary Job Error: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: int = SUMMARY_INTERVAL_SECONDS) -> None:
+        if not SUMMARY_ENABLED or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._loop(interval), name="summary-compactor")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# --- Singleton Instance ---
+summary_compactor = SummaryCompactor()
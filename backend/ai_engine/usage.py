@@ -0,0 +1,182 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone, date
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import insert, select, func
+
+try:
+    from backend.config import (
+        USER_DAILY_TOKEN_BUDGET, OVER_BUDGET_MAX_TOKENS, OVER_BUDGET_MODEL,
+        USAGE_FLUSH_SECONDS, USAGE_BATCH_SIZE
+    )
+except ImportError:
+    USER_DAILY_TOKEN_BUDGET, OVER_BUDGET_MAX_TOKENS = 50000, 256
+    OVER_BUDGET_MODEL = "llama-3.1-8b-instant"
+    USAGE_FLUSH_SECONDS, USAGE_BATCH_SIZE = 5.0, 200
+
+logger = logging.getLogger(__name__)
+
+# Budgets sirf users/phones par; background jobs (summaries) ka apna hisaab hai
+UNBUDGETED_TENANTS = {"background", "anonymous"}
+
+
+def _utc_day() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class UsageRecorder:
+    """
+    Buffers per-call token usage and writes it to llm_usage in batches (executemany).
+    Budget check DB query ke baghair hota hai: aaj ke per-tenant totals har flush par llm_usage
+    se refresh hote hain (saare workers ka kharch) + is worker ke abhi unflushed rows.
+    Is liye N workers par bhi budget aik hi hai, zyada se zyada aik flush interval peeche.
+    """
+
+    def __init__(self, daily_budget: int = USER_DAILY_TOKEN_BUDGET, batch_size: int = USAGE_BATCH_SIZE):
+        self.daily_budget = daily_budget
+        self.batch_size = batch_size
+        self._buffer: List[dict] = []
+        self._today = _utc_day()
+        # _stored: DB totals (last refresh); _pending: is worker ke rows jo abhi buffer mein hain
+        self._stored: Counter = Counter()
+        self._pending: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        # Batch-full flushes: reference rakhna zaroori hai (warna GC task ko beech mein kha sakta hai)
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._flush_lock = asyncio.Lock()
+        self.rows_written = 0
+
+    # --- Hot Path (no IO) ---
+    def record(self, tenant: str, channel: Optional[str], model: str, prompt_tokens: int = 0,
+               completion_tokens: int = 0, latency_ms: Optional[int] = None, status: str = "ok") -> None:
+        total = (prompt_tokens or 0) + (completion_tokens or 0)
+        self._rollover()
+        self._pending[tenant] += total
+        self._buffer.append({
+            "tenant": tenant,
+            "channel": channel,
+            "model": model,
+            "prompt_tokens": prompt_tokens or 0,
+            "completion_tokens": completion_tokens or 0,
+            "total_tokens": total,
+            "latency_ms": latency_ms,
+            "status": status,
+            "created_at": datetime.now(timezone.utc),
+        })
+        if (len(self._buffer) >= self.batch_size and self._task and not self._task.done()
+                and not self._flush_tasks):
+            task = asyncio.get_running_loop().create_task(self.flush(), name="usage-flush")
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"⚠️ Usage Flush Task Error: {task.exception()}")
+
+    def used_today(self, tenant: str) -> int:
+        self._rollover()
+        return self._stored[tenant] + self._pending[tenant]
+
+    def over_budget(self, tenant: str) -> bool:
+        if self.daily_budget <= 0 or tenant in UNBUDGETED_TENANTS:
+            return False
+        return self.used_today(tenant) >= self.daily_budget
+
+    def routing(self, tenant: str, models: Sequence[str], max_tokens: int) -> Tuple[List[str], int]:
+        """
+        Model order + max_tokens for this tenant. Budget khatam ho to sasta model
+        pehle aur jawab chhota (service band nahi hoti).
+        """
+        if not self.over_budget(tenant):
+            return list(models), max_tokens
+        cheap_first = [OVER_BUDGET_MODEL] + [m for m in models if m != OVER_BUDGET_MODEL]
+        return cheap_first, min(max_tokens, OVER_BUDGET_MAX_TOKENS)
+
+    def _rollover(self) -> None:
+        today = _utc_day()
+        if today != self._today:
+            self._today = today
+            self._stored.clear()
+            self._pending.clear()
+
+    # --- Batched Writer ---
+    async def flush(self) -> int:
+        """Writes buffered rows, then refreshes today's totals (other workers included)."""
+        async with self._flush_lock:
+            written = 0
+            if self._buffer:
+                rows, self._buffer = self._buffer, []
+                from backend.database.db import AsyncSessionLocal
+                from backend.database.models import LLMUsage
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await db.execute(insert(LLMUsage), rows)
+                        await db.commit()
+                    self.rows_written += len(rows)
+                    written = len(rows)
+                except Exception as e:
+                    # Rows wapas buffer mein (agli flush par dobara koshish), lekin hadd ke andar
+                    self._buffer = (rows + self._buffer)[-self.batch_size * 10:]
+                    logger.error(f"⚠️ Usage Flush Error: {e}")
+            await self.load_today()
+            return written
+
+    async def load_today(self) -> None:
+        """
+        Aaj ke totals DB se (restart ke baad budget reset na ho, aur doosre workers ka kharch bhi gine).
+        Jo rows abhi buffer mein hain woh DB mein nahi, is liye pending unhi se dobara banta hai.
+        """
+        from backend.database.db import AsyncSessionLocal
+        from backend.database.models import LLMUsage
+
+        start = datetime.combine(_utc_day(), datetime.min.time())
+        try:
+            async with AsyncSessionLocal() as db:
+                stmt = (
+                    select(LLMUsage.tenant, func.sum(LLMUsage.total_tokens))
+                    .where(LLMUsage.created_at >= start)
+                    .group_by(LLMUsage.tenant)
+                )
+                rows = (await db.execute(stmt)).all()
+            self._today = _utc_day()
+            self._stored = Counter({tenant: int(total or 0) for tenant, total in rows})
+            pending: Counter = Counter()
+            for row in self._buffer:
+                pending[row["tenant"]] += row["total_tokens"]
+            self._pending = pending
+        except Exception as e:
+            logger.error(f"⚠️ Usage Load Error: {e}")
+
+    async def _loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    async def start(self, interval: float = USAGE_FLUSH_SECONDS) -> None:
+        if self._task and not self._task.done():
+            return
+        await self.load_today()
+        self._task = asyncio.create_task(self._loop(interval), name="usage-recorder")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"buffered": len(self._buffer), "rows_written": self.rows_written,
+                "tenants_today": len(self._stored.keys() | self._pending.keys())}
+
+
+# --- Singleton Instance ---
+usage_recorder = UsageRecorder()
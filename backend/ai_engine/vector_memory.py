@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --- 🛠️ Path Fix (CLI: python -m backend.ai_engine.vector_memory rebuild) ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+try:
+    from backend.config import (
+        VECTOR_INDEX_DIR, VECTOR_DIM, RECALL_TOP_K, RECALL_TOKEN_BUDGET, RECALL_MIN_SCORE
+    )
+except ImportError:
+    VECTOR_INDEX_DIR = os.path.join(BASE_DIR, "backend", "vector_index")
+    VECTOR_DIM = 512
+    RECALL_TOP_K = 3
+    RECALL_TOKEN_BUDGET = 300
+    RECALL_MIN_SCORE = 0.12
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Bohat bari files ko chunks mein score karte hain taake RAM bounded rahe
+SEARCH_CHUNK_ROWS = 65_536
+# Writer thread locks: fixed stripe (per-owner dict har naye user ke saath barhta rehta)
+WRITER_LOCK_STRIPES = 64
+
+
+class HashingEmbedder:
+    """
+    Local, network-free text embedding (signed feature hashing).
+    Unigrams + bigrams ko fixed-size vector mein hash karta hai; vocabulary
+    store nahi karni parti, is liye har naya turn foran index ho sakta hai.
+    """
+
+    def __init__(self, dim: int = VECTOR_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> Iterable[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        yield from tokens
+        for a, b in zip(tokens, tokens[1:]):
+            yield f"{a} {b}"
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        counts = Counter(self._features(text or ""))
+        for feature, tf in counts.items():
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            # Sublinear tf: baar baar aane wala word vector par haavi na ho
+            vec[h % self.dim] += sign * (1.0 + math.log(tf))
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            vec /= norm
+        return vec
+
+
+class VectorIndex:
+    """
+    Append-only, per-owner vector index on disk.
+    <key>.vec holds float32 rows, <key>.ids holds the matching ChatHistory ids (int64),
+    <key>.lock serializes writers across processes.
+    Search memory-maps the file, so heavy users do not have to fit in RAM.
+    """
+
+    def __init__(self, base_dir: str = VECTOR_INDEX_DIR, dim: int = VECTOR_DIM):
+        self.base_dir = base_dir
+        self.dim = dim
+        self.embedder = HashingEmbedder(dim)
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(WRITER_LOCK_STRIPES)]
+
+    # --- Files & Locks ---
+    def _base(self, key: str) -> str:
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.base_dir, name)
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = self._base(key)
+        return base + ".vec", base + ".ids"
+
+    def _lock(self, key: str) -> threading.Lock:
+        # Do owners aik stripe share kar saken to sirf thora intezar; writers nest nahi hote
+        return self._locks[zlib.crc32(key.encode("utf-8")) % len(self._locks)]
+
+    @contextmanager
+    def _writer(self, key: str):
+        """
+        Exclusive writer for one owner: thread lock (is process ke workers) + OS file lock
+        (app, import_history aur rebuild CLI alag processes hain), taake .vec/.ids kabhi
+        do writers ke beech interleave na hon.
+        """
+        with self._lock(key):
+            os.makedirs(self.base_dir, exist_ok=True)
+            with open(self._base(key) + ".lock", "a+b") as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _row_count(self, vec_path: str, ids_path: str) -> int:
+        try:
+            by_vec = os.path.getsize(vec_path) // (4 * self.dim)
+            by_ids = os.path.getsize(ids_path) // 8
+        except OSError:
+            return 0
+        # Crash ke baad adhoori likhi row ko ignore karein
+        return min(by_vec, by_ids)
+
+    def size(self, key: str) -> int:
+        return self._row_count(*self._paths(key))
+
+    # --- Write Path ---
+    def add_many(self, key: str, rows: Sequence[Tuple[int, str]]) -> None:
+        if not rows:
+            return
+        vec_path, ids_path = self._paths(key)
+        matrix = np.stack([self.embedder.embed(text) for _, text in rows]).astype(np.float32)
+        ids = np.asarray([row_id for row_id, _ in rows], dtype=np.int64)
+
+        with self._writer(key):
+            n = self._row_count(vec_path, ids_path)
+            # Partial tail (crash) ko truncate kar ke aligned append
+            for path, width in ((vec_path, 4 * self.dim), (ids_path, 8)):
+                if os.path.exists(path) and os.path.getsize(path) != n * width:
+                    with open(path, "r+b") as f:
+                        f.truncate(n * width)
+            with open(vec_path, "ab") as f:
+                f.write(matrix.tobytes())
+            with open(ids_path, "ab") as f:
+                f.write(ids.tobytes())
+
+    def add(self, key: str, row_id: int, text: str) -> None:
+        self.add_many(key, [(row_id, text)])
+
+    # --- Read Path ---
+    def search(self, key: str, text: str, k: int = RECALL_TOP_K, skip_recent: int = 0,
+               min_score: float = RECALL_MIN_SCORE) -> List[Tuple[int, float]]:
+        """
+        Returns [(chat_id, cosine)] best first. `skip_recent` drops the newest rows,
+        jo pehle se short-term memory mein prompt ka hissa hain.
+        """
+        vec_path, ids_path = self._paths(key)
+        n = self._row_count(vec_path, ids_path) - max(skip_recent, 0)
+        if n <= 0 or k <= 0:
+            return []
+
+        query = self.embedder.embed(text)
+        if not query.any():
+            return []
+
+        vectors = np.memmap(vec_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+        best_scores = np.empty(0, dtype=np.float32)
+        best_pos = np.empty(0, dtype=np.int64)
+
+        for start in range(0, n, SEARCH_CHUNK_ROWS):
+            scores = vectors[start:start + SEARCH_CHUNK_ROWS] @ query
+            take = min(k, scores.shape[0])
+            top = np.argpartition(-scores, take - 1)[:take]
+            best_scores = np.concatenate([best_scores, scores[top]])
+            best_pos = np.concatenate([best_pos, top + start])
+            if best_scores.shape[0] > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_scores, best_pos = best_scores[keep], best_pos[keep]
+        del vectors
+
+        order = np.argsort(-best_scores)
+        ids = np.memmap(ids_path, dtype=np.int64, mode="r", shape=(n,))
+        results = [
+            (int(ids[best_pos[i]]), float(best_scores[i]))
+            for i in order if best_scores[i] >= min_score
+        ]
+        del ids
+        return results
+
+
+# --- Singleton Instance ---
+vector_index = VectorIndex()
+
+
+def _turn_text(user_input: str, ai_response: str) -> str:
+    return f"{user_input or ''}\n{ai_response or ''}"
+
+
+async def index_turn(key: str, chat_id: int, user_input: str, ai_response: str) -> None:
+    """
+    Called after a ChatHistory row is written. File IO thread par hota hai.
+    """
+    try:
+        await asyncio.to_thread(vector_index.add, key, chat_id, _turn_text(user_input, ai_response))
+    except Exception as e:
+        logger.error(f"⚠️ Vector Index Error: {e}")
+
+
+async def recall(db, key: str, query: str, skip_recent: int = 0,
+                 k: int = RECALL_TOP_K, token_budget: int = RECALL_TOKEN_BUDGET) -> str:
+    """
+    Retrieves the top-k relevant past turns and formats them within a small token budget.
+    """
+    from sqlalchemy import select
+    from backend.database.fts import owner_clause
+    from backend.database.models import ChatHistory
+
+    try:
+        hits = await asyncio.to_thread(vector_index.search, key, query, k, skip_recent)
+        if not hits:
+            return ""
+
+        # Owner filter bhi: stale/galat index entry kabhi doosre user ka text na de
+        stmt = select(ChatHistory.id, ChatHistory.user_input, ChatHistory.ai_response).where(
+            ChatHistory.id.in_([chat_id for chat_id, _ in hits]), owner_clause(key)
+        )
+        rows = {row.id: row for row in (await db.execute(stmt)).all()}
+
+        parts, used = [], 0
+        for chat_id, _score in hits:
+            row = rows.get(chat_id)
+            if row is None:
+                continue
+            snippet = f"User: {row.user_input}\nAssistant: {row.ai_response}"
+            # ~4 chars per token (rough estimate, tokenizer ki zaroorat nahi)
+            cost = len(snippet) // 4 + 1
+            if used + cost > token_budget:
+                remaining_chars = (token_budget - used) * 4
+                if remaining_chars < 80:
+                    break
+                snippet = snippet[:remaining_chars].rstrip() + "…"
+                cost = token_budget - used
+            parts.append(snippet)
+            used += cost
+        return "\n".join(parts)
+    except Exception as e:
+        logger.error(f"⚠️ Memory Recall Error: {e}")
+        return ""
+
+
+# =========================
+# 🛠️ CLI: Backfill from ChatHistory
+# =========================
+async def _rebuild(batch_size: int = 2000) -> None:
+    import shutil
+    from sqlalchemy import select
+    from backend.database.db import AsyncSessionLocal, engine
+    from backend.database.models import ChatHistory
+    from backend.database.fts import owner_token
+
+    if os.path.isdir(vector_index.base_dir):
+        shutil.rmtree(vector_index.base_dir)
+
+    stmt = (
+        select(ChatHistory.id, ChatHistory.user_id, ChatHistory.phone_number,
+               ChatHistory.user_input, ChatHistory.ai_response)
+        .order_by(ChatHistory.id)
+        .execution_options(yield_per=batch_size)
+    )
+    total = 0
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions(batch_size):
+            grouped: Dict[str, List[Tuple[int, str]]] = {}
+            for row in partition:
+                key = owner_token(row.user_id, row.phone_number)
+                grouped.setdefault(key, []).append((row.id, _turn_text(row.user_input, row.ai_response)))
+            for key, rows in grouped.items():
+                vector_index.add_many(key, rows)
+            total += len(partition)
+            print(f"\r🧠 Indexed {total:,} turns", end="", flush=True)
+    print(f"\n✅ Vector index rebuilt at {vector_index.base_dir}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the long-term memory vector index.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(_rebuild(args.batch_size))
@@ -0,0 +1,210 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+from typing import Optional
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+import logging
+
+try:
+    from backend.api_routes.auth_utils import require_admin
+    from backend.ai_engine.fast_path import fast_responder
+    from backend.ai_engine.image_gen import image_service
+    from backend.ai_engine.llm_client import llm_scheduler
+    from backend.api_routes.admission import chat_admission, whatsapp_admission
+    from backend.ai_engine.usage import usage_recorder
+    from backend.database.db import get_db
+    from backend.database.models import LLMUsage
+    from backend.tracing import tracer
+    from backend.memory_report import memory_report, tracemalloc_diff
+    from backend.ai_engine.post_processor import post_processor
+except ImportError:
+    from .auth_utils import require_admin
+    from ..ai_engine.fast_path import fast_responder
+    from ..ai_engine.image_gen import image_service
+    from ..ai_engine.llm_client import llm_scheduler
+    from .admission import chat_admission, whatsapp_admission
+    from ..ai_engine.usage import usage_recorder
+    from ..database.db import get_db
+    from ..database.models import LLMUsage
+    from ..tracing import tracer
+    from ..memory_report import memory_report, tracemalloc_diff
+    from ..ai_engine.post_processor import post_processor
+
+logger = logging.getLogger(__name__)
+
+# Saare admin endpoints X-Admin-Key header ke peeche hain
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+class FastPathToggle(BaseModel):
+    channel: str
+    enabled: bool
+
+
+class TracingConfig(BaseModel):
+    trace_sample_rate: Optional[float] = Field(None, ge=0.0, le=1.0)
+    profile_sample_rate: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+# =========================
+# ⚡ Fast-Path Responder
+# =========================
+@router.get("/fast-path")
+async def fast_path_stats():
+    """Per-channel hit rate of the template responder."""
+    return fast_responder.stats()
+
+
+@router.post("/fast-path")
+async def toggle_fast_path(payload: FastPathToggle):
+    fast_responder.set_channel(payload.channel, payload.enabled)
+    logger.info(f"⚡ Fast path for '{payload.channel}' set to {payload.enabled}")
+    return fast_responder.stats()
+
+
+# =========================
+# 🎨 Image Cache
+# =========================
+@router.get("/images")
+async def image_cache_stats():
+    return image_service.stats()
+
+
+# =========================
+# 🚦 LLM Scheduler
+# =========================
+@router.get("/llm-scheduler")
+async def llm_scheduler_state():
+    """In-flight calls, per-tenant queue depth and the local view of provider limits."""
+    return llm_scheduler.snapshot()
+
+
+# =========================
+# 🚧 Admission Control
+# =========================
+@router.get("/admission")
+async def admission_state():
+    return {"chat": chat_admission.snapshot(), "whatsapp": whatsapp_admission.snapshot()}
+
+
+# =========================
+# 📮 Deferred Post-Processing
+# =========================
+@router.get("/post-processor")
+async def post_processor_state():
+    """Queue depth, retries and dead-lettered turns of the respond-first pipeline."""
+    return post_processor.stats()
+
+
+# =========================
+# 📊 LLM Usage (Cost Accounting)
+# =========================
+_USAGE_GROUPS = {"tenant": LLMUsage.tenant, "channel": LLMUsage.channel, "model": LLMUsage.model}
+
+
+@router.get("/usage")
+async def usage_report(
+    days: int = Query(1, ge=1, le=90),
+    group_by: str = Query("tenant", pattern="^(tenant|channel|model)$"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Aggregate token usage and latency per tenant, channel or model, heaviest first."""
+    # Buffer mein pari rows bhi report mein aa jayein
+    await usage_recorder.flush()
+
+    key = _USAGE_GROUPS[group_by]
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    total_tokens = func.sum(LLMUsage.total_tokens)
+    stmt = (
+        select(
+            key.label("key"),
+            func.count(LLMUsage.id).label("calls"),
+            func.sum(LLMUsage.prompt_tokens).label("prompt_tokens"),
+            func.sum(LLMUsage.completion_tokens).label("completion_tokens"),
+            total_tokens.label("total_tokens"),
+            func.avg(LLMUsage.latency_ms).label("avg_latency_ms"),
+            func.sum(case((LLMUsage.status == "ok", 0), else_=1)).label("failed_calls"),
+        )
+        .where(LLMUsage.created_at >= since)
+        .group_by(key)
+        .order_by(total_tokens.desc())
+        .limit(limit)
+    )
+    rows = (await db.execute(stmt)).all()
+    return {
+        "days": days,
+        "group_by": group_by,
+        "recorder": usage_recorder.snapshot(),
+        "rows": [
+            {
+                group_by: r.key,
+                "calls": r.calls,
+                "prompt_tokens": int(r.prompt_tokens or 0),
+                "completion_tokens": int(r.completion_tokens or 0),
+                "total_tokens": int(r.total_tokens or 0),
+                "avg_latency_ms": round(float(r.avg_latency_ms), 1) if r.avg_latency_ms is not None else None,
+                "failed_calls": int(r.failed_calls or 0),
+            }
+            for r in rows
+        ],
+    }
+
+
+# =========================
+# 🔭 Tracing & Sampling Profiler
+# =========================
+@router.get("/tracing")
+async def tracing_state():
+    return tracer.stats()
+
+
+@router.post("/tracing")
+async def configure_tracing(payload: TracingConfig):
+    """Sets the fraction of requests traced (JSON-lines spans) and profiled (folded stacks)."""
+    tracer.configure(payload.trace_sample_rate, payload.profile_sample_rate)
+    logger.info(f"🔭 Tracing set to trace={tracer.trace_rate}, profile={tracer.profile_rate}")
+    return tracer.stats()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_folded():
+    """Folded stacks ("frame;frame;frame count"): flamegraph.pl ya speedscope mein kholein."""
+    return PlainTextResponse(tracer.profiler.folded())
+
+
+@router.delete("/profile")
+async def reset_profile():
+    tracer.profiler.reset()
+    return tracer.profiler.stats()
+
+
+# =========================
+# 🧮 Memory Footprint
+# =========================
+@router.get("/memory")
+async def memory_footprint(objects: bool = Query(False, description="Walk the heap for top object types (slow)")):
+    """RSS plus per-subsystem sizes: sessions/turns/bytes, caches, DB pool, queues."""
+    return memory_report(include_objects=objects)
+
+
+@router.post("/memory/tracemalloc")
+async def tracemalloc_start():
+    """Starts tracemalloc (if needed) and takes the baseline snapshot."""
+    return tracemalloc_diff.start()
+
+
+@router.get("/memory/tracemalloc")
+async def tracemalloc_compare(top: int = Query(20, ge=1, le=200),
+                              group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")):
+    try:
+        return tracemalloc_diff.diff(top, group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/memory/tracemalloc")
+async def tracemalloc_stop():
+    return tracemalloc_diff.stop()
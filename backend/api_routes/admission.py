@@ -0,0 +1,124 @@
+import logging
+import math
+import time
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+
+try:
+    from backend.config import (
+        ADMISSION_MAX_IN_FLIGHT, ADMISSION_SOFT_LIMIT, CHAT_LATENCY_TARGET, WHATSAPP_LATENCY_TARGET
+    )
+except ImportError:
+    ADMISSION_MAX_IN_FLIGHT, ADMISSION_SOFT_LIMIT = 64, 32
+    CHAT_LATENCY_TARGET, WHATSAPP_LATENCY_TARGET = 10.0, 8.0
+
+logger = logging.getLogger(__name__)
+
+ADMIT, DEGRADE, REJECT = "admit", "degrade", "reject"
+
+# Purani latency readings ka asar is half-life ke saath ghatta hai, taake shedding
+# ke baad (jab naye samples nahi aate) controller khud normal par wapas aa jaye
+LATENCY_HALF_LIFE = 10.0
+
+
+class Admission:
+    """Per-request ticket handed to the route by the admission dependency."""
+    __slots__ = ("decision",)
+
+    def __init__(self, decision: str):
+        self.decision = decision
+
+    @property
+    def degraded(self) -> bool:
+        return self.decision == DEGRADE
+
+
+class AdmissionController:
+    """
+    Early load shedding for an endpoint: tracks in-flight requests and an EWMA of
+    recent latency. Hard limit par request reject, soft limit ya slow latency par
+    sasta canned jawab (degrade), taake jo requests admit hon woh waqt par mukammal hon.
+    """
+
+    def __init__(self, name: str, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+                 soft_limit: int = ADMISSION_SOFT_LIMIT, latency_target: float = CHAT_LATENCY_TARGET,
+                 alpha: float = 0.2, reject_with_error: bool = True):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.soft_limit = soft_limit
+        self.latency_target = latency_target
+        self.alpha = alpha
+        # WhatsApp (Twilio) par 503 ki jagah route khud canned TwiML bhejta hai
+        self.reject_with_error = reject_with_error
+
+        self.in_flight = 0
+        self._ewma = 0.0
+        self._ewma_at = time.monotonic()
+        self.counts = {ADMIT: 0, DEGRADE: 0, REJECT: 0}
+
+    def latency(self) -> float:
+        age = time.monotonic() - self._ewma_at
+        return self._ewma * math.pow(0.5, age / LATENCY_HALF_LIFE)
+
+    def observe(self, seconds: float) -> None:
+        self._ewma = self.alpha * seconds + (1 - self.alpha) * self.latency()
+        self._ewma_at = time.monotonic()
+
+    def decide(self) -> str:
+        if self.in_flight >= self.max_in_flight:
+            return REJECT
+        if self.in_flight >= self.soft_limit or self.latency() > self.latency_target:
+            return DEGRADE
+        return ADMIT
+
+    async def __call__(self) -> AsyncIterator[Admission]:
+        """FastAPI dependency: yields the decision, records latency for admitted work."""
+        decision = self.decide()
+        self.counts[decision] += 1
+
+        if decision == REJECT and self.reject_with_error:
+            logger.warning(f"🚧 {self.name}: shedding request (in_flight={self.in_flight})")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+        if decision != ADMIT:
+            yield Admission(DEGRADE)
+            return
+
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield Admission(ADMIT)
+        finally:
+            self.in_flight -= 1
+            self.observe(time.monotonic() - started)
+
+    def snapshot(self) -> dict:
+        if self.in_flight >= self.max_in_flight:
+            state = "shedding"
+        elif self.decide() == DEGRADE:
+            state = "degraded"
+        else:
+            state = "normal"
+        return {
+            "state": state,
+            "in_flight": self.in_flight,
+            "soft_limit": self.soft_limit,
+            "max_in_flight": self.max_in_flight,
+            "latency_ewma_s": round(self.latency(), 3),
+            "latency_target_s": self.latency_target,
+            "admitted": self.counts[ADMIT],
+            "degraded": self.counts[DEGRADE],
+            "rejected": self.counts[REJECT],
+        }
+
+
+# --- Per-Endpoint Controllers ---
+chat_admission = AdmissionController("chat", latency_target=CHAT_LATENCY_TARGET)
+# Twilio ~15s mein webhook chhor deta hai, is liye WhatsApp ka target tight hai
+whatsapp_admission = AdmissionController(
+    "whatsapp", latency_target=WHATSAPP_LATENCY_TARGET, reject_with_error=False
+)
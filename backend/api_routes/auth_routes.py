@@ -9,11 +9,15 @@ import logging
 # 🛠️ PROFESSIONAL IMPORTS
 # =========================
 try:
-    from backend.api_routes.auth_utils import hash_password, verify_password, create_access_token
+    from backend.api_routes.auth_utils import (
+        hash_password_async, verify_and_update_password, create_access_token, HashingBusy
+    )
     from backend.database.db import get_db
     from backend.database.models import User
 except ImportError:
-    from .auth_utils import hash_password, verify_password, create_access_token
+    from .auth_utils import (
+        hash_password_async, verify_and_update_password, create_access_token, HashingBusy
+    )
     from ..database.db import get_db
     from ..database.models import User
 
@@ -64,11 +68,11 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
                 detail=detail_msg
             )
 
-        # 2. Create new user instance
+        # 2. Create new user instance (hashing thread pool par, event loop free rehta hai)
         new_user = User(
             username=user.username,
             email=user.email,
-            hashed_password=hash_password(user.password) # Single hash as discussed
+            hashed_password=await hash_password_async(user.password)
         )
 
         db.add(new_user)
@@ -85,6 +89,13 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
     except HTTPException:
         raise
+    except HashingBusy as e:
+        logger.warning(f"🚧 Auth overloaded: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts right now, please retry shortly.",
+            headers={"Retry-After": "2"}
+        )
     except Exception as e:
         await db.rollback()
         logger.error(f"❌ Registration Error: {str(e)}")
@@ -109,13 +120,22 @@ async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
 
         # 2. Verify existence and password
         # Professional tip: Use a generic error message for security
-        if not db_user or not verify_password(user.password, db_user.hashed_password):
+        valid, new_hash = (False, None)
+        if db_user:
+            valid, new_hash = await verify_and_update_password(user.password, db_user.hashed_password)
+        if not valid:
             logger.warning(f"🔑 Failed login attempt: {user.email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
+        # Purana work factor: sahi password mila hai to hash transparently upgrade
+        if new_hash:
+            db_user.hashed_password = new_hash
+            await db.commit()
+            logger.info(f"🔐 Upgraded password hash for user {db_user.id}")
+
         # 3. Create Token
         # 'sub' should always be a string for JWT standards
         token_data = {
@@ -135,6 +155,13 @@ async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
         
     except HTTPException:
         raise
+    except HashingBusy as e:
+        logger.warning(f"🚧 Auth overloaded: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts right now, please retry shortly.",
+            headers={"Retry-After": "2"}
+        )
     except Exception as e:
         logger.error(f"❌ Login Error: {str(e)}")
         raise HTTPException(
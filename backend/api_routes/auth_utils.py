@@ -1,7 +1,16 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
+from fastapi import Header, HTTPException, status
+from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import hmac
 import logging
+import threading
+import time
 import sys
 import os
 
@@ -12,17 +21,51 @@ if BASE_DIR not in sys.path:
     sys.path.append(BASE_DIR)
 
 try:
-    from backend.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+    from backend.config import (
+        SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, ADMIN_API_KEY, AUTH_CACHE_TTL, AUTH_CACHE_SIZE,
+        PBKDF2_ROUNDS, HASH_CONCURRENCY, HASH_MAX_PENDING
+    )
 except ImportError:
     # Fallback for direct script execution or different root contexts
     SECRET_KEY = os.getenv("SECRET_KEY", "RIZWAN_SUPER_SECRET_KEY_2026")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 1440 # Default 24 hours
+    ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+    AUTH_CACHE_TTL, AUTH_CACHE_SIZE = 300.0, 4096
+    PBKDF2_ROUNDS, HASH_CONCURRENCY, HASH_MAX_PENDING = 29000, 2, 64
 
-# Password hashing context - PBKDF2 is great for stability
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 logger = logging.getLogger(__name__)
 
+_pwd_context = None
+_pwd_context_lock = threading.Lock()
+
+
+def get_pwd_context():
+    """
+    Password hashing context - PBKDF2 is great for stability.
+    passlib pehli hashing par (ya startup warm-up mein) load hota hai, import par nahi.
+    min_rounds = default_rounds: kam rounds wale purane hashes login par upgrade ho jate hain
+    """
+    global _pwd_context
+    if _pwd_context is None:
+        with _pwd_context_lock:
+            if _pwd_context is None:
+                from passlib.context import CryptContext
+                _pwd_context = CryptContext(
+                    schemes=["pbkdf2_sha256"],
+                    deprecated="auto",
+                    pbkdf2_sha256__default_rounds=PBKDF2_ROUNDS,
+                    pbkdf2_sha256__min_rounds=PBKDF2_ROUNDS,
+                )
+    return _pwd_context
+
+
+def __getattr__(name):
+    # Purana `auth_utils.pwd_context` access (benchmarks) abhi bhi chalta hai
+    if name == "pwd_context":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # =========================
 # 🔐 Password Hashing
 # =========================
@@ -31,7 +74,7 @@ def hash_password(password: str) -> str:
     """Hashes a plain text password safely using PBKDF2."""
     if not password:
         return ""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -39,11 +82,57 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     if not plain_password or not hashed_password:
         return False
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
     except Exception as e:
         logger.error(f"❌ Verification Error: {str(e)}")
         return False
 
+# =========================
+# 🧵 Non-Blocking Hashing (Bounded Executor)
+# =========================
+# PBKDF2 har call par event loop ko tens of ms block karta hai; login storm mein
+# chat traffic ruk jata tha. Hashing ab alag, chhote thread pool mein hoti hai.
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_CONCURRENCY, thread_name_prefix="pwd-hash")
+_hash_pending = 0
+
+
+class HashingBusy(Exception):
+    """Too many password hashes are already queued."""
+
+
+async def _run_hashing(func, *args):
+    global _hash_pending
+    if _hash_pending >= HASH_MAX_PENDING:
+        raise HashingBusy(f"{_hash_pending} password operations already pending")
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() on the hashing pool."""
+    return await _run_hashing(hash_password, password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str):
+    if not plain_password or not hashed_password:
+        return False, None
+    try:
+        return get_pwd_context().verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        logger.error(f"❌ Verification Error: {str(e)}")
+        return False, None
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Returns (valid, new_hash). new_hash is set when the stored hash uses an
+    outdated scheme/work factor and should be saved in its place.
+    """
+    return await _run_hashing(_verify_and_update, plain_password, hashed_password)
+
 # =========================
 # 🎟 Create Access Token
 # =========================
@@ -83,4 +172,133 @@ def decode_access_token(token: str) -> dict:
         return payload
     except JWTError as e:
         logger.warning(f"⚠️ JWT Decode Error: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+# =========================
+# 👤 Current User (Cached Verification)
+# =========================
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Verified claims of an access token."""
+    id: int
+    username: Optional[str]
+    email: Optional[str]
+    expires_at: float
+
+
+class _TokenCache:
+    """
+    Small LRU + TTL cache of verified claims, keyed by sha256(token).
+    Chatty clients har request par signature verify nahi karwate; entry kabhi
+    token ke `exp` se aage zinda nahi rehti.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, max_size: int = AUTH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CurrentUser]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, valid_until = entry
+            if now >= valid_until:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def put(self, key: str, user: CurrentUser) -> None:
+        valid_until = min(time.time() + self.ttl, user.expires_at)
+        with self._lock:
+            self._entries[key] = (user, valid_until)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = _TokenCache()
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Extracts the token from 'Bearer <token>'; None for missing or malformed headers."""
+    if not authorization:
+        return None
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        return None
+    return parts[1]
+
+
+def authenticate_token(token: Optional[str]) -> Optional[CurrentUser]:
+    """Verifies a JWT (via the claims cache) and returns the user, or None if invalid/expired."""
+    if not token:
+        return None
+    key = hashlib.sha256(token.encode()).hexdigest()
+    user = token_cache.get(key)
+    if user is not None:
+        return user
+
+    payload = decode_access_token(token)
+    if not payload:
+        return None
+    try:
+        user = CurrentUser(
+            id=int(payload["sub"]),
+            username=payload.get("username"),
+            email=payload.get("email"),
+            expires_at=float(payload.get("exp") or time.time()),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+    token_cache.put(key, user)
+    return user
+
+
+async def get_current_user(authorization: Optional[str] = Header(None)) -> CurrentUser:
+    """FastAPI dependency for every authenticated route (replaces manual header parsing)."""
+    token = bearer_token(authorization)
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Please login first.")
+    user = authenticate_token(token)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired")
+    return user
+
+
+async def get_optional_user(authorization: Optional[str] = Header(None)) -> Optional[CurrentUser]:
+    """Same as get_current_user, but None instead of 401 (routes that also accept X-Admin-Key)."""
+    return authenticate_token(bearer_token(authorization))
+
+# =========================
+# 🛡️ Admin Key Check
+# =========================
+
+def is_admin_key(key: Optional[str]) -> bool:
+    """Constant-time check of a support/ops key against ADMIN_API_KEY."""
+    if not ADMIN_API_KEY or not key:
+        return False
+    return hmac.compare_digest(key.encode(), ADMIN_API_KEY.encode())
+
+
+async def require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """FastAPI dependency for support/ops-only endpoints."""
+    if not is_admin_key(x_admin_key):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
@@ -1,30 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, or_, text, literal_column, table, column
 from pydantic import BaseModel
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import logging
+import math
+import json
+import base64
 from datetime import datetime, timedelta, timezone
 
 # 🛠️ INTERNAL IMPORTS
 try:
-    from backend.api_routes.auth_utils import decode_access_token
-    from backend.database.db import get_db
+    from backend.api_routes.auth_utils import CurrentUser, get_current_user, get_optional_user, is_admin_key
+    from backend.database.db import get_db, AsyncSessionLocal
     from backend.database.models import ChatHistory
-    from backend.ai_engine.brain import generate_ai, brain
+    from backend.database.fts import FTS_TABLE, BM25_WEIGHTS, build_match_query, owner_token, normalize_phone
+    from backend.ai_engine.brain import generate_ai, BrainResult
     from backend.ai_engine.memory import memory_manager
-    from backend.ai_engine.image_gen import generate_image_url 
+    from backend.ai_engine.vector_memory import recall
+    from backend.ai_engine.summarizer import get_summary
+    from backend.ai_engine.fast_path import fast_responder, last_bot_reply
+    from backend.ai_engine.image_gen import image_service
+    from backend.ai_engine.image_intent import extract_image_prompt
+    from backend.ai_engine.post_processor import TurnJob, post_processor
+    from backend.api_routes.admission import Admission, chat_admission
+    from backend.ai_engine.deadline import request_deadline, run_within, DeadlineExceeded, PERSIST_RESERVE_SECONDS
+    from backend.config import CHAT_DEADLINE_SECONDS
+    from backend.ai_engine.usage import usage_recorder
+    from backend.metrics import stage_timer
 except ImportError:
-    from .auth_utils import decode_access_token
-    from ..database.db import get_db
+    from .auth_utils import CurrentUser, get_current_user, get_optional_user, is_admin_key
+    from ..database.db import get_db, AsyncSessionLocal
     from ..database.models import ChatHistory
-    from ..ai_engine.brain import generate_ai, brain
+    from ..database.fts import FTS_TABLE, BM25_WEIGHTS, build_match_query, owner_token, normalize_phone
+    from ..ai_engine.brain import generate_ai, BrainResult
     from ..ai_engine.memory import memory_manager
-    from ..ai_engine.image_gen import generate_image_url
+    from ..ai_engine.vector_memory import recall
+    from ..ai_engine.summarizer import get_summary
+    from ..ai_engine.fast_path import fast_responder, last_bot_reply
+    from ..ai_engine.image_gen import image_service
+    from ..ai_engine.image_intent import extract_image_prompt
+    from ..ai_engine.post_processor import TurnJob, post_processor
+    from .admission import Admission, chat_admission
+    from ..ai_engine.deadline import request_deadline, run_within, DeadlineExceeded, PERSIST_RESERVE_SECONDS
+    from ..config import CHAT_DEADLINE_SECONDS
+    from ..ai_engine.usage import usage_recorder
+    from ..metrics import stage_timer
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Chat Engine"])
 
+DEGRADED_CHAT_REPLY = "I'm getting a lot of messages right now 🙏 Please send that again in a minute."
+
 # --- Pydantic Schemas ---
 class ChatRequest(BaseModel):
     message: str
@@ -57,77 +85,99 @@ async def recover_memory_from_db(user_id: int, db: AsyncSession):
 @router.post("/send", response_model=ChatResponse)
 async def chat_endpoint(
     request: ChatRequest, 
+    admission: Admission = Depends(chat_admission),
+    _deadline: None = Depends(request_deadline(CHAT_DEADLINE_SECONDS)),
     db: AsyncSession = Depends(get_db),
-    authorization: Optional[str] = Header(None) 
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    # 1. Auth Check
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Please login first.")
-
-    token = authorization.split(" ")[1]
-    payload = decode_access_token(token)
-    
-    if not payload:
-        raise HTTPException(status_code=401, detail="Session expired")
-    
-    user_id_str = str(payload.get("sub"))
-    user_id_int = int(user_id_str)
+    # 1. Auth (verified + cached by get_current_user)
+    user_id_int = current_user.id
+    user_id_str = str(user_id_int)
     
     user_message = request.message.strip()
     if not user_message:
         raise HTTPException(status_code=400, detail="Empty message")
 
+    # Overload: LLM/DB ko chhuye baghair foran sasta jawab
+    if admission.degraded:
+        return ChatResponse(
+            status="degraded",
+            response=DEGRADED_CHAT_REPLY,
+            user_id=user_id_str,
+            mood="Neutral"
+        )
+
     try:
-        # 2. Context Management
-        history_context = memory_manager.get_context(user_id_str)
-        if not history_context:
+        # 2. Context Management (structured turns, prompt builder ke liye)
+        history_turns = memory_manager.get_turns(user_id_str)
+        if not history_turns:
             await recover_memory_from_db(user_id_int, db)
-            history_context = memory_manager.get_context(user_id_str)
+            history_turns = memory_manager.get_turns(user_id_str)
+
+        # 3. Image Request Detection ("generate a plan" image nahi hai)
+        image_prompt = extract_image_prompt(user_message)
 
-        # 3. Image Request Detection
-        image_keywords = ["image", "photo", "picture", "draw", "generate", "banao", "dikhao", "art", "tasveer"]
-        is_image_req = any(word in user_message.lower() for word in image_keywords)
-        
         generated_img_url = None
-        if is_image_req:
-            # FIXED: Image generation can be slow, ensure it's handled or awaited if async
-            generated_img_url = generate_image_url(user_message)
-            ai_reply = "I've created this image for you! ✨"
+        if image_prompt:
+            # Bytes background mein fetch hote hain; browser hamare cached endpoint se leta hai
+            image_key = await image_service.register(image_prompt)
+            image_service.prefetch(image_key)
+            generated_img_url = f"/api/images/{image_key}"
+            # Image turn par analysis nahi chalta; tags defaults, personality deferred
+            result = BrainResult("I've created this image for you! ✨")
         else:
+            memories, summary = "", ""
+            # Trivial messages (hi/thanks/ok) fast path se jaate hain; recall ki zaroorat nahi
+            if not (fast_responder.enabled("web")
+                    and fast_responder.classify(user_message, last_bot_reply(history_turns))):
+                try:
+                    # Long-term memory: short-term window ke bahar ke relevant turns
+                    with stage_timer("memory_recall"):
+                        memories = await run_within(recall(
+                            db, owner_token(user_id_int), user_message,
+                            skip_recent=memory_manager.max_history
+                        ), reserve=PERSIST_RESERVE_SECONDS)
+                    with stage_timer("summary_lookup"):
+                        summary = await run_within(get_summary(db, user_id=user_id_int), reserve=PERSIST_RESERVE_SECONDS)
+                except DeadlineExceeded:
+                    logger.warning("⏱️ Memory retrieval skipped: time budget exceeded.")
             # FIXED: Awaiting the async AI call
-            ai_reply_data = await generate_ai(user_message, context=history_context)
-            if isinstance(ai_reply_data, dict):
-                ai_reply = ai_reply_data.get("ai_response", "I'm not sure how to respond.")
-            else:
-                ai_reply = ai_reply_data
-
-        # 4. Mood Analysis (Directly from Brain or Fallback)
-        detected_mood = getattr(brain, 'last_mood', 'Neutral')
-        detected_emotion = getattr(brain, 'last_emotion', 'Calm')
-        
-        # 5. Save to Memory & Database
-        try:
-            memory_manager.add(user_id_str, user_message, ai_reply)
-            
-            new_chat = ChatHistory(
-                user_id=user_id_int,
-                user_input=user_message,
-                ai_response=ai_reply,
-                mood_tag=detected_mood,
-                emotion_tag=detected_emotion,
-                timestamp=datetime.now(timezone.utc)
+            result = await generate_ai(
+                user_message, history=history_turns, memories=memories, summary=summary,
+                channel="web", tenant=owner_token(user_id_int)
             )
-            db.add(new_chat)
-            await db.commit()
-        except Exception as db_err:
-            await db.rollback()
-            logger.error(f"⚠️ DB Save Error: {db_err}")
+            # Busy/deadline/error: degraded reply, history/memory/index mein save nahi hota
+            if result.degraded:
+                return ChatResponse(status="degraded", response=result.ai_response, user_id=user_id_str, mood="Neutral")
+
+        # 4. Mood Analysis: isi request ke tags (BrainResult), shared brain state nahi
+        ai_reply = result.ai_response or "I'm not sure how to respond."
+
+        # 5. Short-term memory abhi (agla turn isi par chalta hai); DB/index reply ke baad
+        memory_manager.add(user_id_str, user_message, ai_reply)
+        job = TurnJob(
+            user_input=user_message,
+            ai_response=ai_reply,
+            user_id=user_id_int,
+            channel="web",
+            mood=result.mood,
+            mood_score=result.mood_score,
+            emotion=result.emotion,
+            personality=result.personality,
+        )
+        if not post_processor.submit(job):
+            # Queue full (backpressure): is request ko khud save karna parta hai
+            try:
+                with stage_timer("history_commit"):
+                    await run_within(post_processor.run_inline(job), floor=PERSIST_RESERVE_SECONDS)
+            except Exception as db_err:
+                logger.error(f"⚠️ DB Save Error: {db_err}")
 
         return ChatResponse(
             status="success",
             response=ai_reply,
             user_id=user_id_str,
-            mood=detected_mood,
+            mood=result.mood,
             image_url=generated_img_url 
         )
 
@@ -135,19 +185,27 @@ async def chat_endpoint(
         logger.error(f"❌ Chat Endpoint Error: {str(e)}")
         raise HTTPException(status_code=500, detail="AI Companion is busy, try again.")
 
+# --- 📊 Today's Token Usage (own budget) ---
+@router.get("/usage")
+async def get_my_usage(current_user: CurrentUser = Depends(get_current_user)):
+    tenant = owner_token(current_user.id)
+    used = usage_recorder.used_today(tenant)
+    budget = usage_recorder.daily_budget
+    return {
+        "tokens_today": used,
+        "daily_budget": budget or None,
+        "remaining": max(budget - used, 0) if budget else None,
+        "over_budget": usage_recorder.over_budget(tenant),
+    }
+
 # --- 📈 Get Mood History (For Chart.js) ---
 @router.get("/history-stats")
 async def get_mood_history(
-    authorization: Optional[str] = Header(None), 
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
     try:
-        token = authorization.split(" ")[1]
-        payload = decode_access_token(token)
-        user_id = int(payload.get("sub"))
+        user_id = current_user.id
         
         # Pichlay 7 din ka data filter karein
         seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
@@ -177,4 +235,302 @@ async def get_mood_history(
         }
     except Exception as e:
         logger.error(f"❌ Stats Error: {str(e)}")
-        return {"status": "error", "labels": [], "values": []}
\ No newline at end of file
+        return {"status": "error", "labels": [], "values": []}
+
+# --- 📉 Mood Trend Analytics (Numeric Scores) ---
+TREND_BUCKETS = {
+    # bucket: (SQLite strftime format, PostgreSQL date_trunc unit)
+    "hour": ("%Y-%m-%dT%H:00", "hour"),
+    "day": ("%Y-%m-%d", "day"),
+    "week": ("%Y-W%W", "week"),
+}
+
+def _bucket_expression(dialect_name: str, bucket: str):
+    sqlite_fmt, pg_unit = TREND_BUCKETS[bucket]
+    if dialect_name == "postgresql":
+        return func.to_char(func.date_trunc(pg_unit, ChatHistory.timestamp), "YYYY-MM-DD\"T\"HH24:MI")
+    return func.strftime(sqlite_fmt, ChatHistory.timestamp)
+
+@router.get("/mood-trend")
+async def get_mood_trend(
+    bucket: str = Query("day", pattern="^(hour|day|week)$"),
+    days: int = Query(30, ge=1, le=366),
+    window: int = Query(7, ge=1, le=168, description="Rolling average width in buckets"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bucketed mood score trend: mean, rolling mean and volatility (std-dev) per bucket.
+    Aggregation aur rolling window dono SQL mein hote hain, Python sirf buckets dekhta hai.
+    """
+    user_id = current_user.id
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    bucket_col = _bucket_expression(db.bind.dialect.name, bucket).label("bucket")
+
+    # 1. Per-bucket aggregates (ix_chat_history_user_ts range scan)
+    per_bucket = (
+        select(
+            bucket_col,
+            func.count(ChatHistory.mood_score).label("n"),
+            func.avg(ChatHistory.mood_score).label("mean"),
+            func.avg(ChatHistory.mood_score * ChatHistory.mood_score).label("mean_sq"),
+        )
+        .where(and_(
+            ChatHistory.user_id == user_id,
+            ChatHistory.timestamp >= since,
+            ChatHistory.mood_score.is_not(None)
+        ))
+        .group_by(bucket_col)
+        .subquery()
+    )
+
+    # 2. Rolling mean over the previous `window` buckets (SQL window function)
+    stmt = (
+        select(
+            per_bucket.c.bucket,
+            per_bucket.c.n,
+            per_bucket.c.mean,
+            per_bucket.c.mean_sq,
+            func.avg(per_bucket.c.mean).over(
+                order_by=per_bucket.c.bucket,
+                rows=(-(window - 1), 0)
+            ).label("rolling_mean"),
+        )
+        .order_by(per_bucket.c.bucket)
+    )
+
+    try:
+        rows = (await db.execute(stmt)).all()
+    except Exception as e:
+        logger.error(f"❌ Trend Error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not compute mood trend.")
+
+    points = []
+    for row in rows:
+        mean = float(row.mean or 0.0)
+        variance = max(float(row.mean_sq or 0.0) - mean * mean, 0.0)
+        points.append({
+            "bucket": row.bucket,
+            "count": int(row.n),
+            "mean": round(mean, 4),
+            "rolling_mean": round(float(row.rolling_mean or 0.0), 4),
+            "volatility": round(math.sqrt(variance), 4)
+        })
+
+    return {
+        "status": "success",
+        "bucket": bucket,
+        "days": days,
+        "window": window,
+        "points": points
+    }
+
+
+# --- 📜 Chat History (Keyset Pagination + NDJSON Export) ---
+HISTORY_COLUMNS = (
+    ChatHistory.id,
+    ChatHistory.timestamp,
+    ChatHistory.user_id,
+    ChatHistory.phone_number,
+    ChatHistory.user_input,
+    ChatHistory.ai_response,
+    ChatHistory.mood_tag,
+    ChatHistory.mood_score,
+    ChatHistory.emotion_tag,
+    ChatHistory.personality_tag,
+)
+EXPORT_FETCH_SIZE = 1000
+
+def _resolve_history_owner(
+    current_user: Optional[CurrentUser],
+    x_admin_key: Optional[str],
+    user_id: Optional[int],
+    phone_number: Optional[str],
+) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Returns (user_id, phone_number) whose history may be read; exactly one is set.
+    Normal users sirf apni history dekh sakte hain.
+    Support staff (X-Admin-Key) kisi bhi user_id ya WhatsApp phone_number ko parh sakta hai.
+    """
+    if is_admin_key(x_admin_key):
+        if phone_number:
+            return None, normalize_phone(phone_number)
+        if user_id is not None:
+            return user_id, None
+        raise HTTPException(status_code=400, detail="Provide user_id or phone_number.")
+
+    if phone_number or user_id is not None:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    if current_user is None:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return current_user.id, None
+
+def _owner_filter(owner: Tuple[Optional[int], Optional[str]]):
+    user_id, phone_number = owner
+    if user_id is not None:
+        return ChatHistory.user_id == user_id
+    return ChatHistory.phone_number == phone_number
+
+def _encode_cursor(ts: datetime, row_id: int) -> str:
+    raw = json.dumps([ts.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts_str, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(ts_str), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _history_row(row) -> dict:
+    return {
+        "id": row.id,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+        "user_id": row.user_id,
+        "phone_number": row.phone_number,
+        "user_input": row.user_input,
+        "ai_response": row.ai_response,
+        "mood": row.mood_tag,
+        "mood_score": row.mood_score,
+        "emotion": row.emotion_tag,
+        "personality": row.personality_tag,
+    }
+
+@router.get("/history")
+async def get_chat_history(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    user_id: Optional[int] = Query(None, description="Admin only"),
+    phone_number: Optional[str] = Query(None, description="Admin only"),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+    x_admin_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Newest-first history page. Keyset on (timestamp, id), so page N costs the same as page 1.
+    """
+    owner = _resolve_history_owner(current_user, x_admin_key, user_id, phone_number)
+
+    stmt = select(*HISTORY_COLUMNS).where(_owner_filter(owner))
+    if cursor:
+        c_ts, c_id = _decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            ChatHistory.timestamp < c_ts,
+            and_(ChatHistory.timestamp == c_ts, ChatHistory.id < c_id)
+        ))
+    # Ek row zyada mangwa kar pata chalta hai ke agla page hai ya nahi
+    stmt = stmt.order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc()).limit(limit + 1)
+
+    try:
+        rows = (await db.execute(stmt)).all()
+    except Exception as e:
+        logger.error(f"❌ History Error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not load history.")
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more and rows else None
+
+    return {
+        "status": "success",
+        "items": [_history_row(r) for r in rows],
+        "next_cursor": next_cursor
+    }
+
+@router.get("/history/export")
+async def export_chat_history(
+    user_id: Optional[int] = Query(None, description="Admin only"),
+    phone_number: Optional[str] = Query(None, description="Admin only"),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+    x_admin_key: Optional[str] = Header(None),
+):
+    """
+    Streams the full history as NDJSON (oldest first) from a server-side cursor.
+    Memory use constant rehta hai chahe user ki lakhon rows hon.
+    """
+    owner = _resolve_history_owner(current_user, x_admin_key, user_id, phone_number)
+    stmt = (
+        select(*HISTORY_COLUMNS)
+        .where(_owner_filter(owner))
+        .order_by(ChatHistory.timestamp.asc(), ChatHistory.id.asc())
+        .execution_options(yield_per=EXPORT_FETCH_SIZE)
+    )
+
+    async def ndjson_lines():
+        # Request-scoped get_db session response se pehle close ho jata hai,
+        # is liye stream apna session khud kholta hai
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(stmt)
+            async for partition in result.partitions(EXPORT_FETCH_SIZE):
+                yield "".join(json.dumps(_history_row(r), ensure_ascii=False) + "\n" for r in partition)
+
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="chat_history.ndjson"'}
+    )
+
+
+# --- 🔎 Full-Text Search (SQLite FTS5 + bm25) ---
+_fts = table(FTS_TABLE, column("rowid"))
+_fts_ref = literal_column(FTS_TABLE)
+SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_ELLIPSIS = "[", "]", "…"
+
+@router.get("/search")
+async def search_chat_history(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    user_id: Optional[int] = Query(None, description="Admin only"),
+    phone_number: Optional[str] = Query(None, description="Admin only"),
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+    x_admin_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ranked search over the caller's past conversations (bm25, best match first).
+    """
+    owner = _resolve_history_owner(current_user, x_admin_key, user_id, phone_number)
+
+    if db.bind.dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search requires SQLite FTS5.")
+
+    # Owner token MATCH ke andar hai, is liye sirf is user ke documents rank hote hain
+    match_expr = build_match_query(q, owner=owner_token(*owner))
+    if not match_expr:
+        return {"status": "success", "query": q, "items": []}
+
+    stmt = (
+        select(
+            *HISTORY_COLUMNS,
+            func.snippet(_fts_ref, 0, SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_ELLIPSIS, 12).label("input_snippet"),
+            func.snippet(_fts_ref, 1, SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_ELLIPSIS, 12).label("response_snippet"),
+            func.bm25(_fts_ref, *BM25_WEIGHTS).label("rank"),
+        )
+        .select_from(_fts.join(ChatHistory, ChatHistory.id == _fts.c.rowid))
+        .where(text(f"{FTS_TABLE} MATCH :match_expr").bindparams(match_expr=match_expr))
+        .where(_owner_filter(owner))
+        .order_by(text("rank"))
+        .limit(limit)
+    )
+
+    try:
+        rows = (await db.execute(stmt)).all()
+    except Exception as e:
+        logger.error(f"❌ Search Error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Search failed.")
+
+    items = []
+    for row in rows:
+        item = _history_row(row)
+        item.update({
+            "input_snippet": row.input_snippet,
+            "response_snippet": row.response_snippet,
+            # bm25 negative hota hai (chhota = behtar); client ke liye ulta kar dein
+            "score": round(-float(row.rank), 4)
+        })
+        items.append(item)
+
+    return {"status": "success", "query": q, "items": items}
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+import logging
+import re
+
+try:
+    from backend.ai_engine.image_gen import image_service
+except ImportError:
+    from ..ai_engine.image_gen import image_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Images"])
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+# Key content ka hash hai, is liye bytes kabhi badalte nahi
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+@router.get("/{key}")
+async def get_image(key: str):
+    """Serves a generated image from the local cache, fetching it upstream on first use."""
+    if not _KEY_RE.match(key):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    try:
+        path = await image_service.get(key)
+    except Exception:
+        raise HTTPException(status_code=502, detail="Image generation failed, try again.")
+    if not path:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    return FileResponse(
+        path,
+        media_type=image_service.content_type(path),
+        headers={"Cache-Control": IMMUTABLE_CACHE, "ETag": f'"{key}"'},
+    )
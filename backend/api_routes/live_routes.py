@@ -0,0 +1,174 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_
+from collections import defaultdict
+from typing import Dict, Set, Optional
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+import logging
+
+# 🛠️ INTERNAL IMPORTS
+try:
+    from backend.api_routes.auth_utils import authenticate_token
+    from backend.database.db import get_db
+    from backend.database.models import ChatHistory
+except ImportError:
+    from .auth_utils import authenticate_token
+    from ..database.db import get_db
+    from ..database.models import ChatHistory
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["Live Updates"])
+
+# Idle connections ko zinda rakhne ke liye comment frame (proxies 30-60s par band kar dete hain)
+HEARTBEAT_SECONDS = 20
+# Har subscriber ki queue chhoti rakhein; slow client sirf apne events khoye ga
+SUBSCRIBER_QUEUE_SIZE = 32
+# Ek user ke zyada tabs/devices hon to sab se purana connection drop hota hai
+MAX_STREAMS_PER_USER = 5
+
+
+class MoodHub:
+    """
+    In-process fan-out hub for live mood deltas.
+    Each subscriber owns a small bounded queue, so an idle SSE connection costs
+    one parked coroutine and publishing is O(streams of that user), not O(all users).
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE, max_per_user: int = MAX_STREAMS_PER_USER):
+        self.queue_size = queue_size
+        self.max_per_user = max_per_user
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._order: Dict[str, list] = defaultdict(list)
+        self.dropped_events = 0
+
+    def subscribe(self, user_key: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        order = self._order[user_key]
+        if len(order) >= self.max_per_user:
+            # Oldest stream ko close signal bhej kar hata dein
+            oldest = order.pop(0)
+            self._subscribers[user_key].discard(oldest)
+            self._offer(oldest, None)
+        self._subscribers[user_key].add(queue)
+        order.append(queue)
+        return queue
+
+    def unsubscribe(self, user_key: str, queue: asyncio.Queue) -> None:
+        self._subscribers.get(user_key, set()).discard(queue)
+        order = self._order.get(user_key)
+        if order and queue in order:
+            order.remove(queue)
+        if not self._subscribers.get(user_key):
+            self._subscribers.pop(user_key, None)
+            self._order.pop(user_key, None)
+
+    def publish(self, user_key: str, event: dict) -> int:
+        """
+        Non-blocking publish. Returns how many streams received the event.
+        """
+        delivered = 0
+        for queue in tuple(self._subscribers.get(user_key, ())):
+            if self._offer(queue, event):
+                delivered += 1
+        return delivered
+
+    def _offer(self, queue: asyncio.Queue, event: Optional[dict]) -> bool:
+        try:
+            queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.dropped_events += 1
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "streams": sum(len(s) for s in self._subscribers.values()),
+            "dropped_events": self.dropped_events,
+        }
+
+
+# --- Singleton Instance ---
+mood_hub = MoodHub()
+
+
+def publish_mood_delta(user_id: int, mood: Optional[str]) -> None:
+    """
+    Called by chat_endpoint right after a ChatHistory row is committed.
+    """
+    if not mood:
+        return
+    mood_hub.publish(str(user_id), {
+        "mood": mood,
+        "delta": 1,
+        "ts": datetime.now(timezone.utc).isoformat()
+    })
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _mood_snapshot(user_id: int, db: AsyncSession) -> dict:
+    seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    stmt = (
+        select(ChatHistory.mood_tag, func.count(ChatHistory.mood_tag))
+        .where(and_(ChatHistory.user_id == user_id, ChatHistory.timestamp >= seven_days_ago))
+        .group_by(ChatHistory.mood_tag)
+    )
+    rows = (await db.execute(stmt)).all()
+    return {
+        "labels": [str(row[0]) for row in rows if row[0]],
+        "values": [int(row[1]) for row in rows if row[0]]
+    }
+
+
+# --- 📡 Live Mood Stream (Server-Sent Events) ---
+@router.get("/mood-stream")
+async def mood_stream(
+    token: Optional[str] = Query(None, description="JWT (EventSource cannot send headers)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Pushes a 7-day snapshot once, then incremental mood deltas for every new chat.
+    Replaces re-polling /api/chat/history-stats from the dashboard.
+    """
+    current_user = authenticate_token(token)
+    if current_user is None:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    user_id = current_user.id
+    user_key = str(user_id)
+
+    # Pehle subscribe, phir snapshot: snapshot query ke dauran aane wala delta gum nahi hota.
+    # Snapshot yahin (generator se pehle), taake streaming ke dauran DB session hold na ho
+    queue = mood_hub.subscribe(user_key)
+    try:
+        snapshot = await _mood_snapshot(user_id, db)
+    except BaseException:
+        mood_hub.unsubscribe(user_key, queue)
+        raise
+
+    async def event_source():
+        try:
+            yield f"retry: 5000\n{_sse('snapshot', snapshot)}"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield _sse("mood", event)
+        finally:
+            mood_hub.unsubscribe(user_key, queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,13 +1,19 @@
 from fastapi import APIRouter, Form, Response, Depends
-from twilio.twiml.messaging_response import MessagingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import datetime, timezone
+from types import SimpleNamespace
 import logging
 
 # Database imports
 from backend.database.db import get_db
 from backend.database.models import ChatHistory
+from backend.database.fts import owner_token, normalize_phone
+from backend.api_routes.admission import Admission, whatsapp_admission
+from backend.ai_engine.deadline import (
+    request_deadline, run_within, DeadlineExceeded, DEADLINE_REPLY, PERSIST_RESERVE_SECONDS
+)
+from backend.config import WHATSAPP_DEADLINE_SECONDS
+from backend.ai_engine.post_processor import TurnJob, post_processor
 
 # Setup Logger
 logger = logging.getLogger(__name__)
@@ -15,17 +21,39 @@ logger = logging.getLogger(__name__)
 # AI Engine imports with safe fallback
 try:
     from backend.ai_engine.brain import generate_ai 
+    from backend.ai_engine.vector_memory import recall
+    from backend.ai_engine.summarizer import get_summary
+    from backend.ai_engine.fast_path import fast_responder, last_bot_reply
 except ImportError as e:
     logger.error(f"❌ Module Import Error: {e}")
-    async def generate_ai(text, context=""): 
-        return {"ai_response": "I'm currently updating my brain.", "mood": "Neutral"}
+    async def generate_ai(text, context="", memories="", summary="", history=None, channel="whatsapp", tenant=None): 
+        return SimpleNamespace(ai_response="I'm currently updating my brain.", mood="Neutral", mood_score=None,
+                               emotion="calm", personality=None, degraded=False)
+    async def recall(db, key, query, skip_recent=0): return ""
+    async def get_summary(db, user_id=None, phone_number=None): return ""
+    fast_responder = None
+    def last_bot_reply(history): return None
+
+# Recent context mein kitni purani rows jaati hain
+RECENT_CONTEXT_ROWS = 5
+
+DEGRADED_WHATSAPP_REPLY = "🙏 I'm getting a lot of messages right now. Please send that again in a minute!"
 
 router = APIRouter()
 
+
+def _twiml():
+    """Empty TwiML reply; twilio SDK pehle webhook par load hota hai, app import par nahi."""
+    from twilio.twiml.messaging_response import MessagingResponse
+    return MessagingResponse()
+
+
 @router.post("/message")
 async def handle_whatsapp(
     Body: str = Form(None), 
     From: str = Form(None), 
+    admission: Admission = Depends(whatsapp_admission),
+    _deadline: None = Depends(request_deadline(WHATSAPP_DEADLINE_SECONDS)),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -34,12 +62,18 @@ async def handle_whatsapp(
     # 1. Validation: Agar Twilio se empty request aaye
     if not Body or not From:
         logger.warning("⚠️ Received empty request from Twilio.")
-        resp = MessagingResponse()
+        resp = _twiml()
         return Response(content=str(resp), media_type="application/xml")
 
+    # Overload: Twilio ko foran canned TwiML (webhook timeout se behtar)
+    if admission.degraded:
+        busy_resp = _twiml()
+        busy_resp.message(DEGRADED_WHATSAPP_REPLY)
+        return Response(content=str(busy_resp), media_type="application/xml")
+
     user_message = Body.strip()
-    # Normalize phone number (Remove 'whatsapp:' prefix)
-    raw_phone = From.replace("whatsapp:", "") if "whatsapp:" in From else From
+    # Normalize phone number (Remove 'whatsapp:' prefix); importer bhi yehi key likhta hai
+    raw_phone = normalize_phone(From)
 
     try:
         # 2. Context Retrieval: Purani baaton ko yaad rakhne ke liye
@@ -47,43 +81,68 @@ async def handle_whatsapp(
             select(ChatHistory)
             .where(ChatHistory.phone_number == raw_phone)
             .order_by(ChatHistory.timestamp.desc())
-            .limit(5)
+            .limit(RECENT_CONTEXT_ROWS)
         )
-        result = await db.execute(stmt)
+        result = await run_within(db.execute(stmt), reserve=PERSIST_RESERVE_SECONDS)
         history_records = result.scalars().all()
 
-        context = ""
         # Reverse taake purani chat pehle aaye aur naye wali baad mein
-        for rec in reversed(history_records):
-            context += f"User: {rec.user_input}\nAI: {rec.ai_response}\n"
+        history_turns = [
+            {"user": rec.user_input, "bot": rec.ai_response}
+            for rec in reversed(history_records)
+        ]
 
         # 3. AI Engine Interaction: Response generate karna
         try:
-            brain_output = await generate_ai(user_message, context=context)
-            ai_reply = brain_output.get("ai_response", "I'm thinking...")
-            mood_label = brain_output.get("mood", "Neutral")
-            emotion_tag = brain_output.get("emotion", "calm")
-            personality_tag = brain_output.get("personality", "friendly")
+            memories, summary = "", ""
+            if not (fast_responder and fast_responder.enabled("whatsapp")
+                    and fast_responder.classify(user_message, last_bot_reply(history_turns))):
+                try:
+                    memories = await run_within(recall(db, owner_token(phone_number=raw_phone), user_message,
+                                                       skip_recent=RECENT_CONTEXT_ROWS), reserve=PERSIST_RESERVE_SECONDS)
+                    summary = await run_within(get_summary(db, phone_number=raw_phone), reserve=PERSIST_RESERVE_SECONDS)
+                except DeadlineExceeded:
+                    logger.warning("⏱️ Memory retrieval skipped: time budget exceeded.")
+            brain_output = await generate_ai(
+                user_message, history=history_turns, memories=memories, summary=summary,
+                channel="whatsapp", tenant=owner_token(phone_number=raw_phone)
+            )
+            ai_reply = brain_output.ai_response or "I'm thinking..."
+            if brain_output.degraded:
+                # Busy/deadline/error fallback: customer ko bata dein, lekin history mein save nahi
+                degraded_resp = _twiml()
+                degraded_resp.message(ai_reply)
+                return Response(content=str(degraded_resp), media_type="application/xml")
+            mood_label = brain_output.mood
+            mood_score = brain_output.mood_score
+            emotion_tag = brain_output.emotion
+            # None = post_processor reply ke baad tag karta hai
+            personality_tag = brain_output.personality
+        except DeadlineExceeded:
+            raise
         except Exception as ai_err:
             logger.error(f"❌ AI Logic Error: {ai_err}")
             ai_reply = "I'm having a bit of trouble thinking right now. Talk to you soon!"
             mood_label, emotion_tag, personality_tag = "Neutral", "error", "neutral"
+            mood_score = None
 
-        # 4. Save to Database: Rizwan, history save karna zaroori hai
-        new_chat = ChatHistory(
-            phone_number=raw_phone,
+        # 4. Save to Database: Rizwan, history save karna zaroori hai (reply ke baad, background mein)
+        job = TurnJob(
             user_input=user_message,
             ai_response=ai_reply,
-            mood_tag=mood_label,
-            emotion_tag=emotion_tag,
-            personality_tag=personality_tag,
-            timestamp=datetime.now(timezone.utc)
+            phone_number=raw_phone,
+            channel="whatsapp",
+            mood=mood_label,
+            mood_score=mood_score,
+            emotion=emotion_tag,
+            personality=personality_tag,
         )
-        db.add(new_chat)
-        await db.commit() # Database mein pakka save karein
+        if not post_processor.submit(job):
+            # Workers peeche hain: Twilio ko jawab dene se pehle khud save (reserve budget ke andar)
+            await run_within(post_processor.run_inline(job), floor=PERSIST_RESERVE_SECONDS)
 
         # 5. Build TwiML Response
-        resp = MessagingResponse()
+        resp = _twiml()
         mood_icons = {
             "Very Happy": "🌟", 
             "Happy": "😊", 
@@ -103,12 +162,20 @@ async def handle_whatsapp(
             media_type="application/xml"
         )
 
+    except DeadlineExceeded as e:
+        # Twilio timeout se pehle defined degraded jawab (history mein save nahi hota)
+        logger.warning(f"⏱️ WhatsApp deadline exceeded: {e}")
+        await db.rollback()
+        late_resp = _twiml()
+        late_resp.message(DEADLINE_REPLY)
+        return Response(content=str(late_resp), media_type="application/xml")
+
     except Exception as e:
         if db:
             await db.rollback()
         logger.error(f"❌ Critical WhatsApp Error: {e}")
         
         # Emergency Response
-        error_resp = MessagingResponse()
+        error_resp = _twiml()
         error_resp.message("🛠️ System Note: I'm rebooting a part of my brain. Talk to you in a second!")
         return Response(content=str(error_resp), media_type="application/xml")
\ No newline at end of file
@@ -5,11 +5,12 @@ import logging
 import sys
 import os
 import inspect
+import asyncio
 
 # --- 🛠️ 1. Setup Logging ---
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    format="%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
 )
 logger = logging.getLogger(__name__)
 
@@ -18,12 +19,21 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if BASE_DIR not in sys.path:
     sys.path.append(BASE_DIR)
 
+# Har log line mein [request_id] (tracing contextvar se)
+from backend.tracing import RequestIdFilter
+for _handler in logging.getLogger().handlers:
+    _handler.addFilter(RequestIdFilter())
+
 app = FastAPI(
     title="Rizwan AI Companion",
     description="An intelligent AI companion with Mood, Emotion, and Personality analysis.",
     version="1.1.0"
 )
 
+# --- 📈 Metrics: per-route latency histograms (GET /metrics) ---
+from backend.metrics import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
 # --- 📦 3. CORS Configuration ---
 app.add_middleware(
     CORSMiddleware,
@@ -33,13 +43,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- 🔭 Tracing: X-Request-ID + sampled spans/profiles ---
+# Sab se aakhir mein add hota hai taa ke outermost rahe: CORS preflights aur
+# CORS-rejected requests ko bhi request id aur span milta hai
+from backend.tracing import TracingMiddleware
+app.add_middleware(TracingMiddleware)
+
 # --- 📦 4. Router Inclusion ---
 init_db_func = None
 
 try:
     import backend.init_db as database_initializer
     # Routes import karein
-    from backend.api_routes import chat_routes, auth_routes, whatsapp_routes
+    from backend.api_routes import chat_routes, auth_routes, whatsapp_routes, live_routes, admin_routes, image_routes
     
     # Check if database initializer exists
     if hasattr(database_initializer, "init_db"):
@@ -56,6 +72,15 @@ try:
     
     # 3. WhatsApp: http://127.0.0.1:8000/whatsapp/message
     app.include_router(whatsapp_routes.router, prefix="/whatsapp", tags=["WhatsApp"])
+
+    # 4. Live Updates (SSE): http://127.0.0.1:8000/api/live/mood-stream
+    app.include_router(live_routes.router, prefix="/api/live", tags=["Live Updates"])
+
+    # 5. Generated Images (cached): http://127.0.0.1:8000/api/images/{key}
+    app.include_router(image_routes.router, prefix="/api/images", tags=["Images"])
+
+    # 6. Admin (X-Admin-Key): http://127.0.0.1:8000/admin/fast-path
+    app.include_router(admin_routes.router, prefix="/admin", tags=["Admin"])
     
     logger.info("✅ All routes loaded successfully.")
 
@@ -76,6 +101,77 @@ async def on_startup():
         except Exception as e:
             logger.error(f"❌ Failed to initialize database: {e}")
 
+    # Heavy libraries (TextBlob, groq, passlib) import par nahi, yahan aik dafa load hoti hain
+    try:
+        from backend.config import WARMUP_ON_STARTUP
+        if WARMUP_ON_STARTUP:
+            from backend.warmup import warm_up
+            await asyncio.to_thread(warm_up)
+    except Exception as e:
+        logger.error(f"❌ Warm-up failed: {e}")
+
+    # Metrics: DB query timings + queue/session gauges
+    try:
+        from backend.database.db import engine
+        from backend.metrics import install_db_metrics, install_runtime_gauges
+        install_db_metrics(engine)
+        install_runtime_gauges()
+    except Exception as e:
+        logger.error(f"❌ Failed to install metrics hooks: {e}")
+
+    # Background job: purani conversations ko rolling summaries mein compact karna
+    try:
+        from backend.ai_engine.summarizer import summary_compactor
+        summary_compactor.start()
+    except Exception as e:
+        logger.error(f"❌ Failed to start summary compactor: {e}")
+
+    # Periodic memory footprint log line (MEMORY_REPORT_INTERVAL)
+    try:
+        from backend.memory_report import memory_reporter
+        memory_reporter.start()
+    except Exception as e:
+        logger.error(f"❌ Failed to start memory reporter: {e}")
+
+    # Respond-first: history insert, personality tag aur indexing reply ke baad workers par
+    try:
+        from backend.ai_engine.post_processor import post_processor
+        post_processor.start()
+    except Exception as e:
+        logger.error(f"❌ Failed to start post-processor: {e}")
+
+    # Background job: LLM token usage ko batches mein llm_usage table mein likhna
+    try:
+        from backend.ai_engine.usage import usage_recorder
+        await usage_recorder.start()
+    except Exception as e:
+        logger.error(f"❌ Failed to start usage recorder: {e}")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    try:
+        from backend.ai_engine.summarizer import summary_compactor
+        await summary_compactor.stop()
+    except Exception as e:
+        logger.error(f"❌ Shutdown error: {e}")
+    try:
+        from backend.memory_report import memory_reporter
+        await memory_reporter.stop()
+    except Exception as e:
+        logger.error(f"❌ Shutdown error: {e}")
+    try:
+        # Queue mein bachay turns pehle save hon (POSTPROCESS_DRAIN_SECONDS tak)
+        from backend.ai_engine.post_processor import post_processor
+        await post_processor.stop()
+    except Exception as e:
+        logger.error(f"❌ Shutdown error: {e}")
+    try:
+        # Buffer mein bachi usage rows flush ho jati hain
+        from backend.ai_engine.usage import usage_recorder
+        await usage_recorder.stop()
+    except Exception as e:
+        logger.error(f"❌ Shutdown error: {e}")
+
 # --- 🏥 6. System Health Check ---
 @app.get("/", tags=["System"])
 async def root():
@@ -86,6 +182,13 @@ async def root():
         "university": "Islamia University of Bahawalpur"
     }
 
-# --- 🏃 7. Run Server ---
+# --- 📈 7. Prometheus Scrape Endpoint ---
+@app.get("/metrics", tags=["System"], include_in_schema=False)
+async def metrics():
+    from fastapi.responses import PlainTextResponse
+    from backend.metrics import registry, CONTENT_TYPE
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+# --- 🏃 8. Run Server ---
 if __name__ == "__main__":
     uvicorn.run("backend.app:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
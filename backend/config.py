@@ -15,6 +15,116 @@ BASE_DIR = Path(__file__).resolve().parent
 SQLITE_DB_PATH = os.path.join(BASE_DIR, "rizwan_ai.db")
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite+aiosqlite:///{SQLITE_DB_PATH}")
 
+# =========================
+# 🧠 Long-Term Memory (Local Vector Index)
+# =========================
+# Per-user embeddings disk par memory-mapped files mein rehti hain
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(BASE_DIR, "vector_index"))
+VECTOR_DIM = int(os.getenv("VECTOR_DIM", "512"))
+RECALL_TOP_K = int(os.getenv("RECALL_TOP_K", "3"))
+RECALL_TOKEN_BUDGET = int(os.getenv("RECALL_TOKEN_BUDGET", "300"))
+RECALL_MIN_SCORE = float(os.getenv("RECALL_MIN_SCORE", "0.12"))
+
+# =========================
+# 📝 Conversation Summaries (Background Compaction)
+# =========================
+SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "extractive")  # "extractive" ya "llm"
+SUMMARY_INTERVAL_SECONDS = int(os.getenv("SUMMARY_INTERVAL_SECONDS", "300"))
+SUMMARY_KEEP_RECENT = int(os.getenv("SUMMARY_KEEP_RECENT", "10"))   # short-term window
+SUMMARY_MIN_SPAN = int(os.getenv("SUMMARY_MIN_SPAN", "10"))
+SUMMARY_MAX_SPAN = int(os.getenv("SUMMARY_MAX_SPAN", "200"))
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "1200"))
+
+# =========================
+# 🤖 Groq LLM
+# =========================
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Load tests ke liye local stand-in (benchmarks/mock_groq.py); khali ho to asal Groq API
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+# =========================
+# 🚀 Startup
+# =========================
+# Heavy libraries (TextBlob lexicon, groq SDK, passlib) startup par load; CLI tools inhe kabhi import nahi karte
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+
+# =========================
+# ⚡ Fast-Path Responder (LLM skip for greetings/thanks/ok)
+# =========================
+FAST_PATH_CHANNELS = {
+    ch.strip() for ch in os.getenv("FAST_PATH_CHANNELS", "web,whatsapp").split(",") if ch.strip()
+}
+
+# =========================
+# 🚦 LLM Dispatch Scheduler (Groq shared rate limit)
+# =========================
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_RPM = int(os.getenv("LLM_RPM", "30"))            # provider requests/minute
+LLM_TPM = int(os.getenv("LLM_TPM", "6000"))          # provider tokens/minute
+LLM_MAX_QUEUE_WAIT = float(os.getenv("LLM_MAX_QUEUE_WAIT", "20"))
+LLM_MAX_QUEUED_PER_TENANT = int(os.getenv("LLM_MAX_QUEUED_PER_TENANT", "3"))
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "300"))
+
+# =========================
+# 📊 LLM Usage Accounting & Daily Budgets
+# =========================
+USER_DAILY_TOKEN_BUDGET = int(os.getenv("USER_DAILY_TOKEN_BUDGET", "50000"))  # 0 = unlimited
+OVER_BUDGET_MAX_TOKENS = int(os.getenv("OVER_BUDGET_MAX_TOKENS", "256"))
+OVER_BUDGET_MODEL = os.getenv("OVER_BUDGET_MODEL", "llama-3.1-8b-instant")     # sasta model
+USAGE_FLUSH_SECONDS = float(os.getenv("USAGE_FLUSH_SECONDS", "5"))
+USAGE_BATCH_SIZE = int(os.getenv("USAGE_BATCH_SIZE", "200"))
+
+# =========================
+# 🚧 Admission Control (load shedding)
+# =========================
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))   # is se upar reject
+ADMISSION_SOFT_LIMIT = int(os.getenv("ADMISSION_SOFT_LIMIT", "32"))         # is se upar canned reply
+CHAT_LATENCY_TARGET = float(os.getenv("CHAT_LATENCY_TARGET", "10"))
+WHATSAPP_LATENCY_TARGET = float(os.getenv("WHATSAPP_LATENCY_TARGET", "8"))
+
+# =========================
+# ⏱️ Request Deadlines (per channel)
+# =========================
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "25"))
+WHATSAPP_DEADLINE_SECONDS = float(os.getenv("WHATSAPP_DEADLINE_SECONDS", "12"))  # Twilio ~15s timeout
+PERSIST_RESERVE_SECONDS = float(os.getenv("PERSIST_RESERVE_SECONDS", "1.5"))    # DB save ke liye
+
+# =========================
+# 📮 Deferred Post-Processing (after the reply is sent)
+# =========================
+POSTPROCESS_WORKERS = int(os.getenv("POSTPROCESS_WORKERS", "2"))
+POSTPROCESS_QUEUE_SIZE = int(os.getenv("POSTPROCESS_QUEUE_SIZE", "1000"))   # full ho to request khud persist karti hai
+POSTPROCESS_MAX_RETRIES = int(os.getenv("POSTPROCESS_MAX_RETRIES", "3"))
+POSTPROCESS_RETRY_BASE_SECONDS = float(os.getenv("POSTPROCESS_RETRY_BASE_SECONDS", "0.5"))
+POSTPROCESS_DRAIN_SECONDS = float(os.getenv("POSTPROCESS_DRAIN_SECONDS", "10"))  # shutdown par baqi jobs
+
+# =========================
+# 🧮 Memory Footprint (per worker)
+# =========================
+MEMORY_MAX_SESSIONS = int(os.getenv("MEMORY_MAX_SESSIONS", "5000"))       # short-term sessions (LRU), 0 = unlimited
+MEMORY_REPORT_INTERVAL = float(os.getenv("MEMORY_REPORT_INTERVAL", "600")) # periodic log line, 0 = off
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "10"))
+
+# =========================
+# 🔭 Tracing & Profiling (opt-in, 0 = off)
+# =========================
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))       # 0.0-1.0 requests ko trace karna
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(BASE_DIR, "traces", "spans.jsonl"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))   # traced requests ka hissa jo profile hota hai
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_STACKS = int(os.getenv("PROFILE_MAX_STACKS", "20000"))
+
+# =========================
+# 🎨 Image Generation (Content-Addressed Cache)
+# =========================
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(BASE_DIR, "image_cache"))
+IMAGE_FETCHER = os.getenv("IMAGE_FETCHER", "pollinations")  # "pollinations" ya "stub" (tests)
+IMAGE_SIZE = int(os.getenv("IMAGE_SIZE", "1024"))
+IMAGE_MODEL = os.getenv("IMAGE_MODEL", "flux")
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", "90"))
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+
 # =========================
 # 🔐 Security Configuration
 # =========================
@@ -23,6 +133,18 @@ SECRET_KEY = os.getenv("SECRET_KEY", "rizwan_super_secret_key_2026")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours validity
 
+# Password hashing (PBKDF2 work factor + dedicated thread pool)
+PBKDF2_ROUNDS = int(os.getenv("PBKDF2_ROUNDS", "29000"))
+HASH_CONCURRENCY = int(os.getenv("HASH_CONCURRENCY", "2"))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))
+
+# Verified JWT claims ka chhota cache (signature har request par verify na ho)
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+
+# Support/ops endpoints (X-Admin-Key header). Khali ho to admin access band hai
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+
 # =========================
 # 🤖 AI API Configuration (Gemini)
 # =========================
@@ -1,30 +0,0 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import datetime
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///./rizwan_ai.db"
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# Chat History Table
-class ChatHistory(Base):
-    __tablename__ = "chat_history"
-    id = Column(Integer, primary_key=True, index=True)
-    phone_number = Column(String)
-    user_message = Column(Text)
-    ai_response = Column(Text)
-    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
-
-# Database tables banana
-Base.metadata.create_all(bind=engine)
-
-# Database session get karne ke liye function
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
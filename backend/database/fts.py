@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import logging
+import re
+import sys
+import os
+
+# --- 🛠️ Path Fix (CLI: python -m backend.database.fts rebuild) ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# 🔎 FTS5 Schema (SQLite only)
+# =========================
+# External-content table: text sirf chat_history mein rehta hai, FTS mein sirf index.
+# Content ek VIEW hai jo har row ka owner token ('u<user_id>' / 'p<phone>') bhi deta hai,
+# taake user/phone filter FTS ke andar posting-list intersection ban jaye.
+FTS_TABLE = "chat_history_fts"
+FTS_SOURCE_VIEW = "chat_history_fts_src"
+
+_OWNER_SQL = "CASE WHEN {p}.user_id IS NOT NULL THEN 'u' || {p}.user_id ELSE 'p' || COALESCE({p}.phone_number, '') END"
+
+FTS_VIEW = f"""
+CREATE VIEW IF NOT EXISTS {FTS_SOURCE_VIEW} AS
+SELECT id, user_input, ai_response, {_OWNER_SQL.format(p="chat_history")} AS owner
+FROM chat_history
+"""
+
+FTS_CREATE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    user_input,
+    ai_response,
+    owner,
+    content='{FTS_SOURCE_VIEW}',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+# Write path ko chhuye baghair triggers index ko sync rakhte hain
+FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS chat_history_fts_ai AFTER INSERT ON chat_history BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, user_input, ai_response, owner)
+        VALUES (new.id, new.user_input, new.ai_response, {_OWNER_SQL.format(p="new")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS chat_history_fts_ad AFTER DELETE ON chat_history BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, user_input, ai_response, owner)
+        VALUES ('delete', old.id, old.user_input, old.ai_response, {_OWNER_SQL.format(p="old")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS chat_history_fts_au
+    AFTER UPDATE OF user_input, ai_response, user_id, phone_number ON chat_history BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, user_input, ai_response, owner)
+        VALUES ('delete', old.id, old.user_input, old.ai_response, {_OWNER_SQL.format(p="old")});
+        INSERT INTO {FTS_TABLE}(rowid, user_input, ai_response, owner)
+        VALUES (new.id, new.user_input, new.ai_response, {_OWNER_SQL.format(p="new")});
+    END
+    """,
+]
+
+# bm25 column weights: owner token ranking par asar na daale
+BM25_WEIGHTS = (1.0, 0.75, 0.0)
+
+FTS_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+FTS_OPTIMIZE = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+_PHONE_NOISE_RE = re.compile(r"[\s\-().\u200e\u200f\u202a-\u202e]")
+
+
+def normalize_phone(raw: str) -> str:
+    """
+    Canonical chat_history.phone_number: 'whatsapp:' prefix aur formatting hata kar.
+    Twilio '+923001234567' bhejta hai, exports '+92 300-1234567' likhte hain; dono same key.
+    """
+    return _PHONE_NOISE_RE.sub("", (raw or "").replace("whatsapp:", ""))
+
+
+def owner_token(user_id=None, phone_number=None) -> str:
+    """Same owner value that the FTS view/triggers store for a row."""
+    if user_id is not None:
+        return f"u{int(user_id)}"
+    return f"p{phone_number or ''}"
+
+
+def owner_clause(token: str):
+    """ChatHistory WHERE clause for an owner token (owner_token ka ulta)."""
+    from sqlalchemy import and_
+    from backend.database.models import ChatHistory
+
+    if token.startswith("u"):
+        return ChatHistory.user_id == int(token[1:])
+    return and_(ChatHistory.user_id.is_(None), ChatHistory.phone_number == (token[1:] or None))
+
+
+def build_match_query(query: str, owner: str = "", prefix_last: bool = True) -> str:
+    """
+    Converts free user text into a safe FTS5 MATCH expression.
+    Har word quoted phrase ban jata hai (AND semantics), taake user input
+    FTS5 syntax errors (", *, NEAR, -) trigger na kar sake.
+    """
+    tokens = _TOKEN_RE.findall(query or "")[:16]
+    if not tokens:
+        return ""
+    parts = [f'"{t}"' for t in tokens]
+    # Chhote prefixes bohat saare terms expand karte hain; 3+ chars par hi prefix match
+    if prefix_last and len(tokens[-1]) >= 3:
+        parts[-1] += "*"
+    expr = "{user_input ai_response} : (" + " ".join(parts) + ")"
+    if owner:
+        safe_owner = owner.replace('"', '""')
+        expr = f'owner : "{safe_owner}" AND {expr}'
+    return expr
+
+
+def fts_available(sync_conn) -> bool:
+    if sync_conn.dialect.name != "sqlite":
+        return False
+    try:
+        rows = sync_conn.exec_driver_sql("PRAGMA compile_options").fetchall()
+        return any("ENABLE_FTS5" in str(r[0]) for r in rows)
+    except Exception:
+        return False
+
+
+def ensure_fts(sync_conn) -> bool:
+    """
+    Creates the FTS5 table and sync triggers. Called from init_db via run_sync.
+    Naya index bane to existing rows ek dafa backfill ho jati hain.
+    """
+    if not fts_available(sync_conn):
+        logger.warning("⚠️ SQLite FTS5 not available; /api/chat/search disabled.")
+        return False
+
+    existed = sync_conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (FTS_TABLE,)
+    ).first() is not None
+
+    sync_conn.exec_driver_sql(FTS_VIEW)
+    sync_conn.exec_driver_sql(FTS_CREATE)
+    for trigger in FTS_TRIGGERS:
+        sync_conn.exec_driver_sql(trigger)
+
+    if not existed:
+        sync_conn.exec_driver_sql(FTS_REBUILD)
+        print(f"🔎 Built full-text index '{FTS_TABLE}' from existing chat history.")
+    return True
+
+
+def drop_fts(sync_conn) -> None:
+    """Drops the FTS table, view and triggers (init_db reset; drop_all inhein nahi janta)."""
+    if sync_conn.dialect.name != "sqlite":
+        return
+    for name in ("chat_history_fts_ai", "chat_history_fts_ad", "chat_history_fts_au"):
+        sync_conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    sync_conn.exec_driver_sql(f"DROP VIEW IF EXISTS {FTS_SOURCE_VIEW}")
+    sync_conn.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def rebuild_fts(sync_conn) -> None:
+    sync_conn.exec_driver_sql(FTS_REBUILD)
+    sync_conn.exec_driver_sql(FTS_OPTIMIZE)
+
+
+# =========================
+# 🛠️ CLI
+# =========================
+async def _run(command: str) -> None:
+    from backend.database.db import engine
+
+    async with engine.begin() as conn:
+        if not await conn.run_sync(ensure_fts):
+            print("❌ FTS5 is not available for this database.")
+            return
+        if command == "rebuild":
+            await conn.run_sync(rebuild_fts)
+            print("✅ Full-text index rebuilt and optimized.")
+        elif command == "optimize":
+            await conn.exec_driver_sql(FTS_OPTIMIZE)
+            print("✅ Full-text index optimized.")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the chat history full-text index.")
+    parser.add_argument("command", choices=["rebuild", "optimize"])
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(_run(args.command))
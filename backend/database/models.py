@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import sys
@@ -44,6 +44,8 @@ class ChatHistory(Base):
     ai_response = Column(Text, nullable=False)
     
     mood_tag = Column(String(50), nullable=True, index=True) 
+    # Polarity score [-1.0, 1.0] from MoodAnalyzer, trend analytics ke liye
+    mood_score = Column(Float, nullable=True)
     emotion_tag = Column(String(50), nullable=True)
     personality_tag = Column(String(50), nullable=True) 
 
@@ -51,6 +53,80 @@ class ChatHistory(Base):
 
     user = relationship("User", back_populates="chats")
 
+    __table_args__ = (
+        # Per-user time range scans (stats, trends) index se hi resolve hon
+        Index("ix_chat_history_user_ts", "user_id", "timestamp"),
+        # WhatsApp numbers ke liye same keyset/range access path
+        Index("ix_chat_history_phone_ts", "phone_number", "timestamp"),
+    )
+
+# --- 📝 Conversation Summary Model (Long-Term Memory) ---
+class ConversationSummary(Base):
+    """
+    Rolling summary of turns that have scrolled out of the short-term window.
+    One row per web user (user_id) or WhatsApp number (phone_number).
+    """
+    __tablename__ = "conversation_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, unique=True)
+    phone_number = Column(String(20), nullable=True, unique=True)
+
+    summary = Column(Text, nullable=False, default="")
+    # Is id tak ki ChatHistory rows summary mein shamil ho chuki hain
+    last_chat_id = Column(Integer, nullable=False, default=0)
+    turns_summarized = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
+
+# --- 📊 LLM Usage Model (Cost Accounting) ---
+class LLMUsage(Base):
+    """
+    One row per provider call (each model attempt). Batches mein likha jata hai,
+    chat ke critical path par nahi.
+    """
+    __tablename__ = "llm_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Owner token: 'u<user_id>', 'p<phone>' ya 'background'
+    tenant = Column(String(40), nullable=False)
+    channel = Column(String(20), nullable=True)
+    model = Column(String(60), nullable=False)
+
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False, default="ok")   # ok / error / timeout / rate_limited
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+    __table_args__ = (
+        Index("ix_llm_usage_tenant_ts", "tenant", "created_at"),
+    )
+
+# --- 🔁 Re-analysis Checkpoint (Offline Jobs) ---
+class ReanalysisCheckpoint(Base):
+    """
+    Progress of an offline re-analysis run (backend/reanalyze.py), one row per job name.
+    Har batch ke saath isi transaction mein update hota hai, is liye crash ke baad resume wahin se.
+    """
+    __tablename__ = "reanalysis_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job = Column(String(50), unique=True, nullable=False)
+    # Is id tak ki rows ho chuki hain; target_id run shuru hone par max(id) tha
+    last_chat_id = Column(Integer, nullable=False, default=0)
+    target_id = Column(Integer, nullable=False, default=0)
+    rows_scanned = Column(Integer, nullable=False, default=0)
+    rows_updated = Column(Integer, nullable=False, default=0)
+
+    started_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime, nullable=True)
+
 def init_models(engine):
     Base.metadata.create_all(bind=engine)
     print("🚀 [Database] Tables initialized successfully.")
\ No newline at end of file
@@ -0,0 +1,520 @@
+"""
+Bulk import of chat history: WhatsApp "Export chat" text files and legacy NDJSON
+(the format GET /api/chat/history/export writes).
+
+File line by line parhi jati hai (poori file kabhi memory mein nahi), messages turns mein
+jorte hain (customer ke messages = user_input, baqi sab = ai_response), analysis process pool
+par batches mein, aur inserts executemany se. Transaction row count ya --commit-seconds (jo pehle ho)
+par commit hoti hai, taake SQLite writer lock live app ke busy timeout se zyada na ruke. Memory
+batch size, pipeline depth aur per-message size caps se bounded hai, file size se nahi.
+
+Supported WhatsApp line formats (Android and iOS, 12h/24h, D/M/Y or M/D/Y):
+    31/12/2023, 21:15 - Ali: message
+    12/31/23, 9:15 PM - Ali: message
+    [31/12/2023, 21:15:42] Ali: message
+
+Usage (from the project root):
+    python -m backend.import_history chat.txt --phone "+92 300 1234567" --customer "Ali"
+    python -m backend.import_history export.ndjson --format ndjson --workers 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# --- 🛠️ Path Fix (CLI: python backend/import_history.py) ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from sqlalchemy import and_, insert, select
+
+from backend.database.db import engine, AsyncSessionLocal
+from backend.database.fts import normalize_phone, owner_token
+from backend.database.models import ChatHistory
+from backend.reanalyze import init_worker, score_chunk
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_COMMIT_EVERY = 20000
+# Live app ke inserts (post_processor) ~5s busy timeout tak lock ka intezar karte hain
+DEFAULT_COMMIT_SECONDS = 1.0
+SNIFF_LINES = 5000
+# Memory caps (characters): aik message, aur turn ka har hissa. Is se aage ka text count ho kar chhorta hai
+MAX_MESSAGE_CHARS = 64 * 1024
+MAX_TURN_CHARS = 256 * 1024
+
+# =========================
+# 📄 WhatsApp Export Parsing
+# =========================
+_HEADER_RE = re.compile(
+    r"^\[?(?P<date>\d{1,4}[./-]\d{1,2}[./-]\d{1,4}),?\s+"
+    r"(?P<time>\d{1,2}[:.]\d{2}(?:[:.]\d{2})?(?:\s*[AaPp]\.?\s*[Mm]\.?)?)\]?"
+    r"(?:\s+[-–])?\s+(?P<rest>.*)$"
+)
+_SENDER_RE = re.compile(r"^(?P<sender>[^:]{1,80}?):\s(?P<text>.*)$")
+# Export ke invisible direction marks aur narrow no-break space (iOS "9:15 PM")
+_INVISIBLE = str.maketrans({"\u200e": None, "\u200f": None, "\u202a": None, "\u202c": None,
+                            "\ufeff": None, "\u202f": " ", "\xa0": " "})
+_MEDIA_MARKERS = (
+    "<media omitted>", "image omitted", "video omitted", "audio omitted", "sticker omitted",
+    "document omitted", "gif omitted", "contact card omitted",
+    "this message was deleted", "you deleted this message",
+)
+
+
+class ParseStats:
+    __slots__ = ("lines", "bytes", "messages", "system_lines", "media_skipped", "orphan_replies", "turns",
+                 "truncated_lines", "truncated_replies", "duplicates_skipped")
+
+    def __init__(self):
+        self.lines = self.bytes = self.messages = self.system_lines = 0
+        self.media_skipped = self.orphan_replies = self.turns = 0
+        self.truncated_lines = self.truncated_replies = self.duplicates_skipped = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _clean(line: str) -> str:
+    line = line.rstrip("\r\n")
+    # Zyada tar lines ASCII hoti hain; translate sirf jahan zaroorat ho
+    return line if line.isascii() else line.translate(_INVISIBLE)
+
+
+def sniff_date_order(path: str, limit: int = SNIFF_LINES) -> str:
+    """'dmy', 'mdy' or 'ymd' from the first lines (a part > 12 decides); Pakistani exports default to dmy."""
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        for i, line in enumerate(f):
+            if i >= limit:
+                break
+            match = _HEADER_RE.match(_clean(line))
+            if not match:
+                continue
+            parts = [int(p) for p in re.split(r"[./-]", match.group("date"))]
+            if len(str(parts[0])) == 4:
+                return "ymd"
+            if parts[0] > 12:
+                return "dmy"
+            if parts[1] > 12:
+                return "mdy"
+    return "dmy"
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(date_str: str, order: str) -> date:
+    a, b, c = (int(p) for p in re.split(r"[./-]", date_str))
+    if order == "ymd" or a > 999:
+        year, month, day = a, b, c
+    elif order == "mdy":
+        month, day, year = a, b, c
+    else:
+        day, month, year = a, b, c
+    return date(year + 2000 if year < 100 else year, month, day)
+
+
+@lru_cache(maxsize=4096)
+def _parse_clock(time_str: str) -> dtime:
+    clock = time_str.lower().replace(".", ":").replace(" ", "")
+    meridiem = None
+    for suffix in ("a:m:", "p:m:", "am", "pm"):
+        if clock.endswith(suffix):
+            meridiem, clock = suffix[0], clock[: -len(suffix)]
+            break
+    hms = [int(p) for p in clock.split(":") if p]
+    hour, minute, second = hms[0], hms[1], hms[2] if len(hms) > 2 else 0
+    if meridiem == "p" and hour < 12:
+        hour += 12
+    elif meridiem == "a" and hour == 12:
+        hour = 0
+    return dtime(hour, minute, second, tzinfo=timezone.utc)
+
+
+def parse_timestamp(date_str: str, time_str: str, order: str, utc_offset: timedelta) -> datetime:
+    # Export mein hazaron messages same din/minute ke hote hain: dono hisse cached
+    # Export local time mein hota hai; DB UTC rakhta hai
+    return datetime.combine(_parse_date(date_str, order), _parse_clock(time_str)) - utc_offset
+
+
+def iter_messages(lines: Iterable[str], order: str, utc_offset: timedelta,
+                  stats: ParseStats) -> Iterator[Tuple[datetime, str, str]]:
+    """Yields (timestamp, sender, text); continuation lines belong to the previous message."""
+    # current = [timestamp, sender, lines, chars]
+    current: Optional[List] = None
+    for raw in lines:
+        stats.lines += 1
+        stats.bytes += len(raw)
+        line = _clean(raw)
+        header = _HEADER_RE.match(line)
+        if header is None:
+            if current is not None:
+                if current[3] + len(line) <= MAX_MESSAGE_CHARS:
+                    current[2].append(line)
+                    current[3] += len(line) + 1
+                else:
+                    stats.truncated_lines += 1
+            continue
+
+        if current is not None:
+            yield current[0], current[1], "\n".join(current[2]).strip()
+            current = None
+
+        sender = _SENDER_RE.match(header.group("rest"))
+        if sender is None:
+            # "Messages and calls are end-to-end encrypted", group changes, etc.
+            stats.system_lines += 1
+            continue
+        try:
+            ts = parse_timestamp(header.group("date"), header.group("time"), order, utc_offset)
+        except ValueError:
+            stats.system_lines += 1
+            continue
+        text = sender.group("text")[:MAX_MESSAGE_CHARS]
+        current = [ts, sender.group("sender").strip(), [text], len(text)]
+
+    if current is not None:
+        yield current[0], current[1], "\n".join(current[2]).strip()
+
+
+def iter_whatsapp_turns(lines: Iterable[str], customer: str, phone: str, order: str,
+                        utc_offset: timedelta, stats: ParseStats) -> Iterator[dict]:
+    """
+    Customer ke lagataar messages aik user_input, us ke baad ke replies aik ai_response.
+    Pehle customer message se pehle ke replies (orphans) skip hote hain.
+    """
+    customer_key = customer.strip().casefold()
+    customer_phone = normalize_phone(customer) if re.search(r"\d", customer) else None
+    user_parts: List[str] = []
+    bot_parts: List[str] = []
+    user_chars = bot_chars = 0
+    started_at: Optional[datetime] = None
+
+    def flush() -> Optional[dict]:
+        if not user_parts:
+            return None
+        stats.turns += 1
+        return {"phone_number": phone, "user_id": None, "user_input": "\n".join(user_parts),
+                "ai_response": "\n".join(bot_parts), "timestamp": started_at,
+                "mood_tag": None, "mood_score": None, "emotion_tag": None, "personality_tag": None}
+
+    for ts, sender, text in iter_messages(lines, order, utc_offset, stats):
+        stats.messages += 1
+        if not text or text.casefold() in _MEDIA_MARKERS:
+            stats.media_skipped += 1
+            continue
+        # Export mein customer naam ya number dono ho sakte hain
+        is_customer = sender.casefold() == customer_key or (
+            customer_phone is not None and normalize_phone(sender) == customer_phone)
+        if is_customer:
+            # Bohat lamba customer block naye turn mein chala jata hai (kuch nahi chhorta)
+            if bot_parts or user_chars + len(text) > MAX_TURN_CHARS:
+                turn = flush()
+                if turn:
+                    yield turn
+                user_parts, bot_parts, user_chars, bot_chars = [], [], 0, 0
+            if not user_parts:
+                started_at = ts
+            user_parts.append(text)
+            user_chars += len(text) + 1
+        elif user_parts:
+            if bot_chars + len(text) <= MAX_TURN_CHARS:
+                bot_parts.append(text)
+                bot_chars += len(text) + 1
+            else:
+                stats.truncated_replies += 1
+        else:
+            stats.orphan_replies += 1
+
+    turn = flush()
+    if turn:
+        yield turn
+
+
+# =========================
+# 📜 Legacy NDJSON
+# =========================
+def iter_ndjson_turns(lines: Iterable[str], stats: ParseStats, phone: Optional[str] = None) -> Iterator[dict]:
+    """Rows from /api/chat/history/export (id is dropped; the database assigns new ones)."""
+    for raw in lines:
+        stats.lines += 1
+        stats.bytes += len(raw)
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            item = json.loads(raw)
+            ts = datetime.fromisoformat(item["timestamp"]) if item.get("timestamp") else datetime.now(timezone.utc)
+            row = {
+                "user_id": None if phone else item.get("user_id"),
+                "phone_number": phone or (normalize_phone(item["phone_number"]) if item.get("phone_number") else None),
+                "user_input": item["user_input"],
+                "ai_response": item.get("ai_response") or "",
+                "timestamp": ts,
+                "mood_tag": item.get("mood"),
+                "mood_score": item.get("mood_score"),
+                "emotion_tag": item.get("emotion"),
+                "personality_tag": item.get("personality"),
+            }
+        except (ValueError, KeyError, TypeError):
+            stats.system_lines += 1
+            continue
+        if row["user_id"] is None and not row["phone_number"]:
+            stats.system_lines += 1
+            continue
+        stats.messages += 1
+        stats.turns += 1
+        yield row
+
+
+# =========================
+# 🚚 Import Pipeline
+# =========================
+def _batched(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _apply_scores(batch: List[dict], scored) -> None:
+    for index, mood, score, emotion, personality in scored:
+        row = batch[index]
+        row.update(mood_tag=mood, mood_score=score, emotion_tag=emotion, personality_tag=personality)
+
+
+async def drop_existing(batch: List[dict], stats: ParseStats) -> List[dict]:
+    """
+    Skips turns already stored for the same owner with the same (timestamp, user_input).
+    Sirf batch ki time window query hoti hai, is liye re-import ya live webhook rows ke saath
+    overlap mein bhi purani history poori aati hai.
+    """
+    owners: Dict[Tuple[Optional[int], Optional[str]], List[dict]] = {}
+    for row in batch:
+        owners.setdefault((row["user_id"], row["phone_number"]), []).append(row)
+
+    existing = set()
+    async with AsyncSessionLocal() as db:
+        for (user_id, phone), rows in owners.items():
+            stamps = [_naive_utc(r["timestamp"]) for r in rows]
+            owner = ChatHistory.user_id == user_id if user_id is not None else and_(
+                ChatHistory.user_id.is_(None), ChatHistory.phone_number == phone)
+            result = await db.execute(
+                select(ChatHistory.timestamp, ChatHistory.user_input)
+                .where(owner, ChatHistory.timestamp.between(min(stamps), max(stamps)))
+            )
+            existing.update((user_id, phone, ts, text) for ts, text in result)
+
+    if not existing:
+        return batch
+    kept = [r for r in batch
+            if (r["user_id"], r["phone_number"], _naive_utc(r["timestamp"]), r["user_input"]) not in existing]
+    stats.duplicates_skipped += len(batch) - len(kept)
+    return kept
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    # SQLite DateTime column naive UTC wapas deta hai
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo is not None else ts
+
+
+async def import_rows(rows: Iterator[dict], stats: ParseStats, workers: int = 1,
+                      batch_size: int = DEFAULT_BATCH_SIZE, commit_every: int = DEFAULT_COMMIT_EVERY,
+                      commit_seconds: float = DEFAULT_COMMIT_SECONDS, analyze: bool = True,
+                      rescore: bool = False, index_vectors: bool = False, dedupe: bool = True) -> dict:
+    loop = asyncio.get_running_loop()
+    inserted = committed = 0
+    started = time.perf_counter()
+    batches = _batched(rows, batch_size)
+    # Core insert (ORM bulk machinery ke baghair); id sirf vector indexing ke liye wapas
+    table = ChatHistory.__table__
+    stmt = insert(table)
+    if index_vectors:
+        from backend.ai_engine.vector_memory import _turn_text
+        stmt = stmt.returning(table.c.id, sort_by_parameter_order=True)
+
+    pool = None
+    if analyze:
+        # spawn: reanalyze jaisa; workers app ke engine/threads fork nahi karte
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=init_worker)
+
+    def report(final: bool = False) -> None:
+        elapsed = time.perf_counter() - started
+        rate = inserted / elapsed if elapsed else 0.0
+        mb_rate = stats.bytes / 2**20 / elapsed if elapsed else 0.0
+        print(f"{'✅' if final else '  '} lines={stats.lines:,} turns={inserted:,} committed={committed:,} "
+              f"{rate:,.0f} turns/s {mb_rate:.1f} MB/s")
+
+    db = AsyncSessionLocal()
+    # (owner key, chat id, text): sirf commit ke baad index hote hain. Rollback ke baad SQLite
+    # wahi ids dobara deta hai, is liye uncommitted ids index mein doosre owner ke ban sakte the
+    to_index: List[Tuple[str, int, str]] = []
+    tx_started: Optional[float] = None
+
+    async def commit() -> None:
+        nonlocal committed, tx_started
+        await db.commit()
+        committed, tx_started = inserted, None
+        if to_index:
+            _index_rows(to_index)
+            to_index.clear()
+        report()
+
+    async def write(batch: List[dict]) -> None:
+        nonlocal inserted, tx_started
+        if tx_started is None:
+            tx_started = time.perf_counter()
+        # executemany: aik statement poore batch ke liye
+        result = await db.execute(stmt, batch)
+        if index_vectors:
+            to_index.extend(
+                (owner_token(row["user_id"], row["phone_number"]), chat_id,
+                 _turn_text(row["user_input"], row["ai_response"]))
+                for row, (chat_id,) in zip(batch, result)
+            )
+        inserted += len(batch)
+        if inserted - committed >= commit_every or time.perf_counter() - tx_started >= commit_seconds:
+            await commit()
+
+    inflight: Optional[asyncio.Task] = None
+    try:
+        pending = deque()
+        exhausted = False
+        while True:
+            # Parsing thread par, scoring pool par, insert aiosqlite thread par: teeno saath chalte hain.
+            # Pool ke liye 2x workers batches pipeline mein
+            while not exhausted and len(pending) < max(1, workers) * 2:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                # Dedupe scoring se pehle, taake pehle se maujood turns par pool waqt zaya na kare
+                if dedupe:
+                    batch = await drop_existing(batch, stats)
+                    if not batch:
+                        continue
+                to_score = [(i, r["user_input"]) for i, r in enumerate(batch)
+                            if pool is not None and (rescore or r["mood_tag"] is None)]
+                future = loop.run_in_executor(pool, score_chunk, to_score) if to_score else None
+                pending.append((batch, future))
+                if inflight is not None and inflight.done():
+                    break
+            if not pending:
+                break
+
+            batch, future = pending.popleft()
+            if future is not None:
+                if not future.done():
+                    # Scoring ka intezar writer lock pakar kar nahi: khuli transaction pehle commit
+                    if inflight is not None:
+                        await inflight
+                        inflight = None
+                    if inserted > committed:
+                        await commit()
+                _apply_scores(batch, await future)
+            # Session aik waqt mein aik hi statement; pichla insert khatam hone do
+            if inflight is not None:
+                await inflight
+            inflight = asyncio.create_task(write(batch))
+
+        if inflight is not None:
+            await inflight
+            inflight = None
+        await commit()
+    finally:
+        if inflight is not None:
+            inflight.cancel()
+        await db.close()
+        if pool is not None:
+            pool.shutdown()
+
+    report(final=True)
+    elapsed = time.perf_counter() - started
+    return {
+        **stats.to_dict(),
+        "inserted": inserted,
+        "seconds": round(elapsed, 2),
+        "turns_per_second": round(inserted / elapsed, 1) if elapsed else 0.0,
+        "lines_per_second": round(stats.lines / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def _index_rows(rows: List[Tuple[str, int, str]]) -> None:
+    from backend.ai_engine.vector_memory import vector_index
+
+    grouped: Dict[str, List[Tuple[int, str]]] = {}
+    for key, chat_id, text in rows:
+        grouped.setdefault(key, []).append((chat_id, text))
+    for key, items in grouped.items():
+        vector_index.add_many(key, items)
+
+
+async def run(args) -> dict:
+    stats = ParseStats()
+    phone = normalize_phone(args.phone) if args.phone else None
+
+    with open(args.path, encoding="utf-8-sig", errors="replace") as f:
+        if args.format == "ndjson":
+            rows = iter_ndjson_turns(f, stats, phone=phone)
+        else:
+            order = args.date_order if args.date_order != "auto" else sniff_date_order(args.path)
+            print(f"📥 Importing {args.path} for {phone} (dates {order})")
+            rows = iter_whatsapp_turns(f, args.customer, phone, order, timedelta(hours=args.utc_offset), stats)
+        result = await import_rows(
+            rows, stats, workers=args.workers, batch_size=args.batch_size, commit_every=args.commit_every,
+            commit_seconds=args.commit_seconds, analyze=not args.skip_analysis, rescore=args.rescore,
+            index_vectors=args.index_vectors, dedupe=not args.no_dedupe,
+        )
+    await engine.dispose()
+    print(json.dumps(result, indent=2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["whatsapp", "ndjson"], default="whatsapp")
+    parser.add_argument("--phone", help="Customer's WhatsApp number (required for WhatsApp exports)")
+    parser.add_argument("--customer", help="Customer's name or number as it appears in the export")
+    parser.add_argument("--date-order", choices=["auto", "dmy", "mdy", "ymd"], default="auto")
+    parser.add_argument("--utc-offset", type=float, default=0.0, help="Export's local time offset in hours (PKT = 5)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per analysis batch and executemany")
+    parser.add_argument("--commit-every", type=int, default=DEFAULT_COMMIT_EVERY, help="Max rows per transaction")
+    parser.add_argument("--commit-seconds", type=float, default=DEFAULT_COMMIT_SECONDS,
+                        help="Max seconds a transaction holds the writer lock (keep below the app's busy timeout)")
+    parser.add_argument("--skip-analysis", action="store_true", help="Leave tags empty (run backend.reanalyze later)")
+    parser.add_argument("--rescore", action="store_true", help="Re-analyse NDJSON rows that already have tags")
+    parser.add_argument("--index-vectors", action="store_true", help="Also add turns to the long-term memory index")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="Skip the check for turns already stored (same owner, timestamp and text)")
+    args = parser.parse_args()
+
+    if args.format == "whatsapp" and not (args.phone and args.customer):
+        parser.error("WhatsApp exports need --phone and --customer")
+    args.workers = max(1, args.workers)
+    args.batch_size = max(1, args.batch_size)
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        # Dobara chalayein: committed turns dedupe mein skip ho jate hain
+        print("\n🛑 Interrupted; committed transactions are kept, run again to continue.")
+
+
+if __name__ == "__main__":
+    main()
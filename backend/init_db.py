@@ -12,8 +12,10 @@ if str(BASE_DIR) not in sys.path:
 try:
     # Database engine aur Base ko backend.database.db se import karna
     from backend.database.db import engine, Base
+    from sqlalchemy import inspect as sa_inspect, text
     # Models ko import karna taake SQLAlchemy ko pata ho kaunse tables banane hain
     from backend.database import models 
+    from backend.database.fts import ensure_fts, drop_fts
 except ImportError as e:
     print(f"❌ Import Error: Path issue or missing files. {e}")
     # Local debugging ke liye path print karein
@@ -28,6 +30,32 @@ async def init_db():
     """
     await create_tables(reset=False)
 
+def _apply_additive_migrations(sync_conn):
+    """
+    create_all() existing tables ko alter nahi karta. Naye nullable columns aur
+    indexes yahan add hote hain taake purani DB files reset kiye baghair chalti rahein.
+    """
+    inspector = sa_inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        current_cols = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in current_cols or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+            print(f"🧩 Added column {table.name}.{column.name}")
+
+        current_indexes = {idx["name"] for idx in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in current_indexes:
+                index.create(bind=sync_conn, checkfirst=True)
+                print(f"🧩 Added index {index.name}")
+
 async def create_tables(reset=False):
     """
     Creates all database tables defined in models.py.
@@ -36,11 +64,16 @@ async def create_tables(reset=False):
         async with engine.begin() as conn:
             if reset:
                 print("⚠️ WARNING: Dropping all existing tables (Resetting Database)...")
+                # FTS virtual table/view/triggers metadata mein nahi; warna purana index bacha rehta
+                await conn.run_sync(drop_fts)
                 await conn.run_sync(Base.metadata.drop_all)
             
             print("🚀 Syncing Database Models...")
             # Ye line models.py ke saare tables create karegi
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_apply_additive_migrations)
+            # SQLite FTS5 index + triggers for /api/chat/search
+            await conn.run_sync(ensure_fts)
         
         print("✅ Database tables are ready!")
         # Database path clear dikhane ke liye
@@ -0,0 +1,264 @@
+import asyncio
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, Optional
+
+try:
+    from backend.config import MEMORY_REPORT_INTERVAL, TRACEMALLOC_FRAMES
+except ImportError:
+    MEMORY_REPORT_INTERVAL, TRACEMALLOC_FRAMES = 600.0, 10
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# 🧮 Process & Subsystem Sizes
+# =========================
+def process_rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux /proc), else peak RSS from getrusage."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS bytes deta hai, Linux kilobytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _db_pool() -> dict:
+    from backend.database.db import engine
+
+    pool = engine.pool
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            stats[name] = fn()
+    return stats
+
+
+def _textblob() -> dict:
+    # TextBlob pehli call par pattern lexicon load karta hai; yahan sirf dekhte hain ke load hua ya nahi
+    loaded = "textblob" in sys.modules
+    stats = {"loaded": loaded}
+    if loaded:
+        # textblob.en.sentiment lazydict hai: pehle sentiment call tak khali rehta hai
+        lexicon = getattr(sys.modules.get("textblob.en"), "sentiment", None)
+        if isinstance(lexicon, dict):
+            stats["sentiment_lexicon_entries"] = dict.__len__(lexicon)
+    return stats
+
+
+def _llm_scheduler() -> dict:
+    from backend.ai_engine.llm_client import llm_scheduler
+
+    snap = llm_scheduler.snapshot()
+    return {"in_flight": snap["in_flight"], "queued": snap["queued"],
+            "heap_entries": len(llm_scheduler._heap), "tenant_finish_tags": len(llm_scheduler._last_finish)}
+
+
+def _vector_locks() -> dict:
+    from backend.ai_engine.vector_memory import vector_index
+    return {"owner_locks": len(vector_index._locks)}
+
+
+def _usage() -> dict:
+    from backend.ai_engine.usage import usage_recorder
+    return usage_recorder.snapshot()
+
+
+def _sessions() -> dict:
+    from backend.ai_engine.memory import memory_manager
+    return memory_manager.stats()
+
+
+def _token_cache() -> dict:
+    from backend.api_routes.auth_utils import token_cache
+    return {**token_cache.stats(), "max_size": token_cache.max_size}
+
+
+def _images() -> dict:
+    from backend.ai_engine.image_gen import image_service
+    return image_service.stats()
+
+
+def _live_streams() -> dict:
+    from backend.api_routes.live_routes import mood_hub
+    return mood_hub.stats()
+
+
+def _profiler() -> dict:
+    from backend.tracing import tracer
+    return tracer.profiler.stats()
+
+
+SUBSYSTEMS = {
+    "memory_sessions": _sessions,
+    "auth_token_cache": _token_cache,
+    "db_pool": _db_pool,
+    "llm_scheduler": _llm_scheduler,
+    "usage_recorder": _usage,
+    "vector_index": _vector_locks,
+    "image_service": _images,
+    "live_streams": _live_streams,
+    "profiler": _profiler,
+    "textblob": _textblob,
+}
+
+
+def top_object_types(limit: int = 20) -> Dict[str, int]:
+    """
+    Live gc-tracked objects by type (ORM instances in an identity map show up by model name).
+    Poora heap walk karta hai, is liye sirf admin request par.
+    """
+    counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+    return dict(counts.most_common(limit))
+
+
+def memory_report(include_objects: bool = False) -> dict:
+    report = {
+        "rss_bytes": process_rss_bytes(),
+        "gc_counts": gc.get_count(),
+        "modules_loaded": len(sys.modules),
+        "subsystems": {},
+    }
+    for name, collect in SUBSYSTEMS.items():
+        try:
+            report["subsystems"][name] = collect()
+        except Exception as e:
+            report["subsystems"][name] = {"error": str(e)}
+    if include_objects:
+        report["top_object_types"] = top_object_types()
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report["tracemalloc"] = {"current_bytes": current, "peak_bytes": peak}
+    return report
+
+
+def summary_line(report: dict) -> str:
+    subs = report["subsystems"]
+    sessions = subs.get("memory_sessions", {})
+    pool = subs.get("db_pool", {})
+    rss = f"{report['rss_bytes'] / 2**20:.1f}MB" if report["rss_bytes"] else "?"
+    return (
+        f"🧮 Memory: rss={rss} sessions={sessions.get('sessions')} turns={sessions.get('turns')} "
+        f"session_text_kb={(sessions.get('text_bytes') or 0) // 1024} "
+        f"token_cache={subs.get('auth_token_cache', {}).get('entries')} "
+        f"db_pool_out={pool.get('checkedout')} "
+        f"llm_queued={subs.get('llm_scheduler', {}).get('queued')} "
+        f"usage_buffered={subs.get('usage_recorder', {}).get('buffered')}"
+    )
+
+
+# =========================
+# 🔬 tracemalloc Snapshot Diff
+# =========================
+class TracemallocDiff:
+    """
+    start() tracing + baseline snapshot leta hai; diff() abhi ki snapshot ko baseline se
+    compare kar ke sab se zyada barhne wali allocation sites batata hai. Tracing khud
+    RAM aur CPU khata hai, is liye kaam ke baad stop() zaroor karein.
+    """
+
+    def __init__(self, frames: int = TRACEMALLOC_FRAMES):
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_here = False
+        self.baseline_at: Optional[float] = None
+
+    @staticmethod
+    def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def start(self) -> dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_here = True
+        self._baseline = self._filtered(tracemalloc.take_snapshot())
+        self.baseline_at = time.time()
+        return self.status()
+
+    def diff(self, top: int = 20, group_by: str = "lineno") -> dict:
+        if self._baseline is None or not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc baseline not taken; call start() first")
+        current = self._filtered(tracemalloc.take_snapshot())
+        stats = current.compare_to(self._baseline, group_by)
+        return {
+            "since_seconds": round(time.time() - self.baseline_at, 1),
+            "total_growth_bytes": sum(s.size_diff for s in stats),
+            "top": [
+                {
+                    "site": str(s.traceback[0]) if group_by != "traceback" else s.traceback.format(),
+                    "size_diff_bytes": s.size_diff,
+                    "size_bytes": s.size,
+                    "count_diff": s.count_diff,
+                }
+                for s in stats[:top]
+            ],
+        }
+
+    def stop(self) -> dict:
+        if self._started_here and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_here = False
+        self._baseline = None
+        self.baseline_at = None
+        return self.status()
+
+    def status(self) -> dict:
+        return {"tracing": tracemalloc.is_tracing(), "frames": self.frames,
+                "baseline_taken": self._baseline is not None, "baseline_at": self.baseline_at}
+
+
+# =========================
+# 🔁 Periodic Log Line
+# =========================
+class MemoryReporter:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Event loop par hi: sessions dict ko doosra thread iterate kare to mutation error
+                report = memory_report()
+                logger.info(summary_line(report))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"⚠️ Memory Report Error: {e}")
+
+    def start(self, interval: float = MEMORY_REPORT_INTERVAL) -> None:
+        if interval <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._loop(interval), name="memory-reporter")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# --- Singleton Instances ---
+tracemalloc_diff = TracemallocDiff()
+memory_reporter = MemoryReporter()
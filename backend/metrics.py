@@ -0,0 +1,360 @@
+import hashlib
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from backend.tracing import span
+except ImportError:
+    from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------
+# 📈 In-Process Metrics (Prometheus text format, no external service)
+# --------------------------------------------------
+# Latency buckets (seconds): fast-path/DB ke milliseconds se le kar Groq ke lambe calls tak
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Per-tenant gauge mein sirf itne sab se lambi queue wale tenants; baqi "other" (cardinality bounded)
+TENANT_LABEL_LIMIT = 10
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally labelled."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """
+    Point-in-time value. `set_function` scrape ke waqt value padhta hai
+    (queue depth, sessions), taake hot path par kuch update na karna pare.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], object]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, fn: Callable[[], object]) -> None:
+        """fn() returns a number, or {label value(s): number} for labelled gauges."""
+        self._function = fn
+
+    def _collect(self) -> List[Tuple[LabelValues, float]]:
+        if self._function is None:
+            with self._lock:
+                return sorted(self._values.items())
+        try:
+            result = self._function()
+        except Exception as e:
+            logger.error(f"⚠️ Metrics Gauge Error ({self.name}): {e}")
+            return []
+        if isinstance(result, dict):
+            return sorted(
+                ((k if isinstance(k, tuple) else (str(k),)), float(v)) for k, v in result.items()
+            )
+        return [((), float(result))]
+
+    def _samples(self):
+        for key, value in self._collect():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram (seconds), optionally labelled."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((k, list(v), self._sums[k]) for k, v in self._counts.items())
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(round(total, 6))}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+# --- Singleton Registry & Metric Definitions ---
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+stage_duration = registry.histogram(
+    "chat_stage_duration_seconds", "Latency of chat pipeline stages (analysis, recall, llm, commit...).", ("stage",))
+llm_call_duration = registry.histogram(
+    "llm_call_duration_seconds", "Groq completion call latency per attempt.", ("model", "status"))
+llm_queue_wait = registry.histogram(
+    "llm_queue_wait_seconds", "Time spent waiting for a fair-share LLM slot.", ("model",))
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "SQL statement latency by verb.", ("operation",))
+
+memory_sessions = registry.gauge("memory_sessions", "Short-term memory sessions held in RAM.")
+llm_in_flight = registry.gauge("llm_scheduler_in_flight", "LLM calls currently holding a slot.")
+llm_queued = registry.gauge("llm_scheduler_queued", "LLM calls waiting in the fair-share queue.")
+llm_queued_by_tenant = registry.gauge(
+    "llm_scheduler_queued_by_tenant",
+    f"Queued LLM calls for the {TENANT_LABEL_LIMIT} busiest tenants (hashed id), the rest as 'other'.", ("tenant",))
+llm_rejected = registry.counter(
+    "llm_scheduler_rejected_total", "LLM calls refused a slot (tenant_queue_full, queue_timeout).", ("reason",))
+admission_in_flight = registry.gauge("admission_in_flight", "Requests admitted and running.", ("endpoint",))
+usage_pending = registry.gauge("llm_usage_pending_rows", "Usage rows buffered but not yet flushed.")
+postprocess_queued = registry.gauge("postprocess_queue_depth", "Finished turns waiting for deferred persistence.")
+
+
+def tenant_label(tenant: str) -> str:
+    """Stable short hash: phone/user id metrics label mein nahi jata."""
+    return hashlib.sha1(tenant.encode("utf-8")).hexdigest()[:10]
+
+
+def _top_tenants(depths: Dict[str, int], limit: int = TENANT_LABEL_LIMIT) -> Dict[str, int]:
+    ranked = sorted(depths.items(), key=lambda item: item[1], reverse=True)
+    result = {tenant_label(tenant): n for tenant, n in ranked[:limit]}
+    rest = sum(n for _, n in ranked[limit:])
+    if rest:
+        result["other"] = rest
+    return result
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    `with stage_timer("recall"): ...` -> chat_stage_duration_seconds{stage="recall"},
+    plus a tracing span of the same name when the request is sampled.
+    """
+    with span(stage), stage_duration.time(stage=stage):
+        yield
+
+
+# =========================
+# 🌐 ASGI Middleware (per-route histograms)
+# =========================
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (BaseHTTPMiddleware ki tarah body buffer nahi karta, SSE safe).
+    Label route template hai ("/api/images/{key}"), raw path nahi, taake cardinality bounded rahe.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            http_request_duration.observe(time.perf_counter() - started, method=method, route=template)
+            http_requests_total.inc(method=method, route=template, status=str(status_holder["status"]))
+
+
+# =========================
+# 🗄️ SQLAlchemy Query Timings
+# =========================
+_instrumented_engines = set()
+
+
+def install_db_metrics(engine) -> None:
+    """Hooks cursor execute events on an (async) engine's sync core."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    # Startup dobara chale (reload/tests) to listeners double na hon
+    if id(sync_engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(sync_engine))
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_metrics_started")
+        if not stack:
+            return
+        operation = (statement.lstrip().split(None, 1) or ["OTHER"])[0].upper()
+        db_query_duration.observe(time.perf_counter() - stack.pop(), operation=operation)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context):
+        conn = exception_context.connection
+        stack = conn.info.get("_metrics_started") if conn is not None else None
+        if stack:
+            stack.pop()
+
+
+# =========================
+# 🔌 Runtime Gauges (scrape-time readers)
+# =========================
+def install_runtime_gauges() -> None:
+    """Binds gauges to the live singletons. Called once at startup."""
+    try:
+        from backend.ai_engine.memory import memory_manager
+        memory_sessions.set_function(lambda: len(memory_manager.sessions))
+    except ImportError as e:
+        logger.warning(f"⚠️ Memory gauge unavailable: {e}")
+
+    try:
+        from backend.ai_engine.llm_client import llm_scheduler
+        llm_in_flight.set_function(lambda: llm_scheduler.snapshot()["in_flight"])
+        llm_queued.set_function(lambda: llm_scheduler.snapshot()["queued"])
+        llm_queued_by_tenant.set_function(lambda: _top_tenants(llm_scheduler.snapshot()["queue_depth"]))
+    except ImportError as e:
+        logger.warning(f"⚠️ Scheduler gauges unavailable: {e}")
+
+    try:
+        from backend.api_routes.admission import chat_admission, whatsapp_admission
+        admission_in_flight.set_function(lambda: {
+            "chat": chat_admission.in_flight,
+            "whatsapp": whatsapp_admission.in_flight,
+        })
+    except ImportError as e:
+        logger.warning(f"⚠️ Admission gauge unavailable: {e}")
+
+    try:
+        from backend.ai_engine.usage import usage_recorder
+        usage_pending.set_function(lambda: usage_recorder.snapshot()["buffered"])
+    except ImportError as e:
+        logger.warning(f"⚠️ Usage gauge unavailable: {e}")
+
+    try:
+        from backend.ai_engine.post_processor import post_processor
+        postprocess_queued.set_function(post_processor.depth)
+    except ImportError as e:
+        logger.warning(f"⚠️ Post-processor gauge unavailable: {e}")
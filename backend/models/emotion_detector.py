@@ -1,4 +1,3 @@
-from textblob import TextBlob
 import logging
 
 # Logging setup
@@ -35,6 +34,8 @@ class EmotionDetector:
                     return emotion.capitalize()
 
             # 2. Sentiment & Subjectivity Analysis (TextBlob Fallback)
+            # Pehli call par hi load (module pehle hi cached ho to sirf dict lookup)
+            from textblob import TextBlob
             analysis = TextBlob(text)
             polarity = analysis.sentiment.polarity
             subjectivity = analysis.sentiment.subjectivity 
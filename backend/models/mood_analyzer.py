@@ -1,9 +1,7 @@
-from textblob import TextBlob
 from typing import Tuple
 import logging
 
 # Logging setup
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class MoodAnalyzer:
@@ -23,6 +21,8 @@ class MoodAnalyzer:
 
         try:
             # 1. TextBlob Base Analysis
+            # Lazy import: TextBlob/NLTK ~0.3s leta hai, app import ko slow na kare (warm-up startup par)
+            from textblob import TextBlob
             analysis = TextBlob(text)
             sentiment = analysis.sentiment.polarity
             
@@ -1,4 +1,3 @@
-from textblob import TextBlob
 import logging
 
 # Logging setup
@@ -28,6 +27,7 @@ class PersonalityAnalyzer:
             has_urdu_neg = any(w in text_lower for w in urdu_negative)
 
             # --- 2. Sentiment & Subjectivity ---
+            from textblob import TextBlob
             analysis = TextBlob(text)
             polarity = analysis.sentiment.polarity
             subjectivity = analysis.sentiment.subjectivity
@@ -0,0 +1,264 @@
+"""
+Offline re-analysis of historical ChatHistory tags (mood, mood_score, emotion, personality).
+
+Analyzers (backend/models/) behtar hon to purane tags stale ho jate hain. Ye job chat_history ko
+id order mein chunks mein parhta hai, process pool par score karta hai, aur sirf badle hue rows
+chhoti transactions mein wapas likhta hai. Har batch ke saath checkpoint (reanalysis_checkpoints)
+usi transaction mein update hota hai, is liye job kabhi bhi rok kar dobara chalayein: wahin se resume.
+
+Live app ke saath chal sakta hai: reads SQLite writer ko nahi rokte, aur har write transaction
+sirf aik chunk ki hai (--pause-ms ke waqfe ke saath), taake app ke inserts lock ka intezar na karein.
+
+Usage (from the project root):
+    python -m backend.reanalyze --workers 4
+    python -m backend.reanalyze --dry-run --limit 5000
+    python -m backend.reanalyze --restart --job analyzers-v2
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+# --- 🛠️ Path Fix (CLI: python backend/reanalyze.py) ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from sqlalchemy import bindparam, func, select, update
+
+from backend.database.db import engine, AsyncSessionLocal
+from backend.database.models import ChatHistory, ReanalysisCheckpoint
+
+DEFAULT_JOB = "reanalyze"
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_PAUSE_MS = 50
+
+# (id, user_input) -> (id, mood, mood_score, emotion, personality)
+Row = Tuple[int, str]
+Scored = Tuple[int, str, Optional[float], str, str]
+
+_chat = ChatHistory.__table__
+# executemany: aik statement, chunk ke saare badle hue rows
+_UPDATE_TAGS = (
+    update(_chat)
+    .where(_chat.c.id == bindparam("b_id"))
+    .values(
+        mood_tag=bindparam("b_mood"),
+        mood_score=bindparam("b_score"),
+        emotion_tag=bindparam("b_emotion"),
+        personality_tag=bindparam("b_personality"),
+    )
+)
+
+
+# =========================
+# 🧮 Worker Processes
+# =========================
+def init_worker() -> None:
+    # TextBlob lexicon har worker process mein aik dafa load, pehle chunk ke andar nahi
+    from backend.ai_engine.brain import AIBrain
+    AIBrain._analyze("Warm-up: what a good day")
+
+
+def score_chunk(rows: List[Row]) -> List[Scored]:
+    """Same analyzers as the live path (AIBrain), so offline and online tags agree."""
+    from backend.ai_engine.brain import AIBrain
+
+    scored = []
+    for chat_id, text in rows:
+        mood, score, emotion = AIBrain._analyze(text)
+        scored.append((chat_id, mood, score, emotion, AIBrain.tag_personality(text)))
+    return scored
+
+
+# =========================
+# 🗄️ Checkpoint & Chunk I/O
+# =========================
+async def _ensure_table() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(ReanalysisCheckpoint.__table__.create, checkfirst=True)
+
+
+async def load_checkpoint(job: str, restart: bool, persist: bool = True) -> ReanalysisCheckpoint:
+    """
+    Returns the job's checkpoint, creating it on first run. target_id = max(id) at start,
+    taake run ke dauran aane wale naye rows (jo pehle hi naye analyzers se tag hue) skip hon.
+    """
+    async with AsyncSessionLocal() as db:
+        checkpoint = (await db.execute(
+            select(ReanalysisCheckpoint).where(ReanalysisCheckpoint.job == job)
+        )).scalar_one_or_none()
+        target = (await db.execute(select(func.max(ChatHistory.id)))).scalar() or 0
+
+        if checkpoint is None:
+            checkpoint = ReanalysisCheckpoint(job=job, target_id=target, last_chat_id=0,
+                                              rows_scanned=0, rows_updated=0)
+            db.add(checkpoint)
+        elif restart:
+            checkpoint.last_chat_id = 0
+            checkpoint.target_id = target
+            checkpoint.rows_scanned = 0
+            checkpoint.rows_updated = 0
+            checkpoint.started_at = datetime.now(timezone.utc)
+            checkpoint.finished_at = None
+
+        if persist:
+            await db.commit()
+        return checkpoint
+
+
+async def read_chunk(after_id: int, target_id: int, size: int):
+    """Keyset chunk (id > after_id), so chunk N costs the same as chunk 1."""
+    stmt = (
+        select(_chat.c.id, _chat.c.user_input, _chat.c.mood_tag, _chat.c.mood_score,
+               _chat.c.emotion_tag, _chat.c.personality_tag)
+        .where(_chat.c.id > after_id, _chat.c.id <= target_id)
+        .order_by(_chat.c.id)
+        .limit(size)
+    )
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(stmt)).all()
+
+
+def changed_rows(chunk, scored: List[Scored]) -> List[dict]:
+    """Only rows whose tags actually differ are written back."""
+    old = {row.id: (row.mood_tag, row.mood_score, row.emotion_tag, row.personality_tag) for row in chunk}
+    updates = []
+    for chat_id, mood, score, emotion, personality in scored:
+        if old.get(chat_id) != (mood, score, emotion, personality):
+            updates.append({"b_id": chat_id, "b_mood": mood, "b_score": score,
+                            "b_emotion": emotion, "b_personality": personality})
+    return updates
+
+
+async def write_batch(job: str, updates: List[dict], last_id: int, scanned: int) -> None:
+    # Tags aur checkpoint aik hi transaction mein: crash par dono ya koi nahi
+    async with AsyncSessionLocal() as db:
+        if updates:
+            await db.execute(_UPDATE_TAGS, updates)
+        await db.execute(
+            update(ReanalysisCheckpoint)
+            .where(ReanalysisCheckpoint.job == job)
+            .values(
+                last_chat_id=last_id,
+                rows_scanned=ReanalysisCheckpoint.rows_scanned + scanned,
+                rows_updated=ReanalysisCheckpoint.rows_updated + len(updates),
+                updated_at=datetime.now(timezone.utc),
+            )
+        )
+        await db.commit()
+
+
+async def mark_finished(job: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ReanalysisCheckpoint)
+            .where(ReanalysisCheckpoint.job == job)
+            .values(finished_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+
+
+# =========================
+# 🔁 Pipeline
+# =========================
+async def run(job: str = DEFAULT_JOB, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              pause_ms: float = DEFAULT_PAUSE_MS, limit: Optional[int] = None,
+              restart: bool = False, dry_run: bool = False) -> dict:
+    await _ensure_table()
+    checkpoint = await load_checkpoint(job, restart, persist=not dry_run)
+    if checkpoint.finished_at is not None:
+        print(f"✅ Job '{job}' already finished at {checkpoint.finished_at}; use --restart to run again.")
+        return {"job": job, "rows_scanned": 0, "rows_updated": 0, "rows_per_second": 0.0}
+
+    cursor, target = checkpoint.last_chat_id, checkpoint.target_id
+    print(f"🔁 Re-analysing chat_history ids {cursor + 1}..{target} "
+          f"(job '{job}', {workers} worker(s), chunk {chunk_size}{', dry run' if dry_run else ''})")
+
+    loop = asyncio.get_running_loop()
+    scanned = updated = queued = 0
+    exhausted = False
+    started = time.perf_counter()
+
+    # spawn: workers app ke engine/threads fork nahi karte (aur Windows par bhi yehi chalta hai)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as pool:
+        # Workers ke liye 2x chunks pipeline mein; results order mein likhte hain taake checkpoint monotonic rahe
+        pending = deque()
+        while True:
+            while not exhausted and len(pending) < workers * 2:
+                size = chunk_size if limit is None else min(chunk_size, limit - queued)
+                chunk = await read_chunk(cursor, target, size) if size > 0 else []
+                if not chunk:
+                    exhausted = True
+                    break
+                cursor = chunk[-1].id
+                queued += len(chunk)
+                rows = [(row.id, row.user_input) for row in chunk]
+                pending.append((chunk, loop.run_in_executor(pool, score_chunk, rows)))
+            if not pending:
+                break
+
+            chunk, future = pending.popleft()
+            updates = changed_rows(chunk, await future)
+            if not dry_run:
+                await write_batch(job, updates, chunk[-1].id, len(chunk))
+            scanned += len(chunk)
+            updated += len(updates)
+
+            elapsed = time.perf_counter() - started
+            rate = scanned / elapsed if elapsed else 0.0
+            print(f"   id<={chunk[-1].id}/{target} scanned={scanned} changed={updated} {rate:,.0f} rows/s")
+            if pause_ms and not dry_run:
+                # Writer lock app ke inserts ke liye chhor dein
+                await asyncio.sleep(pause_ms / 1000.0)
+
+    finished = limit is None or queued < limit
+    if finished and not dry_run:
+        await mark_finished(job)
+
+    elapsed = time.perf_counter() - started
+    result = {
+        "job": job,
+        "rows_scanned": scanned,
+        "rows_updated": updated,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(scanned / elapsed, 1) if elapsed else 0.0,
+        "finished": finished,
+        "dry_run": dry_run,
+    }
+    print(f"{'✅' if finished else '⏸️'} {scanned} rows scanned, {updated} "
+          f"{'would change' if dry_run else 'updated'} in {elapsed:.1f}s ({result['rows_per_second']:,.0f} rows/s)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--job", default=DEFAULT_JOB, help="Checkpoint name (one row per job)")
+    # Aik core app ke liye chhor dein
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per read and per write transaction")
+    parser.add_argument("--pause-ms", type=float, default=DEFAULT_PAUSE_MS, help="Sleep between write transactions")
+    parser.add_argument("--limit", type=int, help="Stop after this many rows (resume later)")
+    parser.add_argument("--restart", action="store_true", help="Reset the checkpoint and start from id 1")
+    parser.add_argument("--dry-run", action="store_true", help="Score and count changes without writing")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    try:
+        asyncio.run(run(args.job, max(1, args.workers), max(1, args.chunk_size), args.pause_ms,
+                        args.limit, args.restart, args.dry_run))
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted; run the same command again to resume from the last checkpoint.")
+
+
+if __name__ == "__main__":
+    main()
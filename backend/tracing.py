@@ -0,0 +1,325 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from backend.config import (
+        TRACE_SAMPLE_RATE, TRACE_FILE, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS, PROFILE_MAX_STACKS
+    )
+except ImportError:
+    TRACE_SAMPLE_RATE, PROFILE_SAMPLE_RATE = 0.0, 0.0
+    TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces", "spans.jsonl")
+    PROFILE_INTERVAL_MS, PROFILE_MAX_STACKS = 5.0, 20000
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------
+# 🧵 Request Context (contextvars: async tasks aur to_thread dono mein chalta hai)
+# --------------------------------------------------
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_trace_var: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+_span_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("span_id", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Log lines ko request id se jorna: format mein %(request_id)s."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, object]):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self, trace_id: str) -> dict:
+        # Field names OTLP JSON se milte julte (traceId/spanId/startTimeUnixNano)
+        return {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        # list.append thread-safe hai (analyzers to_thread par spans likhte hain)
+        self.spans: List[Span] = []
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    `with span("llm.attempt", model=m) as s:` -> child of the current span.
+    Request trace nahi ho rahi to no-op (sirf aik contextvar read).
+    """
+    trace = _trace_var.get()
+    if trace is None:
+        yield None
+        return
+    current = Span(name, _span_var.get(), attributes)
+    token = _span_var.set(current.span_id)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _span_var.reset(token)
+        trace.spans.append(current)
+
+
+def record_span(name: str, start_ns: int, ok: bool = True, **attributes) -> None:
+    """Already-finished span (e.g. a retry attempt timed inside try/finally)."""
+    trace = _trace_var.get()
+    if trace is None:
+        return
+    finished = Span(name, _span_var.get(), attributes)
+    finished.start_ns = start_ns
+    finished.end_ns = time.time_ns()
+    finished.status = "ok" if ok else "error"
+    trace.spans.append(finished)
+
+
+# =========================
+# 🔥 Sampling Profiler (folded stacks for flame graphs)
+# =========================
+class SamplingProfiler:
+    """
+    Background thread jo har PROFILE_INTERVAL_MS par sys._current_frames() se stacks leta hai,
+    jab tak koi profiled request chal rahi ho. Output Brendan Gregg "folded" format hai
+    (flamegraph.pl / speedscope). Event loop thread saari concurrent requests chalata hai,
+    is liye samples request-specific nahi, us waqt ke process ke hain.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, max_stacks: int = PROFILE_MAX_STACKS):
+        self.interval = interval_ms / 1000.0
+        self.max_stacks = max_stacks
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self.profiled_requests = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> None:
+        with self._lock:
+            self._active += 1
+            self.profiled_requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+
+    def end(self) -> None:
+        with self._lock:
+            self._active = max(0, self._active - 1)
+
+    @staticmethod
+    def _frame_label(code) -> str:
+        path = code.co_filename
+        marker = f"{os.sep}backend{os.sep}"
+        short = path[path.rfind(marker) + 1:] if marker in path else os.path.basename(path)
+        return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                if self._active == 0:
+                    self._thread = None
+                    return
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_label(frame.f_code))
+                    frame = frame.f_back
+                key = ";".join([names.get(thread_id, str(thread_id))] + stack[::-1])
+                with self._lock:
+                    self.samples += 1
+                    if key in self.stacks or len(self.stacks) < self.max_stacks:
+                        self.stacks[key] += 1
+                    else:
+                        self.dropped += 1
+            time.sleep(self.interval)
+
+    def folded(self) -> str:
+        with self._lock:
+            return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stacks.clear()
+            self.samples = self.dropped = self.profiled_requests = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"running": self._thread is not None, "active_requests": self._active,
+                    "profiled_requests": self.profiled_requests, "samples": self.samples,
+                    "distinct_stacks": len(self.stacks), "dropped_samples": self.dropped}
+
+
+# =========================
+# 🔭 Tracer (sampling decisions + JSON-lines export)
+# =========================
+class Tracer:
+    def __init__(self, trace_rate: float = TRACE_SAMPLE_RATE, profile_rate: float = PROFILE_SAMPLE_RATE,
+                 path: str = TRACE_FILE):
+        self.trace_rate = trace_rate
+        self.profile_rate = profile_rate
+        self.path = path
+        self.profiler = SamplingProfiler()
+        self._write_lock = threading.Lock()
+        self.traces_written = 0
+
+    def configure(self, trace_rate: Optional[float] = None, profile_rate: Optional[float] = None) -> None:
+        if trace_rate is not None:
+            self.trace_rate = min(max(trace_rate, 0.0), 1.0)
+        if profile_rate is not None:
+            self.profile_rate = min(max(profile_rate, 0.0), 1.0)
+
+    def _write(self, lines: List[str]) -> None:
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            self.traces_written += 1
+
+    async def export(self, trace: Trace) -> None:
+        lines = [json.dumps(s.to_dict(trace.trace_id), default=str) for s in trace.spans]
+        if not lines:
+            return
+        try:
+            await asyncio.to_thread(self._write, lines)
+        except Exception as e:
+            logger.error(f"⚠️ Trace Export Error: {e}")
+
+    def stats(self) -> dict:
+        return {"trace_sample_rate": self.trace_rate, "profile_sample_rate": self.profile_rate,
+                "trace_file": self.path, "traces_written": self.traces_written,
+                "profiler": self.profiler.stats()}
+
+
+# --- Singleton Instance ---
+tracer = Tracer()
+
+
+# =========================
+# 🔗 Deferred Work (response ke baad ka kaam)
+# =========================
+def current_trace_context() -> Tuple[Optional[str], Optional[str]]:
+    """(trace_id, span_id) of the sampled request, or (None, None). Background job ke saath rakhein."""
+    trace = _trace_var.get()
+    if trace is None:
+        return None, None
+    return trace.trace_id, _span_var.get()
+
+
+@asynccontextmanager
+async def continue_trace(trace_id: Optional[str], parent_span_id: Optional[str]):
+    """
+    Deferred kaam ke spans ko request ki trace mein jorta hai. Middleware request khatam hote hi
+    trace export kar deta hai, is liye ye spans usi traceId/parent ke saath alag batch mein likhte hain.
+    """
+    if trace_id is None:
+        yield
+        return
+    trace = Trace(trace_id)
+    trace_token = _trace_var.set(trace)
+    span_token = _span_var.set(parent_span_id)
+    try:
+        yield
+    finally:
+        _span_var.reset(span_token)
+        _trace_var.reset(trace_token)
+        await tracer.export(trace)
+
+
+class TracingMiddleware:
+    """
+    Har request ko X-Request-ID deta hai (client ka header ho to wahi), aur sampled
+    requests ke liye root span khol kar poori trace JSON lines mein likhta hai.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = (headers.get(b"x-request-id") or b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        rid_token = request_id_var.set(request_id)
+
+        traced = tracer.trace_rate > 0 and random.random() < tracer.trace_rate
+        # PROFILE_SAMPLE_RATE traced requests ka hissa hai (config.py), sab requests ka nahi
+        profiled = traced and tracer.profile_rate > 0 and random.random() < tracer.profile_rate
+        trace = Trace(request_id) if traced else None
+        trace_token = _trace_var.set(trace)
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        if profiled:
+            tracer.profiler.begin()
+        try:
+            with span(f"{scope.get('method', 'GET')} {scope.get('path', '')}") as root:
+                await self.app(scope, receive, send_wrapper)
+                if root is not None:
+                    route = scope.get("route")
+                    root.set(route=getattr(route, "path", None), status=status_holder["status"],
+                             profiled=profiled)
+        finally:
+            if profiled:
+                tracer.profiler.end()
+            _trace_var.reset(trace_token)
+            request_id_var.reset(rid_token)
+            if trace is not None:
+                await tracer.export(trace)
@@ -0,0 +1,50 @@
+import logging
+import time
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------
+# 🔥 Explicit Warm-Up Phase
+# --------------------------------------------------
+# App import ab heavy libraries load nahi karta (TextBlob/NLTK, groq SDK, passlib).
+# Server startup par ye aik dafa yahan load hoti hain, taake pehli request slow na ho;
+# CLI tools (init_db, reindex) ye kabhi nahi chalate.
+
+
+def _analyzers() -> None:
+    from backend.ai_engine.brain import AIBrain
+    # TextBlob ka sentiment lexicon pehli polarity call par parse hota hai
+    AIBrain._analyze("Warm-up: what a good day")
+    AIBrain.tag_personality("Warm-up: what a good day")
+
+
+def _llm_client() -> None:
+    from backend.ai_engine.llm_client import get_client
+    get_client()
+
+
+def _passlib() -> None:
+    from backend.api_routes.auth_utils import get_pwd_context
+    get_pwd_context()
+
+
+STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("analyzers", _analyzers),
+    ("groq_client", _llm_client),
+    ("passlib", _passlib),
+]
+
+
+def warm_up() -> Dict[str, float]:
+    """Runs every warm-up step (blocking; call via asyncio.to_thread). Returns ms per step."""
+    timings: Dict[str, float] = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.error(f"⚠️ Warm-up step '{name}' failed: {e}")
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"🔥 Warm-up done: {timings}")
+    return timings
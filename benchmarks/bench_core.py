@@ -0,0 +1,152 @@
+"""
+Micro-benchmarks for the analyzers, memory store, prompt assembly and JWT helpers.
+
+Cases run over fixed English / Roman Urdu / mixed-length corpora (benchmarks/corpora.py).
+Results are written as JSON and optionally compared against a stored baseline;
+the exit code is 1 when any case's p50 is slower than baseline * (1 + threshold).
+
+Usage (from the project root):
+    python -m benchmarks.bench_core --json benchmarks/results/latest.json
+    python -m benchmarks.bench_core --save-baseline            # on a known-good commit
+    python -m benchmarks.bench_core --baseline benchmarks/results/baseline.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from benchmarks.corpora import corpora
+from benchmarks.harness import measure, environment, save, load, compare
+
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "benchmarks", "results", "baseline.json")
+
+
+def bench_analyzers(cases: dict, texts: dict, repeat: int) -> None:
+    from backend.models.mood_analyzer import predict_mood
+    from backend.models.emotion_detector import detect_emotion
+    from backend.models.personality_analyzer import analyze_personality
+
+    for corpus, items in texts.items():
+        cases[f"predict_mood/{corpus}"] = measure(predict_mood, items, repeat)
+        cases[f"detect_emotion/{corpus}"] = measure(detect_emotion, items, repeat)
+        cases[f"analyze_personality/{corpus}"] = measure(analyze_personality, items, repeat)
+
+
+def bench_brain(cases: dict, texts: dict, repeat: int) -> None:
+    import backend.ai_engine.brain as brain_mod
+    from backend.ai_engine.prompt_builder import build_messages
+
+    async def stub_llm(messages, tenant="anonymous", channel=None):
+        return "stub reply"
+
+    # LLM stub: sirf analysis + prompt assembly ka kharcha napna hai
+    brain_mod.generate_llm = stub_llm
+    loop = asyncio.new_event_loop()
+    history = [{"user": t, "bot": "ok"} for t in texts["english"]]
+
+    def run(text):
+        # "bench" channel fast path ke liye enabled nahi, is liye poora pipeline chalta hai
+        return loop.run_until_complete(brain_mod.brain.process_user_input(text, history=history, channel="bench"))
+
+    try:
+        for corpus, items in texts.items():
+            cases[f"process_user_input/{corpus}"] = measure(run, items, repeat)
+    finally:
+        loop.close()
+
+    cases["build_messages/history10"] = measure(
+        lambda t: build_messages(t, history=history, mood="Happy", emotion="excited",
+                                 summary="User likes cricket.", memories="User: hi\nAssistant: hello"),
+        texts["mixed"], repeat,
+    )
+
+
+def bench_memory(cases: dict, texts: dict, repeat: int, sessions: int) -> None:
+    from backend.ai_engine.memory import Memory
+
+    mixed = texts["mixed"]
+    adds = [(f"user-{i % sessions}", mixed[i % len(mixed)]) for i in range(sessions * 3)]
+    memory = Memory(max_history=10)
+    cases[f"memory_add/{sessions}_sessions"] = measure(lambda a: memory.add(a[0], a[1], "ok"), adds, repeat)
+
+    session_ids = [f"user-{i}" for i in range(sessions)]
+    cases[f"memory_get_context/{sessions}_sessions"] = measure(memory.get_context, session_ids, repeat)
+    cases[f"memory_get_turns/{sessions}_sessions"] = measure(memory.get_turns, session_ids, repeat)
+
+
+def bench_jwt(cases: dict, repeat: int) -> None:
+    from backend.api_routes.auth_utils import create_access_token, decode_access_token, authenticate_token
+
+    claims = [{"sub": str(i), "email": f"user{i}@example.com", "username": f"user{i}"} for i in range(200)]
+    cases["jwt_encode"] = measure(create_access_token, claims, repeat)
+    tokens = [create_access_token(c) for c in claims]
+    cases["jwt_decode"] = measure(decode_access_token, tokens, repeat)
+    # Warm cache: get_current_user ka steady-state path
+    cases["jwt_authenticate_cached"] = measure(authenticate_token, tokens, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=10_000, help="Memory store scale")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", help="Comma-separated groups: analyzers,brain,memory,jwt")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help=f"Compare against this JSON (e.g. {os.path.relpath(DEFAULT_BASELINE, BASE_DIR)})")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed p50 slowdown (0.15 = 15%%)")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="Store results as the baseline")
+    args = parser.parse_args()
+
+    # Analyzers har call par INFO log karte hain; timing mein log IO shamil na ho
+    logging.disable(logging.INFO)
+
+    texts = corpora(args.seed)
+    groups = set((args.only or "analyzers,brain,memory,jwt").split(","))
+    cases: dict = {}
+    started = time.perf_counter()
+    if "analyzers" in groups:
+        bench_analyzers(cases, texts, args.repeat)
+    if "brain" in groups:
+        bench_brain(cases, texts, args.repeat)
+    if "memory" in groups:
+        bench_memory(cases, texts, args.repeat, args.sessions)
+    if "jwt" in groups:
+        bench_jwt(cases, args.repeat)
+
+    report = {
+        "env": environment(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "cases": cases,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.json:
+        save(report, args.json)
+    if args.save_baseline:
+        save(report, args.save_baseline)
+        print(f"📌 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = load(args.baseline)
+        if baseline is None:
+            print(f"⚠️ No baseline at {args.baseline}; run with --save-baseline first.")
+            return
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}:")
+            for r in regressions:
+                print(f"   {r['case']}: {r['baseline_p50_us']} -> {r['current_p50_us']} µs (x{r['slowdown']})")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Full-text search benchmark on a synthetic chat_history corpus.
+
+Compares FTS5 MATCH + bm25 (what /api/chat/search runs) against the naive
+LIKE '%term%' scan, using the same DDL and triggers as backend/database/fts.py.
+
+Usage (from the project root):
+    python -m benchmarks.bench_fts --rows 2000000 --users 5000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from backend.database.fts import (
+    FTS_VIEW, FTS_CREATE, FTS_TRIGGERS, FTS_TABLE, BM25_WEIGHTS, build_match_query, owner_token
+)
+
+# Mixed English + Roman Urdu vocabulary, Zipf-like sampling
+VOCAB = (
+    "hello salam kya haal hai theek acha shukriya thanks please help exam semester python coding "
+    "project university iub bsai data machine learning model stress tension pareshan khush mazay "
+    "zabardast behtreen family dost friend cricket match chai biryani weather barish garmi sardi "
+    "office kaam job interview resume career future plan dream travel lahore karachi bahawalpur "
+    "music song movie drama book novel poetry ghalib iqbal sleep neend tired thaka health gym run "
+    "money paisa budget shopping phone laptop internet wifi battery charger game pubg football"
+).split()
+RARE = ["quantum", "origami", "kilimanjaro", "saxophone", "zeppelin", "tessellation"]
+
+SCHEMA = """
+CREATE TABLE chat_history (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    phone_number VARCHAR(20),
+    user_input TEXT NOT NULL,
+    ai_response TEXT NOT NULL,
+    timestamp DATETIME
+);
+CREATE INDEX ix_chat_history_user_ts ON chat_history (user_id, timestamp);
+"""
+
+
+def _sentence(rng: random.Random, n_min: int, n_max: int) -> str:
+    words = [VOCAB[min(int(rng.paretovariate(1.2)) - 1, len(VOCAB) - 1)] for _ in range(rng.randint(n_min, n_max))]
+    if rng.random() < 0.002:
+        words.insert(rng.randrange(len(words)), rng.choice(RARE))
+    return " ".join(words)
+
+
+def build_corpus(conn: sqlite3.Connection, rows: int, users: int, batch: int, seed: int) -> float:
+    rng = random.Random(seed)
+    conn.executescript(SCHEMA)
+    conn.execute(FTS_VIEW)
+    conn.execute(FTS_CREATE)
+    for trigger in FTS_TRIGGERS:
+        conn.execute(trigger)
+
+    start = time.perf_counter()
+    inserted = 0
+    while inserted < rows:
+        n = min(batch, rows - inserted)
+        data = [
+            (rng.randint(1, users), _sentence(rng, 3, 18), _sentence(rng, 8, 40), f"2026-01-01 00:00:{i % 60:02d}")
+            for i in range(n)
+        ]
+        conn.executemany(
+            "INSERT INTO chat_history (user_id, user_input, ai_response, timestamp) VALUES (?, ?, ?, ?)", data
+        )
+        conn.commit()
+        inserted += n
+        print(f"\r  inserted {inserted:,}/{rows:,}", end="", flush=True)
+    print()
+    return time.perf_counter() - start
+
+
+def _time_query(conn, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+    }
+
+
+def run_queries(conn: sqlite3.Connection, users: int, repeat: int, seed: int) -> dict:
+    rng = random.Random(seed + 1)
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    fts_sql = f"""
+        SELECT h.id, snippet({FTS_TABLE}, 0, '[', ']', '…', 12), bm25({FTS_TABLE}, {weights}) AS rank
+        FROM {FTS_TABLE} JOIN chat_history h ON h.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH ? AND h.user_id = ?
+        ORDER BY rank LIMIT 20
+    """
+    like_sql = """
+        SELECT id FROM chat_history
+        WHERE user_id = ? AND (user_input LIKE ? OR ai_response LIKE ?)
+        ORDER BY timestamp DESC LIMIT 20
+    """
+    results = {}
+    for term in ["salam", "exam tension", "biryani", RARE[0]]:
+        uid = rng.randint(1, users)
+        results[term] = {
+            "fts_user_scoped": _time_query(conn, fts_sql, (build_match_query(term, owner_token(uid)), uid), repeat),
+            "fts_global_then_filter": _time_query(conn, fts_sql, (build_match_query(term), uid), max(1, repeat // 5)),
+            "like_user_scoped": _time_query(conn, like_sql, (uid, f"%{term}%", f"%{term}%"), max(1, repeat // 5)),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--batch", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--db", help="Reuse/keep this SQLite file instead of a temp file")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="fts_bench_"), "bench.db")
+    fresh = not os.path.exists(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    report = {"rows": args.rows, "users": args.users, "sqlite": sqlite3.sqlite_version}
+    if fresh:
+        print(f"🏗️ Building corpus: {args.rows:,} rows in {db_path}")
+        elapsed = build_corpus(conn, args.rows, args.users, args.batch, args.seed)
+        report["insert_rows_per_sec"] = round(args.rows / elapsed)
+
+    print("⏱️ Running queries...")
+    report["queries"] = run_queries(conn, args.users, args.repeat, args.seed)
+    report["db_size_mb"] = round(os.path.getsize(db_path) / 1e6, 1)
+    conn.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Chat latency during a login storm: inline PBKDF2 vs the bounded hashing pool.
+
+A steady stream of simulated chat requests (a short await, like a DB/LLM round
+trip) runs on the event loop while `--logins` concurrent logins verify
+passwords. "inline" calls pwd_context.verify() on the loop (the old behaviour);
+"executor" uses auth_utils.verify_and_update_password().
+
+Usage (from the project root):
+    python -m benchmarks.bench_login_storm --logins 200 --rounds 29000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _chat_probe(stop: asyncio.Event, io_ms: float, interval_ms: float, samples: list):
+    async def one_chat():
+        started = time.perf_counter()
+        await asyncio.sleep(io_ms / 1000)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    tasks = []
+    while not stop.is_set():
+        tasks.append(asyncio.create_task(one_chat()))
+        await asyncio.sleep(interval_ms / 1000)
+    await asyncio.gather(*tasks)
+
+
+async def run_mode(mode: str, logins: int, stored_hash: str, io_ms: float, interval_ms: float) -> dict:
+    from backend.api_routes import auth_utils
+
+    async def login():
+        if mode == "inline":
+            auth_utils.pwd_context.verify("password123", stored_hash)
+        else:
+            await auth_utils.verify_and_update_password("password123", stored_hash)
+
+    samples: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_chat_probe(stop, io_ms, interval_ms, samples))
+    await asyncio.sleep(0.2)  # warm baseline samples
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    storm_s = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    return {
+        "mode": mode,
+        "logins": logins,
+        "storm_seconds": round(storm_s, 3),
+        "logins_per_s": round(logins / storm_s, 1),
+        "chat_requests": len(samples),
+        "chat_p50_ms": round(statistics.median(samples), 2),
+        "chat_p99_ms": round(_percentile(samples, 99), 2),
+        "chat_max_ms": round(max(samples), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=29000, help="PBKDF2 work factor (PBKDF2_ROUNDS)")
+    parser.add_argument("--workers", type=int, default=2, help="Hashing pool size (HASH_CONCURRENCY)")
+    parser.add_argument("--io-ms", type=float, default=5.0, help="Simulated await per chat request")
+    parser.add_argument("--interval-ms", type=float, default=2.0, help="Gap between chat requests")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    # auth_utils config import se pehle env set karna zaroori hai
+    os.environ["PBKDF2_ROUNDS"] = str(args.rounds)
+    os.environ["HASH_CONCURRENCY"] = str(args.workers)
+    os.environ["HASH_MAX_PENDING"] = str(max(args.logins, 64))
+    from backend.api_routes import auth_utils
+
+    stored_hash = auth_utils.hash_password("password123")
+    results = [
+        asyncio.run(run_mode(mode, args.logins, stored_hash, args.io_ms, args.interval_ms))
+        for mode in ("inline", "executor")
+    ]
+    report = {"rounds": args.rounds, "workers": args.workers, "results": results}
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Cold-start cost: wall time to import the app / CLI entry points, with an
+import-time breakdown (python -X importtime) and the explicit warm-up phase.
+
+Each run is a fresh interpreter, so numbers include module loading but not
+the OS page cache (first run of a session may be slower; use --runs >= 3).
+
+Usage (from the project root):
+    python -m benchmarks.bench_startup --runs 5 --top 15
+    python -m benchmarks.bench_startup --target backend.init_db --json benchmarks/results/startup.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from benchmarks.harness import environment, save
+
+DEFAULT_TARGETS = ["backend.app", "backend.init_db"]
+# Ye libraries app import par load nahi honi chahiye (warm-up ya pehli call par)
+LAZY_MODULES = ["textblob", "nltk", "groq", "passlib", "twilio"]
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_CHILD = """
+import json, sys, time
+t = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - t
+loaded = [m for m in {lazy!r} if m in sys.modules]
+warm = None
+if {warmup!r}:
+    sys.stderr.write("@@WARMUP@@\\n")
+    sys.stderr.flush()
+    from backend.warmup import warm_up
+    warm = warm_up()
+print("@@RESULT@@" + json.dumps({{"import_s": elapsed, "lazy_loaded": loaded, "warmup_ms": warm}}))
+"""
+
+
+def run_once(target: str, warmup: bool) -> dict:
+    code = _CHILD.format(target=target, lazy=LAZY_MODULES, warmup=warmup)
+    env = dict(os.environ, PYTHONPATH=BASE_DIR)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=BASE_DIR, env=env,
+                          capture_output=True, text=True, timeout=300)
+    result_line = next((line for line in proc.stdout.splitlines() if line.startswith("@@RESULT@@")), None)
+    if result_line is None:
+        raise RuntimeError(f"{target} failed to import:\n{proc.stderr[-2000:]}")
+    result = json.loads(result_line[len("@@RESULT@@"):])
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if line.startswith("@@WARMUP@@"):
+            break  # warm-up ke imports breakdown mein nahi
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    result["modules"] = modules
+    return result
+
+
+def breakdown(modules: list, top: int) -> dict:
+    # Sab se mehngay modules (cumulative), aur har top-level package ka self time jor kar
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    slowest = sorted(modules, key=lambda m: -m[2])[:top]
+    return {
+        "top_cumulative_ms": [
+            {"module": name, "cumulative_ms": round(cum / 1000, 1), "self_ms": round(own / 1000, 1)}
+            for name, own, cum, _ in slowest
+        ],
+        "by_package_ms": {
+            pkg: round(us / 1000, 1)
+            for pkg, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]
+        },
+    }
+
+
+def bench_target(target: str, runs: int, top: int, warmup: bool) -> dict:
+    results = [run_once(target, warmup and target == "backend.app") for _ in range(runs)]
+    wall = [r["import_s"] * 1000 for r in results]
+    # Breakdown median run se (outlier cold cache wala nahi)
+    median_run = sorted(results, key=lambda r: r["import_s"])[len(results) // 2]
+    report = {
+        "target": target,
+        "runs": runs,
+        "import_ms_median": round(statistics.median(wall), 1),
+        "import_ms_min": round(min(wall), 1),
+        "import_ms_max": round(max(wall), 1),
+        "modules_imported": len(median_run["modules"]),
+        "lazy_modules_loaded_at_import": median_run["lazy_loaded"],
+        **breakdown(median_run["modules"], top),
+    }
+    if median_run.get("warmup_ms"):
+        report["warmup_ms"] = median_run["warmup_ms"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", help="Module to import (repeatable)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--no-warmup", action="store_true", help="Skip timing backend.warmup.warm_up()")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    report = {
+        "environment": environment(),
+        "targets": [bench_target(t, args.runs, args.top, not args.no_warmup) for t in args.target or DEFAULT_TARGETS],
+    }
+    print(json.dumps(report, indent=2))
+    if args.json:
+        save(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
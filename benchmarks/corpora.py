@@ -0,0 +1,62 @@
+"""
+Fixed, seeded text corpora for the micro-benchmarks.
+
+Same seed -> same texts on every machine, so results are comparable with a
+stored baseline. English, Roman Urdu and a mixed corpus with short/long messages.
+"""
+import random
+from typing import Dict, List
+
+ENGLISH = [
+    "I love this amazing day, everything is going great!",
+    "I hate how this week turned out, worst exam ever.",
+    "Can you help me plan my semester project on machine learning?",
+    "I'm feeling a bit nervous about tomorrow's interview.",
+    "Thanks a lot, that explanation was brilliant.",
+    "Why does my code keep crashing when I run the tests?",
+    "I miss my family, it's lonely here in the hostel.",
+    "Wow, we finally won the cricket match!",
+    "What should I cook tonight, something quick and healthy?",
+    "Honestly I don't understand recursion at all.",
+]
+
+ROMAN_URDU = [
+    "aaj ka din bohat acha tha, shukriya dost",
+    "yaar mujhe bohat gussa aa raha hai, sab bakwas hai",
+    "kya haal hai? main theek hoon, tum sunao",
+    "exam ki tension ho rahi hai, kuch samajh nahi aa raha",
+    "ammi ne biryani banai, behtreen thi",
+    "mujhe neend nahi aa rahi, bohat thaka hua hoon",
+    "kal lahore ja raha hoon, barish ho rahi hai wahan",
+    "mera laptop phir se kharab ho gaya, pareshan hoon",
+    "iqbal ki poetry parh raha tha, kamaal hai",
+    "job interview ke liye kuch tips do please",
+]
+
+_FILLER = (
+    "and then we talked about the weather aur phir cricket ka match dekha while the chai got cold "
+    "because university ka kaam bohat tha and the project deadline was close so I stayed up late"
+).split()
+
+
+def mixed_length(n: int = 200, seed: int = 7) -> List[str]:
+    """Short greetings to multi-paragraph messages (word counts ~1..400)."""
+    rng = random.Random(seed)
+    base = ENGLISH + ROMAN_URDU
+    texts = []
+    for _ in range(n):
+        words = rng.choice(base).split()
+        extra = int(rng.paretovariate(1.1)) - 1
+        words += [rng.choice(_FILLER) for _ in range(min(extra * 8, 400))]
+        if rng.random() < 0.15:
+            words = words[:rng.randint(1, 3)]
+        texts.append(" ".join(words))
+    return texts
+
+
+def corpora(seed: int = 7) -> Dict[str, List[str]]:
+    return {
+        "english": list(ENGLISH),
+        "roman_urdu": list(ROMAN_URDU),
+        "mixed": mixed_length(seed=seed),
+    }
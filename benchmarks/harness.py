@@ -0,0 +1,82 @@
+"""
+Tiny timing harness + JSON baseline comparison shared by the benchmark scripts.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+def measure(fn: Callable, inputs: Iterable, repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """
+    Calls fn(x) for every input, `repeat` rounds. Har call alag time hoti hai: p50/p95 are
+    per-call latencies in microseconds, ops_per_s = total calls / total time.
+    """
+    inputs = list(inputs)
+    for _ in range(warmup):
+        for x in inputs:
+            fn(x)
+
+    timings = []
+    clock = time.perf_counter
+    for _ in range(repeat):
+        for x in inputs:
+            t0 = clock()
+            fn(x)
+            timings.append(clock() - t0)
+    if not timings:
+        return {"p50_us": 0.0, "p95_us": 0.0, "ops_per_s": None, "calls": 0}
+    total = sum(timings)
+    timings.sort()
+    return {
+        "p50_us": round(statistics.median(timings) * 1e6, 3),
+        "p95_us": round(timings[max(0, int(len(timings) * 0.95) - 1)] * 1e6, 3),
+        "ops_per_s": round(len(timings) / total, 1) if total else None,
+        "calls": len(timings),
+    }
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def save(report: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def load(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """
+    Cases whose p50 got slower than baseline * (1 + threshold).
+    Naye ya hataye gaye cases regression nahi gine jate.
+    """
+    regressions = []
+    base_cases = baseline.get("cases", {})
+    for name, result in current.get("cases", {}).items():
+        base = base_cases.get(name)
+        if not base or not base.get("p50_us"):
+            continue
+        ratio = result["p50_us"] / base["p50_us"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "case": name,
+                "baseline_p50_us": base["p50_us"],
+                "current_p50_us": result["p50_us"],
+                "slowdown": round(ratio, 3),
+            })
+    return regressions
@@ -0,0 +1,181 @@
+"""
+Async load generator for a running backend (mixed chat / stats / WhatsApp traffic).
+
+Registers and logs in `--users` synthetic accounts, then `--concurrency` workers
+replay a weighted mix of POST /api/chat/send, GET /api/chat/history-stats and
+form-encoded POST /whatsapp/message for `--duration` seconds. Reports throughput,
+latency percentiles, error rate and status breakdown per endpoint.
+
+Pair it with benchmarks/mock_groq.py so the LLM stage is realistic but free:
+
+Usage (from the project root):
+    python -m benchmarks.mock_groq --port 9100 --latency lognormal --mean-ms 800 &
+    GROQ_API_KEY=mock GROQ_BASE_URL=http://127.0.0.1:9100 uvicorn backend.app:app --port 8000 &
+    python -m benchmarks.loadgen --base-url http://127.0.0.1:8000 --users 20 --concurrency 16 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+# Asal traffic jaisa mix: zyada tar chhotay messages, kuch lambay sawal
+MESSAGES = [
+    "hi", "salam", "thanks", "ok", "kya haal hai?",
+    "I had a really stressful day at work, my manager keeps piling on tasks.",
+    "Mujhe kal exam ki tayari karni hai lekin focus nahi ho raha.",
+    "Can you suggest a simple evening routine to sleep better?",
+    "Aaj main bohat khush hoon, promotion mil gayi!",
+    "Explain the difference between a list and a tuple in Python.",
+    "I feel lonely these days, friends are busy.",
+    "What should I cook for dinner with rice, chicken and yogurt?",
+]
+
+DEFAULT_MIX = "chat=6,stats=2,whatsapp=2"
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"chat", "stats", "whatsapp"}
+    if unknown:
+        raise SystemExit(f"Unknown endpoint(s) in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class Recorder:
+    """Per-endpoint latency samples and status counts."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def add(self, endpoint: str, seconds: float, status) -> None:
+        self.latencies[endpoint].append(seconds * 1000)
+        self.statuses[endpoint][str(status)] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            n = len(samples)
+            endpoints[endpoint] = {
+                "requests": n,
+                "rps": round(n / elapsed, 2),
+                "p50_ms": round(_percentile(samples, 50), 1),
+                "p95_ms": round(_percentile(samples, 95), 1),
+                "p99_ms": round(_percentile(samples, 99), 1),
+                "max_ms": round(max(samples), 1),
+                "error_rate": round(self.errors[endpoint] / n, 4),
+                "statuses": dict(self.statuses[endpoint]),
+            }
+        total = sum(len(s) for s in self.latencies.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "total_requests": total,
+            "total_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def login_users(client: httpx.AsyncClient, count: int, prefix: str) -> list:
+    """Registers (idempotently) and logs in synthetic users; returns bearer tokens."""
+    password = "loadtest-pass-123"
+
+    async def one(i: int):
+        email = f"{prefix}{i}@loadtest.example.com"
+        await client.post("/auth/register", json={"username": f"{prefix}{i}", "email": email, "password": password})
+        resp = await client.post("/auth/login", json={"email": email, "password": password})
+        resp.raise_for_status()
+        return resp.json()["access_token"]
+
+    return await asyncio.gather(*(one(i) for i in range(count)))
+
+
+async def run(base_url: str, users: int, concurrency: int, duration: float, mix: dict,
+              phones: int, timeout: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    recorder = Recorder()
+    prefix = f"lg{uuid.uuid4().hex[:6]}_"
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        tokens = await login_users(client, users, prefix)
+        names, weights = list(mix), list(mix.values())
+
+        async def request(endpoint: str):
+            token = rng.choice(tokens)
+            headers = {"Authorization": f"Bearer {token}"}
+            if endpoint == "chat":
+                return await client.post("/api/chat/send", json={"message": rng.choice(MESSAGES)}, headers=headers)
+            if endpoint == "stats":
+                return await client.get("/api/chat/history-stats", headers=headers)
+            # Twilio webhook jaisa form-encoded body
+            phone = f"whatsapp:+92300{rng.randrange(phones):07d}"
+            return await client.post("/whatsapp/message", data={"Body": rng.choice(MESSAGES), "From": phone})
+
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                endpoint = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    status = (await request(endpoint)).status_code
+                except httpx.TimeoutException:
+                    status = "timeout"
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                recorder.add(endpoint, time.perf_counter() - started, status)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    report = recorder.report(elapsed)
+    report.update({"base_url": base_url, "users": users, "concurrency": concurrency, "mix": mix})
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10, help="Synthetic web accounts to log in")
+    parser.add_argument("--phones", type=int, default=50, help="Distinct WhatsApp senders")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of traffic")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. chat=6,stats=2,whatsapp=2")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request client timeout")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.base_url, args.users, args.concurrency, args.duration,
+                             parse_mix(args.mix), args.phones, args.timeout, args.seed))
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Local Groq/OpenAI-compatible stand-in for load tests (no network, no API cost).
+
+Serves POST /openai/v1/chat/completions (the path the groq SDK calls) with a
+configurable latency distribution, random 429 injection and optional streaming.
+The groq SDK reads GROQ_BASE_URL, so pointing the backend at it needs no code change:
+
+    python -m benchmarks.mock_groq --port 9100 --latency lognormal --mean-ms 800 --p429 0.02
+    GROQ_API_KEY=mock GROQ_BASE_URL=http://127.0.0.1:9100 uvicorn backend.app:app
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+REPLY_WORDS = (
+    "I understand how you feel and I'm here for you. Let's take it one step at a time. "
+    "Aap fikar na karein, sab theek ho jayega. Tell me a bit more about what happened today."
+).split()
+
+
+class LatencyModel:
+    """Samples per-request latency in seconds: fixed, uniform, lognormal or pareto (heavy tail)."""
+
+    def __init__(self, kind: str = "lognormal", mean_ms: float = 600.0, spread: float = 0.5, seed: int = 7):
+        self.kind = kind
+        self.mean = mean_ms / 1000.0
+        self.spread = spread
+        self.rng = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.mean
+        if self.kind == "uniform":
+            return self.rng.uniform(self.mean * (1 - self.spread), self.mean * (1 + self.spread))
+        if self.kind == "pareto":
+            alpha = 1 + 1 / max(self.spread, 1e-3)
+            scale = self.mean * (alpha - 1) / alpha
+            return scale * self.rng.paretovariate(alpha)
+        # lognormal: mean ko preserve karte hue sigma = spread
+        mu = math.log(self.mean) - self.spread ** 2 / 2
+        return self.rng.lognormvariate(mu, self.spread)
+
+
+def create_app(latency: LatencyModel, p429: float = 0.0, reply_tokens: int = 60,
+               stream_chunk_ms: float = 15.0) -> FastAPI:
+    app = FastAPI(title="Mock Groq")
+    stats = Counter()
+
+    def _usage(messages, completion_tokens):
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4 + 1
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _reply(max_tokens: int) -> str:
+        n = max(1, min(reply_tokens, max_tokens))
+        return " ".join(REPLY_WORDS[i % len(REPLY_WORDS)] for i in range(n))
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "mock-model")
+        messages = body.get("messages") or []
+        stats["requests"] += 1
+
+        if random.random() < p429:
+            stats["429"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": "1"},
+                content={"error": {"message": f"Rate limit reached for model `{model}` (mock)",
+                                   "type": "tokens", "code": "rate_limit_exceeded"}},
+            )
+
+        text = _reply(int(body.get("max_tokens") or 1024))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            stats["streamed"] += 1
+            words = text.split()
+
+            async def events():
+                # Pehla token latency ke baad, phir har chunk thore waqfe se
+                await asyncio.sleep(latency.sample())
+                for i, word in enumerate(words):
+                    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                             "model": model, "choices": [{"index": 0, "delta": {"content": word + " "},
+                                                          "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(stream_chunk_ms / 1000)
+                final = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                         "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                         "x_groq": {"usage": _usage(messages, len(words))}}
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency.sample())
+        stats["ok"] += 1
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": _usage(messages, len(text.split())),
+        }
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        return dict(stats)
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal", "pareto"], default="lognormal")
+    parser.add_argument("--mean-ms", type=float, default=600.0)
+    parser.add_argument("--spread", type=float, default=0.5, help="Uniform +/- fraction, lognormal sigma, pareto tail")
+    parser.add_argument("--p429", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    app = create_app(LatencyModel(args.latency, args.mean_ms, args.spread, args.seed), args.p429, args.reply_tokens)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
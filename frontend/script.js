@@ -1,6 +1,7 @@
 const API_BASE_URL = "http://127.0.0.1:8000";
 let isLoginMode = true;
 let moodChart = null;
+let moodStream = null;
 let isProcessing = false;
 
 // DOM Elements
@@ -122,13 +123,8 @@ async function handleChat() {
     scrollChat();
 
     // --- 🔍 SMART DETECTION LOGIC ---
+    // Image intent ab backend decide karta hai (data.image_url)
     const lowerMsg = message.toLowerCase();
-    const genKeywords = ["generate", "create", "make", "bnao", "bnnao", "tasveer do", "draw", "paint", "photo of"];
-    const personalKeywords = ["personality", "mera character", "image kesi hai", "image kaisa hai", "batao", "describe"];
-
-    const isImageRequest = genKeywords.some(word => lowerMsg.includes(word)) &&
-        !personalKeywords.some(word => lowerMsg.includes(word));
-
     const voiceKeywords = ["speak", "bolo", "batao", "sunao", "awaz", "talk"];
     const userWantsToHear = voiceKeywords.some(word => lowerMsg.includes(word));
 
@@ -141,8 +137,7 @@ async function handleChat() {
                 "Authorization": `Bearer ${token}`
             },
             body: JSON.stringify({
-                message: message,
-                is_image_request: isImageRequest
+                message: message
             })
         });
 
@@ -157,17 +152,16 @@ async function handleChat() {
         if (response.ok) {
             appendMsg("ai-msg", data.response);
 
-            if (data.image_url && isImageRequest) {
-                await appendImage(data.image_url);
+            if (data.image_url) {
+                // Cached images relative path (/api/images/<key>) par aati hain
+                const imageUrl = data.image_url.startsWith("/") ? `${API_BASE_URL}${data.image_url}` : data.image_url;
+                await appendImage(imageUrl);
             }
 
             if (userWantsToHear) {
                 speakText(data.response);
             }
-
-            if (moodChartContainer && !moodChartContainer.classList.contains('hidden')) {
-                fetchMoodHistory();
-            }
+            // Mood chart is updated by the live stream (no re-poll needed)
         } else {
             appendMsg("ai-msg", "⚠️ Error: " + (data.detail || "Server issue"));
         }
@@ -243,6 +237,67 @@ async function fetchMoodHistory() {
     }
 }
 
+// --- 📡 Live Mood Stream (SSE) ---
+function startMoodStream() {
+    const token = localStorage.getItem("token");
+    if (!token || !('EventSource' in window)) {
+        fetchMoodHistory();
+        return;
+    }
+    if (moodStream) return;
+
+    moodStream = new EventSource(`${API_BASE_URL}/api/live/mood-stream?token=${encodeURIComponent(token)}`);
+
+    moodStream.addEventListener('snapshot', (e) => {
+        const data = JSON.parse(e.data);
+        renderChart(data.labels, data.values);
+    });
+
+    moodStream.addEventListener('mood', (e) => {
+        const data = JSON.parse(e.data);
+        applyMoodDelta(data.mood, data.delta || 1);
+    });
+
+    moodStream.onerror = () => {
+        // Browser reconnects on its own; a closed stream means auth failed
+        if (moodStream && moodStream.readyState === EventSource.CLOSED) {
+            stopMoodStream();
+        }
+    };
+}
+
+function stopMoodStream() {
+    if (moodStream) {
+        moodStream.close();
+        moodStream = null;
+    }
+}
+
+function applyMoodDelta(mood, delta) {
+    if (!moodChart) {
+        renderChart([mood], [delta]);
+        return;
+    }
+    const labels = moodChart.data.labels;
+    const values = moodChart.data.datasets[0].data;
+
+    // Drop the empty-state placeholder on the first real delta
+    const placeholder = labels.findIndex(l => l === 'No Data' || l === 'No Data Yet');
+    if (placeholder !== -1) {
+        labels.splice(placeholder, 1);
+        values.splice(placeholder, 1);
+    }
+
+    const idx = labels.indexOf(mood);
+    if (idx === -1) {
+        labels.push(mood);
+        values.push(delta);
+    } else {
+        values[idx] += delta;
+    }
+    moodChart.update();
+}
+
 function renderChart(labels, values) {
     const chartCanvas = document.getElementById('moodChart');
     if (!chartCanvas) return;
@@ -396,6 +451,7 @@ if (tabRegister) {
 
 if (logoutBtn) {
     logoutBtn.onclick = () => {
+        stopMoodStream();
         localStorage.clear();
         location.reload();
     };
@@ -405,7 +461,8 @@ if (statsBtn) {
     statsBtn.onclick = () => {
         if (moodChartContainer) {
             const isHidden = moodChartContainer.classList.toggle('hidden');
-            if (!isHidden) fetchMoodHistory();
+            if (isHidden) stopMoodStream();
+            else startMoodStream();
         }
     };
 }
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Tests apni alag SQLite file aur vector index use karte hain (backend import se pehle)
+_TMP = tempfile.mkdtemp(prefix="rizwan-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["VECTOR_INDEX_DIR"] = os.path.join(_TMP, "vector_index")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
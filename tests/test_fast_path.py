@@ -0,0 +1,39 @@
+import pytest
+
+from backend.ai_engine.fast_path import FastPathResponder, last_bot_reply
+
+QUESTIONS = [
+    "Should I explain the steps?",
+    "Want me to write the full plan for you? 😊",
+    "Would you like the short version or the detailed one",
+    "Main aap ko poora tareeqa batao?",
+]
+
+
+@pytest.fixture
+def responder():
+    return FastPathResponder(channels={"web"})
+
+
+@pytest.mark.parametrize("reply", QUESTIONS)
+@pytest.mark.parametrize("text", ["haan", "sure", "ji", "ok", "done"])
+def test_affirmative_to_a_question_goes_to_llm(responder, text, reply):
+    assert responder.classify(text, reply) is None
+    assert responder.try_reply(text, "Neutral", "web", reply) is None
+
+
+@pytest.mark.parametrize("text", ["ok", "got it", "theek hai", "haan"])
+def test_closing_ack_still_fast(responder, text):
+    last = "Drink some water and get some rest tonight."
+    assert responder.classify(text, last) == "ack"
+    assert responder.try_reply(text, "Neutral", "web", last)
+
+
+def test_other_intents_ignore_pending_question(responder):
+    assert responder.classify("thanks", "Should I explain the steps?") == "thanks"
+
+
+def test_last_bot_reply():
+    assert last_bot_reply(None) is None
+    assert last_bot_reply([]) is None
+    assert last_bot_reply([{"user": "a", "bot": "x"}, {"user": "b", "bot": "Ready?"}]) == "Ready?"
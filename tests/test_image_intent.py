@@ -0,0 +1,54 @@
+import pytest
+
+from backend.ai_engine.image_intent import extract_image_prompt, is_image_request
+
+IMAGE_REQUESTS = [
+    "draw a cat on a roof",
+    "draw a cartoon character",
+    "please make a picture of a sunset over the sea",
+    "can you generate an image of a dragon",
+    "generate a logo for my bakery",
+    "hey, can you draw me a horse",
+    "show me a picture of a snowy mountain",
+    "an image of a red car",
+    "ek billi ki tasveer bana do",
+    "mujhe pahar ki tasveer dikhao",
+]
+
+NOT_IMAGE_REQUESTS = [
+    "do you have a picture of me?",
+    "what should I do with these photos",
+    "I want to make art my career",
+    "I will send you the pictures tomorrow",
+    "show me the photos you sent",
+    "show me how to make art",
+    "draw conclusions from this data",
+    "draw attention to the main point",
+    "draw a line under this chapter",
+    "photo do",
+    "generate a plan for my exams",
+    "describe this photo",
+    "how is my personality image",
+    "give me a character analysis of Hamlet",
+]
+
+
+@pytest.mark.parametrize("text", IMAGE_REQUESTS)
+def test_image_requests_are_detected(text):
+    assert is_image_request(text)
+    assert extract_image_prompt(text)
+
+
+@pytest.mark.parametrize("text", NOT_IMAGE_REQUESTS)
+def test_ordinary_chat_is_not_an_image_request(text):
+    assert not is_image_request(text)
+    assert extract_image_prompt(text) is None
+
+
+@pytest.mark.parametrize("text, subject", [
+    ("please make a picture of a sunset", "a sunset"),
+    ("can you generate an image of a dragon", "a dragon"),
+    ("generate a logo for my bakery", "a logo for my bakery"),
+])
+def test_prompt_keeps_only_the_subject(text, subject):
+    assert extract_image_prompt(text) == subject
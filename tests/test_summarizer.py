@@ -0,0 +1,53 @@
+import asyncio
+
+from sqlalchemy import select
+
+import backend.ai_engine.llm_client as llm_client
+import backend.ai_engine.summarizer as summarizer
+from backend.database.db import AsyncSessionLocal
+from backend.database.models import ChatHistory, ConversationSummary
+from backend.init_db import create_tables
+
+PHONE = "+923000000031"
+PREVIOUS = "- User: My sister lives in Lahore."
+
+
+async def _compact_while_saturated(monkeypatch):
+    await create_tables()
+    async with AsyncSessionLocal() as db:
+        rows = [ChatHistory(phone_number=PHONE, user_input=f"My exam {i} is about cricket statistics.",
+                            ai_response=f"Good luck with exam {i}!") for i in range(40)]
+        db.add_all(rows)
+        db.add(ConversationSummary(phone_number=PHONE, summary=PREVIOUS,
+                                   last_chat_id=0, turns_summarized=0))
+        await db.commit()
+        ids = [row.id for row in rows]
+
+    # Aik slot, jo pehle se pakra hua hai: background summary call queue mein time out hoti hai
+    scheduler = llm_client.LLMScheduler(max_concurrency=1, max_queue_wait=0.05)
+    await scheduler.acquire("u1", 10)
+    monkeypatch.setattr(llm_client, "llm_scheduler", scheduler)
+    monkeypatch.setattr(llm_client, "get_client", lambda: object())
+    monkeypatch.setattr(summarizer, "SUMMARY_MODE", "llm")
+
+    compactor = summarizer.SummaryCompactor()
+    await compactor.run_once()
+
+    async with AsyncSessionLocal() as db:
+        summary = (await db.execute(
+            select(ConversationSummary).where(ConversationSummary.phone_number == PHONE)
+        )).scalar_one()
+    return summary, ids, scheduler
+
+
+def test_compactor_falls_back_to_extractive_when_scheduler_is_saturated(monkeypatch):
+    summary, ids, scheduler = asyncio.run(_compact_while_saturated(monkeypatch))
+
+    assert scheduler.timed_out >= 1
+    keep = summarizer.SUMMARY_KEEP_RECENT
+    span = [(f"My exam {i} is about cricket statistics.", f"Good luck with exam {i}!") for i in range(40 - keep)]
+    # Busy reply summary nahi banta: purani summary + span ka extractive fallback
+    assert "⏳" not in summary.summary
+    assert summary.summary == summarizer.extractive_summary(PREVIOUS, span)
+    assert summary.last_chat_id == ids[-keep - 1]
+    assert summary.turns_summarized == len(ids) - keep
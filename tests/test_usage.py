@@ -0,0 +1,36 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from backend.ai_engine.usage import UsageRecorder
+from backend.database.db import AsyncSessionLocal
+from backend.database.models import LLMUsage
+from backend.init_db import create_tables
+
+
+async def _fill_batches_then_stop():
+    await create_tables()
+    recorder = UsageRecorder(daily_budget=0, batch_size=3)
+    await recorder.start(interval=3600)
+    for i in range(3):
+        recorder.record("+923000000038", "whatsapp", "test-model", 10, 5)
+    tasks = set(recorder._flush_tasks)
+    # Batch bhar gaya: aik hi flush task, jis ka reference recorder ke paas hai
+    recorder.record("+923000000038", "whatsapp", "test-model", 10, 5)
+    await recorder.stop()
+
+    async with AsyncSessionLocal() as db:
+        count = (await db.execute(
+            select(func.count()).select_from(LLMUsage).where(LLMUsage.tenant == "+923000000038")
+        )).scalar_one()
+    return recorder, tasks, count
+
+
+def test_batch_flush_task_is_tracked_and_awaited_on_stop():
+    recorder, tasks, count = asyncio.run(_fill_batches_then_stop())
+
+    assert len(tasks) == 1
+    assert all(task.done() for task in tasks)
+    assert not recorder._flush_tasks
+    assert count == 4
+    assert recorder.rows_written == 4